@@ -1,16 +1,37 @@
 """Main CLI application entry point."""
+import os
 import typer
-from .commit import commit
-from .diff import diff_app
-from .log import log
-from .model import model_app
-from .version import version
+from .lazy import LazyGroup
 
-app = typer.Typer()
 
-# Register commands
-app.command()(commit)
-app.command()(log)
-app.command()(version)
-app.add_typer(model_app, name="model", help="管理AI模型")
-app.add_typer(diff_app, name="diff", help="查看代码更改")
\ No newline at end of file
+class AppGroup(LazyGroup):
+    """Top-level command group; command modules load on first use."""
+
+    lazy_commands = {
+        "commit": (".commit", "commit", None),
+        "log": (".log", "log", None),
+        "version": (".version", "version", None),
+        "model": (".model", "model_app", "管理AI模型"),
+        "diff": (".diff", "diff_app", "查看代码更改"),
+        "serve": (".serve", "serve", None),
+        "hook": (".hook", "hook_app", "管理 git 钩子，在 git add 后预生成提交信息"),
+        "reword": (".reword", "reword", None),
+    }
+
+
+app = typer.Typer(cls=AppGroup)
+
+
+@app.callback()
+def main(
+    trace: bool = typer.Option(
+        False, "--trace", help="记录各阶段耗时，退出时写入 Chrome trace 文件并打印汇总（也可设置 AIGIT_TRACE）"
+    ),
+):
+    """AI Git Utils: 智能 Git Commit 助手"""
+    from ..git_hooks import PREGENERATE_GUARD_ENV
+    from ..tracing import configure
+    
+    configure(trace)
+    # aigit 自己暂存和提交时写入的索引不需要再触发后台预生成
+    os.environ[PREGENERATE_GUARD_ENV] = "1"
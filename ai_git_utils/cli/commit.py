@@ -1,25 +1,73 @@
 """Commit command implementation."""
+import os
 import typer
-from typing import Optional
-from git.exc import InvalidGitRepositoryError, GitCommandError
-from ..services.commit_service import CommitService
+from typing import TYPE_CHECKING, Callable, Optional
 from ..config_manager import get_active_model
+from ..tracing import span
+
+if TYPE_CHECKING:
+    from ..daemon.client import DaemonClient
+    from ..services.commit_service import CommitService
 
 
 def commit(
     file_path: Optional[str] = typer.Option(None, "--file", "-f", help="指定文件路径"),
     language: str = typer.Option("English", "--lang", "-l", help="设置语言（English/Chinese）"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="不读取也不写入本地缓存"),
+    refresh: bool = typer.Option(False, "--refresh", help="忽略已缓存的结果并重新生成"),
+    stream: bool = typer.Option(False, "--stream", help="流式生成并实时预览提交信息"),
+    race: bool = typer.Option(False, "--race", help="延迟后同时请求备用模型，采用最先返回的有效结果"),
+    split: bool = typer.Option(False, "--split", help="将暂存的更改拆分为多个独立提交"),
+    no_daemon: bool = typer.Option(False, "--no-daemon", help="不使用 aigit serve 守护进程，在当前进程中生成"),
 ):
     """
     使用 AI 智能生成代码更改信息
     """
+    if split and file_path:
+        typer.echo("错误：--split 会拆分所有暂存的更改，不能与 --file 同时使用。", err=True)
+        raise typer.Exit(code=1)
+    
     active_config = get_active_model()
     if not active_config:
         typer.echo("错误：未找到激活的模型配置。请先运行 'aigit model add' 或 'aigit model active' 命令。")
         raise typer.Exit(code=1)
     
+    if not split and not no_daemon:
+        # 守护进程在运行时只做转发，不导入 openai 和 git
+        from ..daemon.client import DaemonClient
+        
+        client = DaemonClient.connect()
+        if client is not None:
+            _commit_with_daemon(client, file_path, language, not no_cache, refresh, stream, race)
+            return
+    
+    _commit_in_process(file_path, language, no_cache, refresh, stream, race, split)
+
+
+def _commit_in_process(
+    file_path: Optional[str],
+    language: str,
+    no_cache: bool,
+    refresh: bool,
+    stream: bool,
+    race: bool,
+    split: bool,
+) -> None:
+    """Generate and commit in this process."""
+    from git.exc import InvalidGitRepositoryError, GitCommandError
+    from ..services.commit_service import CommitService
+    
     try:
-        service = CommitService()
+        service = CommitService(
+            use_cache=not no_cache,
+            refresh=refresh,
+            stream=stream,
+            race=race,
+        )
+        
+        if split:
+            _commit_split(service, language)
+            return
         
         # Prepare commit message
         commit_message = service.prepare_commit_message(".", file_path, language)
@@ -28,21 +76,93 @@ def commit(
             typer.echo("没有检测到更改。")
             return
         
-        # Show the edited commit message
-        typer.echo("\n编辑后的提交信息：")
-        typer.echo(commit_message)
-        
-        # Ask for confirmation
-        if typer.confirm("\n确认提交这些更改？"):
-            service.commit_changes(".", commit_message)
-            typer.echo("更改已成功提交！")
-        else:
-            typer.echo("提交已取消。")
-            
+        _confirm_and_commit(
+            commit_message, lambda message: service.commit_changes(".", message)
+        )
+    
     except InvalidGitRepositoryError:
         typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
     except GitCommandError as e:
         typer.echo(f"Git命令执行错误：{str(e)}", err=True)
     except Exception as e:
         typer.echo(f"错误：{str(e)}", err=True)
-        raise typer.Exit(code=1)
\ No newline at end of file
+        raise typer.Exit(code=1)
+
+
+def _commit_with_daemon(
+    client: "DaemonClient",
+    file_path: Optional[str],
+    language: str,
+    use_cache: bool,
+    refresh: bool,
+    stream: bool,
+    race: bool,
+) -> None:
+    """Let ``aigit serve`` stage and generate; edit and confirm here."""
+    from ..daemon.client import DaemonError
+    from ..utils import commit_preview, edit_commit_message
+    
+    repo_path = os.getcwd()
+    try:
+        if stream:
+            with commit_preview() as on_update:
+                draft = client.draft(repo_path, file_path, language, use_cache, refresh, race, on_update)
+        else:
+            draft = client.draft(repo_path, file_path, language, use_cache, refresh, race)
+        
+        if draft is None:
+            typer.echo("没有检测到更改。")
+            return
+        
+        commit_message = edit_commit_message(draft["message"])
+        _confirm_and_commit(
+            commit_message,
+            lambda message: client.commit(repo_path, message, draft["tree"], draft["head"]),
+        )
+    
+    except DaemonError as e:
+        if e.kind == "InvalidGitRepositoryError":
+            typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
+        elif e.kind == "GitCommandError":
+            typer.echo(f"Git命令执行错误：{str(e)}", err=True)
+        else:
+            typer.echo(f"错误：{str(e)}", err=True)
+            raise typer.Exit(code=1)
+    except OSError as e:
+        typer.echo(f"错误：无法连接 aigit 守护进程：{str(e)}", err=True)
+        raise typer.Exit(code=1)
+
+
+def _confirm_and_commit(commit_message: str, commit_changes: Callable[[str], object]) -> None:
+    """Show the edited message and commit it after confirmation."""
+    # Show the edited commit message
+    typer.echo("\n编辑后的提交信息：")
+    typer.echo(commit_message)
+    
+    # Ask for confirmation
+    with span("user.confirm"):
+        confirmed = typer.confirm("\n确认提交这些更改？")
+    if confirmed:
+        commit_changes(commit_message)
+        typer.echo("更改已成功提交！")
+    else:
+        typer.echo("提交已取消。")
+
+
+def _commit_split(service: "CommitService", language: str) -> None:
+    """Plan split commits, show them and commit after one confirmation."""
+    splits = service.prepare_split_commits(".", language)
+    if not splits:
+        typer.echo("没有检测到更改。")
+        return
+    
+    typer.echo(f"\n计划拆分为 {len(splits)} 个提交：")
+    for index, split in enumerate(splits, 1):
+        typer.echo(f"\n[{index}/{len(splits)}] {', '.join(split.paths)}")
+        typer.echo(split.message)
+    
+    if typer.confirm("\n确认按以上分组提交？"):
+        count = service.commit_split(".", splits)
+        typer.echo(f"已成功创建 {count} 个提交！")
+    else:
+        typer.echo("提交已取消。")
@@ -1,9 +1,10 @@
 """Diff command implementation."""
 import typer
+from itertools import chain
 from typing import Optional
 from git import Repo
 from git.exc import InvalidGitRepositoryError, GitCommandError
-from ..git_operations import get_git_diff, get_commit_diff
+from ..git_operations import iter_commit_diff, iter_git_diff, iter_worktree_diff
 from ..utils import beautify_diff
 
 diff_app = typer.Typer()
@@ -12,17 +13,24 @@ diff_app = typer.Typer()
 @diff_app.command("current")
 def diff(
     file_path: Optional[str] = typer.Option(None, "--file", "-f", help="指定文件路径"),
+    pager: bool = typer.Option(True, "--pager/--no-pager", help="输出超过一屏时分页显示"),
+    stage: bool = typer.Option(False, "--stage", help="先暂存所有更改，再显示暂存区的 diff"),
 ):
     """查看代码更改"""
     try:
         repo = Repo(".")
-        repo.git.add('.')
-        diff_output = get_git_diff(repo, True, file_path)
+        if stage:
+            repo.git.add('.')
+            lines = iter_git_diff(repo, True, file_path)
+        else:
+            # 默认只读：直接比较工作区与 HEAD，不写入 .git/index
+            lines = iter_worktree_diff(repo, file_path)
 
-        if not diff_output:
+        first_line = next(lines, None)
+        if first_line is None:
             typer.echo("没有检测到更改。")
         else:
-            beautify_diff(diff_output)
+            beautify_diff(chain([first_line], lines), pager)
 
     except InvalidGitRepositoryError:
         typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
@@ -31,12 +39,14 @@ def diff(
 
 
 @diff_app.command("commit")
-def commit_diff(commit_hash: str = typer.Argument(..., help="指定的commit哈希值")):
+def commit_diff(
+    commit_hash: str = typer.Argument(..., help="指定的commit哈希值"),
+    pager: bool = typer.Option(True, "--pager/--no-pager", help="输出超过一屏时分页显示"),
+):
     """显示指定commit的diff"""
     try:
         repo = Repo(".")
-        diff_output = get_commit_diff(repo, commit_hash)
-        beautify_diff(diff_output)
+        beautify_diff(iter_commit_diff(repo, commit_hash), pager)
     except InvalidGitRepositoryError:
         typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
     except GitCommandError as e:
@@ -0,0 +1,84 @@
+"""Hook command implementation."""
+import typer
+from typing import Optional
+from git import Repo
+from git.exc import InvalidGitRepositoryError
+from ..config_manager import get_active_model
+from ..git_hooks import install_hooks, uninstall_hooks
+from ..services.pregenerator import Pregenerator
+
+hook_app = typer.Typer()
+
+
+@hook_app.command("install")
+def install(
+    language: str = typer.Option("English", "--lang", "-l", help="设置语言（English/Chinese）"),
+    force: bool = typer.Option(False, "--force", help="覆盖其他工具安装的同名钩子"),
+):
+    """安装钩子：git add 后在后台预生成提交信息，git commit 时直接填入"""
+    try:
+        paths = install_hooks(Repo("."), language, force)
+    except InvalidGitRepositoryError:
+        typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
+        raise typer.Exit(code=1)
+    except FileExistsError as e:
+        typer.echo(f"错误：{str(e)}，使用 --force 覆盖。", err=True)
+        raise typer.Exit(code=1)
+    for path in paths:
+        typer.echo(f"已安装 {path}")
+
+
+@hook_app.command("uninstall")
+def uninstall():
+    """删除 aigit 安装的钩子"""
+    try:
+        removed = uninstall_hooks(Repo("."))
+    except InvalidGitRepositoryError:
+        typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
+        raise typer.Exit(code=1)
+    if not removed:
+        typer.echo("没有找到 aigit 安装的钩子。")
+    for path in removed:
+        typer.echo(f"已删除 {path}")
+
+
+@hook_app.command("prepare-commit-msg", hidden=True)
+def prepare_commit_msg(
+    message_file: str = typer.Argument(..., help="git 传入的提交信息文件"),
+    source: Optional[str] = typer.Argument(None, help="提交信息的来源"),
+    commit: Optional[str] = typer.Argument(None, help="被修改的提交"),
+    language: str = typer.Option("English", "--lang", "-l", help="设置语言（English/Chinese）"),
+):
+    """由 prepare-commit-msg 钩子调用，填入预生成的提交信息"""
+    if source or not get_active_model():
+        # -m、-F、模板、合并、squash 和 --amend 已经带有提交信息
+        return
+
+    try:
+        with open(message_file, "r", encoding="utf-8") as f:
+            template = f.read()
+        if any(line.strip() and not line.startswith("#") for line in template.splitlines()):
+            return
+
+        message = Pregenerator(".", language).message_for_index()
+    except Exception as e:
+        # 钩子失败不能阻止提交，只给出提示
+        typer.echo(f"aigit：未能生成提交信息：{str(e)}", err=True)
+        return
+
+    if message is not None:
+        with open(message_file, "w", encoding="utf-8") as f:
+            f.write(message.to_string() + "\n" + template)
+
+
+@hook_app.command("pregenerate", hidden=True)
+def pregenerate(
+    language: str = typer.Option("English", "--lang", "-l", help="设置语言（English/Chinese）"),
+):
+    """由 post-index-change 钩子在后台调用，索引稳定后预生成提交信息"""
+    model_config = get_active_model()
+    if not model_config:
+        return
+
+    pregenerator = Pregenerator.from_model_config(".", language, model_config)
+    pregenerator.run(pregenerator.schedule())
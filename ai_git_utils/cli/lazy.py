@@ -0,0 +1,61 @@
+"""Lazily loaded command group for the CLI."""
+import importlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import typer
+from typer.core import TyperGroup
+
+
+class LazyGroup(TyperGroup):
+    """Typer group that imports command modules only when they are invoked.
+
+    Subclasses declare ``lazy_commands`` as a mapping of command name to
+    ``(module_path, attribute, help)``. The attribute may be a plain command
+    function or a ``typer.Typer`` sub-application. Nothing is imported until
+    the command is resolved, so ``aigit version`` never pays for ``openai``,
+    ``git`` or ``rich.syntax``.
+    """
+
+    lazy_commands: Dict[str, Tuple[str, str, Optional[str]]] = {}
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._loaded: Dict[str, Any] = {}
+
+    def list_commands(self, ctx: Any) -> List[str]:
+        """List eager commands followed by lazy ones in declaration order."""
+        return super().list_commands(ctx) + [
+            name for name in self.lazy_commands if name not in self.commands
+        ]
+
+    def get_command(self, ctx: Any, cmd_name: str) -> Optional[Any]:
+        """Resolve a command, importing its module on first use."""
+        if cmd_name in self.lazy_commands:
+            if cmd_name not in self._loaded:
+                self._loaded[cmd_name] = self._load(cmd_name)
+            return self._loaded[cmd_name]
+        return super().get_command(ctx, cmd_name)
+
+    def _load(self, cmd_name: str) -> Any:
+        """Import and convert a lazy command into a click command.
+
+        Args:
+            cmd_name: Registered name of the command
+
+        Returns:
+            The click command or group for ``cmd_name``
+        """
+        module_path, attr, help_text = self.lazy_commands[cmd_name]
+        target = getattr(importlib.import_module(module_path, __package__), attr)
+
+        if isinstance(target, typer.Typer):
+            command = typer.main.get_group(target)
+        else:
+            wrapper = typer.Typer(add_completion=False)
+            wrapper.command(name=cmd_name)(target)
+            command = typer.main.get_command(wrapper)
+
+        command.name = cmd_name
+        if help_text:
+            command.help = help_text
+        return command
@@ -1,10 +1,14 @@
 """Log command implementation."""
 import typer
-from datetime import datetime
+from typing import Iterable, List, Optional
 from git import Repo
 from git.exc import InvalidGitRepositoryError, GitCommandError
 from rich.console import Console
 from rich.table import Table
+from ..git_operations import iter_log
+from ..models.log_entry import LogEntry
+from ..pager import Pager
+from ..services.log_index import LogIndex
 
 console = Console()
 
@@ -13,37 +17,52 @@ def log(
     limit: int = typer.Option(10, "--limit", "-n", help="显示的提交数量"),
     since: str = typer.Option(None, "--since", "-s", help="显示指定日期之后的提交，格式：YYYY-MM-DD"),
     until: str = typer.Option(None, "--until", "-u", help="显示指定日期之前的提交，格式：YYYY-MM-DD"),
+    author: str = typer.Option(None, "--author", "-a", help="只显示作者匹配的提交"),
+    grep: str = typer.Option(None, "--grep", "-g", help="只显示提交信息匹配的提交"),
+    paths: Optional[List[str]] = typer.Argument(None, help="只显示涉及这些路径的提交"),
+    no_index: bool = typer.Option(False, "--no-index", help="不使用本地提交索引，直接查询 git"),
+    pager: bool = typer.Option(False, "--pager", "-p", help="分页浏览，按需加载每一页"),
 ):
     """美观地显示git log"""
     try:
         repo = Repo(".")
-        commits = repo.iter_commits()
 
-        if since:
-            since_date = datetime.strptime(since, "%Y-%m-%d")
-            commits = filter(lambda c: c.committed_datetime > since_date, commits)
+        entries = None
+        if not (no_index or grep or paths):
+            # 提交信息和路径过滤仍交给 git 处理
+            entries = LogIndex(repo).query(limit, since, until, author)
+        if entries is None:
+            entries = iter_log(repo, limit, since, until, author, grep, paths)
 
-        if until:
-            until_date = datetime.strptime(until, "%Y-%m-%d")
-            commits = filter(lambda c: c.committed_datetime < until_date, commits)
-
-        table = Table(title="Git Log")
-        table.add_column("提交哈希", style="cyan", no_wrap=True)
-        table.add_column("作者", style="magenta")
-        table.add_column("日期", style="green")
-        table.add_column("提交信息", style="yellow")
-
-        for _commit in list(commits)[:limit]:
-            table.add_row(
-                _commit.hexsha[:7],
-                _commit.author.name,
-                _commit.committed_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-                _commit.message.split("\n")[0],
-            )
-
-        console.print(table)
+        if not pager:
+            console.print(_log_table(entries))
+        elif console.is_terminal:
+            # 标题、表头、边框和底部提示共占 7 行
+            Pager(entries, _render_page, console.size.height - 7, console).run()
+        else:
+            # 非终端输出时逐行输出纯文本，便于管道处理
+            for entry in entries:
+                typer.echo("\t".join([entry.hexsha[:7], entry.author, entry.date, entry.subject]))
 
     except InvalidGitRepositoryError:
         typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
     except GitCommandError as e:
-        typer.echo(f"Git命令执行错误：{str(e)}", err=True)
\ No newline at end of file
+        typer.echo(f"Git命令执行错误：{str(e)}", err=True)
+
+
+def _log_table(entries: Iterable[LogEntry], title: str = "Git Log", no_wrap: bool = False) -> Table:
+    """Build the log table from ``entries``."""
+    table = Table(title=title)
+    table.add_column("提交哈希", style="cyan", no_wrap=True)
+    table.add_column("作者", style="magenta", no_wrap=no_wrap)
+    table.add_column("日期", style="green", no_wrap=no_wrap)
+    table.add_column("提交信息", style="yellow", no_wrap=no_wrap)
+
+    for entry in entries:
+        table.add_row(entry.hexsha[:7], entry.author, entry.date, entry.subject)
+    return table
+
+
+def _render_page(entries: List[LogEntry], start: int) -> Table:
+    # 分页模式下每个提交只占一行，页面高度才可预测
+    return _log_table(entries, f"Git Log #{start + 1}-{start + len(entries)}", no_wrap=True)
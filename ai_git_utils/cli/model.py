@@ -1,11 +1,14 @@
 """Model management command implementation."""
+import json
 import typer
+from typing import Optional
 from rich.console import Console
 from rich.table import Table
 from ..config_manager import (
     add_model_to_config,
     remove_model_from_config,
     set_active_model_in_config,
+    update_model_in_config,
     load_config,
 )
 
@@ -46,6 +49,25 @@ def activate_model(name: str = typer.Option(..., prompt=True)):
     typer.echo(f"模型 '{name}' 已激活。")
 
 
+@model_app.command("set")
+def set_model_option(
+    key: str = typer.Argument(..., help="配置项名称，例如 max_concurrency"),
+    value: str = typer.Argument(..., help="配置项的值，按 JSON 解析，失败时作为字符串"),
+    name: Optional[str] = typer.Option(None, "--name", "-n", help="模型名称，默认为当前激活的模型"),
+):
+    """修改模型的单个配置项"""
+    name = name or load_config()["active_model"]
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError:
+        parsed = value
+
+    if not name or not update_model_in_config(name, {key: parsed}):
+        typer.echo(f"错误：未找到模型 '{name}'。", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"模型 '{name}' 的 {key} 已设置为 {parsed!r}。")
+
+
 @model_app.command("list")
 def list_models():
     """列出所有可用的模型配置"""
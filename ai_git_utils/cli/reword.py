@@ -0,0 +1,84 @@
+"""Reword command implementation."""
+import typer
+from typing import Dict, Optional
+from ..config_manager import get_active_model
+from ..models.reword_plan import RewordCommit, RewordPlan
+
+
+def reword(
+    rev_range: str = typer.Argument(..., help="要重新生成提交信息的提交范围，例如 main.. 或 HEAD~5.."),
+    language: str = typer.Option("English", "--lang", "-l", help="设置语言（English/Chinese）"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="同时生成的提交数，默认使用模型配置 max_concurrency"),
+    rate: Optional[float] = typer.Option(None, "--rate", help="每分钟最多开始生成的提交数，默认使用模型配置 reword_rate_limit"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="不读取也不写入本地缓存"),
+    refresh: bool = typer.Option(False, "--refresh", help="忽略已缓存的结果并重新生成"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="不再确认，生成后直接改写"),
+):
+    """
+    为一段已有提交重新生成提交信息，并一次性改写这段历史
+    """
+    from git.exc import InvalidGitRepositoryError, GitCommandError
+    from ..services.commit_service import CommitService
+    from ..services.reword_service import RewordService
+    
+    active_config = get_active_model()
+    if not active_config:
+        typer.echo("错误：未找到激活的模型配置。请先运行 'aigit model add' 或 'aigit model active' 命令。")
+        raise typer.Exit(code=1)
+    
+    try:
+        service = RewordService.from_model_config(
+            active_config,
+            CommitService(use_cache=not no_cache, refresh=refresh),
+            jobs,
+            rate,
+        )
+        plan = service.plan(".", rev_range)
+        selected = plan.selected
+        if not selected:
+            typer.echo("没有需要改写的提交。")
+            return
+        
+        resumed = len(service.load_checkpoint(".", plan, language))
+        if resumed:
+            typer.echo(f"继续上次中断的改写，已有 {resumed} 个提交信息无需重新生成。")
+        typer.echo(f"正在为 {len(selected)} 个提交生成提交信息（最多同时 {service.workers} 个）...")
+        
+        progress = {"done": resumed}
+        
+        def on_message(commit: RewordCommit, message: Optional[str]) -> None:
+            progress["done"] += 1
+            typer.echo(f"[{progress['done']}/{len(selected)}] {commit.hexsha[:7]} {commit.subject}")
+        
+        messages = service.generate(".", plan, language, on_message)
+        
+        _show_plan(plan, messages)
+        if not yes and not typer.confirm(f"\n确认改写这 {len(selected)} 个提交？"):
+            typer.echo("改写已取消。已生成的提交信息已保存，重新运行时无需再次生成。")
+            return
+        
+        new_head = service.rewrite(".", plan, messages)
+        typer.echo(f"已改写 {len(selected)} 个提交的提交信息，HEAD 现在指向 {new_head[:7]}。")
+        typer.echo(f"如需撤销，运行 git reset --soft {plan.head[:7]}")
+    
+    except KeyboardInterrupt:
+        typer.echo("\n已中断。已生成的提交信息已保存，重新运行相同的命令即可继续。", err=True)
+        raise typer.Exit(code=130)
+    except InvalidGitRepositoryError:
+        typer.echo("错误：当前目录不是有效的Git仓库。", err=True)
+    except GitCommandError as e:
+        typer.echo(f"Git命令执行错误：{str(e)}", err=True)
+    except Exception as e:
+        typer.echo(f"错误：{str(e)}", err=True)
+        raise typer.Exit(code=1)
+
+
+def _show_plan(plan: RewordPlan, messages: Dict[str, Optional[str]]) -> None:
+    """Print the old and new subject of every selected commit."""
+    for commit in plan.selected:
+        message = messages.get(commit.hexsha)
+        typer.echo(f"\n{commit.hexsha[:7]} {commit.subject}")
+        if message is None:
+            typer.echo("  （没有更改，保留原提交信息）")
+        else:
+            typer.echo(f"  → {message.splitlines()[0] if message else ''}")
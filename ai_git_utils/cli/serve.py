@@ -0,0 +1,51 @@
+"""Serve command implementation."""
+import signal
+import sys
+import typer
+from typing import Optional
+
+
+def serve(
+    socket_path: Optional[str] = typer.Option(
+        None, "--socket", help="Unix socket 路径，默认 ~/.aigit/daemon.sock（也可设置 AIGIT_SOCKET）"
+    ),
+    stop: bool = typer.Option(False, "--stop", help="停止正在运行的守护进程"),
+):
+    """
+    启动常驻守护进程，aigit commit 会自动通过它生成提交信息
+    """
+    if stop:
+        _stop(socket_path)
+        return
+    
+    from ..daemon.server import DaemonServer
+    
+    server = DaemonServer(socket_path)
+    try:
+        server.bind()
+    except (RuntimeError, OSError) as e:
+        typer.echo(f"错误：{str(e)}", err=True)
+        raise typer.Exit(code=1)
+    
+    # SIGTERM 与 Ctrl+C 一样正常退出并删除套接字文件
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    typer.echo(f"aigit 守护进程已启动，监听 {server.path}（Ctrl+C 退出）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    typer.echo("aigit 守护进程已退出。")
+
+
+def _stop(socket_path: Optional[str]) -> None:
+    """Ask a running daemon to exit."""
+    from ..daemon.client import DaemonClient
+    
+    client = DaemonClient.connect(socket_path)
+    if client is None:
+        typer.echo("没有正在运行的 aigit 守护进程。")
+        return
+    client.shutdown()
+    typer.echo("已通知 aigit 守护进程退出。")
@@ -1,45 +1,113 @@
 import os
 import json
-from typing import Dict, Any
+import copy
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 CONFIG_FILE = os.path.expanduser("~/.aigit/model.json")
 
+# 进程内缓存：(路径, mtime, inode, 大小) 未变化时直接复用解析结果
+_cache: Dict[str, Any] = {"signature": None, "config": None}
+_cache_lock = threading.Lock()
+
+
+def _signature(path: str) -> Optional[Tuple[str, int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (path, st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+@contextmanager
+def _locked() -> Iterator[None]:
+    """Hold an exclusive advisory lock for a read-modify-write cycle."""
+    os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+    with open(CONFIG_FILE + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
 
 def load_config() -> Dict[str, Any]:
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
-    return {"models": {}, "active_model": None}
+    signature = _signature(CONFIG_FILE)
+    if signature is None:
+        return {"models": {}, "active_model": None}
+
+    with _cache_lock:
+        if _cache["signature"] != signature:
+            with open(CONFIG_FILE, "r") as f:
+                _cache["config"] = json.load(f)
+            _cache["signature"] = signature
+        return copy.deepcopy(_cache["config"])
 
 
 def save_config(config: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    directory = os.path.dirname(CONFIG_FILE)
+    os.makedirs(directory, exist_ok=True)
+    # 先写临时文件再原子替换，避免并发读取到写了一半的配置
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".model.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(config, f, indent=2)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, CONFIG_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    with _cache_lock:
+        _cache["signature"] = _signature(CONFIG_FILE)
+        _cache["config"] = copy.deepcopy(config)
 
 
 def add_model_to_config(name: str, model_config: Dict[str, Any]) -> None:
-    config = load_config()
-    config["models"][name] = model_config
-    if config["active_model"] is None:
-        config["active_model"] = name
-    save_config(config)
+    with _locked():
+        config = load_config()
+        config["models"][name] = model_config
+        if config["active_model"] is None:
+            config["active_model"] = name
+        save_config(config)
 
 
 def remove_model_from_config(name: str) -> None:
-    config = load_config()
-    if name in config["models"]:
-        del config["models"][name]
-        if config["active_model"] == name:
-            config["active_model"] = next(iter(config["models"]), None)
-        save_config(config)
+    with _locked():
+        config = load_config()
+        if name in config["models"]:
+            del config["models"][name]
+            if config["active_model"] == name:
+                config["active_model"] = next(iter(config["models"]), None)
+            save_config(config)
 
 
 def set_active_model_in_config(name: str) -> None:
-    config = load_config()
-    if name in config["models"]:
-        config["active_model"] = name
+    with _locked():
+        config = load_config()
+        if name in config["models"]:
+            config["active_model"] = name
+            save_config(config)
+
+
+def update_model_in_config(name: str, updates: Dict[str, Any]) -> bool:
+    with _locked():
+        config = load_config()
+        if name not in config["models"]:
+            return False
+        config["models"][name].update(updates)
         save_config(config)
+        return True
 
 
 def get_active_model() -> Dict[str, Any]:
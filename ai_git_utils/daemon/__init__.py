@@ -0,0 +1,5 @@
+"""Long-running ``aigit serve`` daemon and its thin client.
+
+Only ``protocol`` and ``client`` are imported by the CLI on the fast
+path; ``server`` pulls in the services and is loaded by ``aigit serve``.
+"""
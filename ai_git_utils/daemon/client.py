@@ -0,0 +1,156 @@
+"""Thin client forwarding ``aigit commit`` to a running daemon."""
+import socket
+from typing import Any, Callable, Dict, Optional
+from .. import __version__
+from .protocol import receive, send, socket_path
+
+# 守护进程未运行时连接会立即失败；只为卡住的守护进程设置上限
+CONNECT_TIMEOUT = 1.0
+
+
+class DaemonError(RuntimeError):
+    """An operation failed inside the daemon.
+
+    Attributes:
+        kind: Name of the exception raised in the daemon, e.g.
+            ``InvalidGitRepositoryError``
+    """
+
+    def __init__(self, kind: str, message: str):
+        """Initialize the error.
+
+        Args:
+            kind: Exception type name reported by the daemon
+            message: Error message reported by the daemon
+        """
+        super().__init__(message)
+        self.kind = kind
+
+
+class DaemonClient:
+    """Sends requests to ``aigit serve`` over its Unix socket.
+
+    Each request uses its own connection, so one client may be shared by
+    threads and a slow generation never blocks other requests.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the client.
+
+        Args:
+            path: Socket path, defaults to ``socket_path()``
+        """
+        self.path = path or socket_path()
+
+    @classmethod
+    def connect(cls, path: Optional[str] = None) -> Optional["DaemonClient"]:
+        """Return a client if a compatible daemon is listening.
+
+        Args:
+            path: Socket path, defaults to ``socket_path()``
+
+        Returns:
+            DaemonClient, or None when no daemon runs, the socket is stale
+            or the daemon runs a different aigit version
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        client = cls(path)
+        try:
+            reply = client.request("ping")
+        except (OSError, ValueError, DaemonError):
+            return None
+        return client if reply.get("version") == __version__ else None
+
+    def request(
+        self,
+        op: str,
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Send one request and wait for its result.
+
+        Args:
+            op: Operation name, e.g. ``draft`` or ``commit``
+            on_update: Receives the fields of every ``update`` event
+            params: Operation parameters
+
+        Returns:
+            The result message
+
+        Raises:
+            OSError: If the daemon cannot be reached
+            DaemonError: If the operation failed in the daemon
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(self.path)
+            # 生成提交信息可能耗时较长，连接建立后不再限制等待时间
+            sock.settimeout(None)
+            with sock.makefile("rwb") as stream:
+                send(stream, {"op": op, **params})
+                while True:
+                    message = receive(stream)
+                    if message is None:
+                        raise DaemonError("ConnectionError", "The daemon closed the connection.")
+                    event = message.get("event")
+                    if event == "update":
+                        if on_update is not None:
+                            on_update(message.get("fields", {}))
+                    elif event == "error":
+                        raise DaemonError(message.get("type", "Exception"), message.get("message", ""))
+                    else:
+                        return message
+
+    def draft(
+        self,
+        repo_path: str,
+        file_path: Optional[str] = None,
+        language: str = "English",
+        use_cache: bool = True,
+        refresh: bool = False,
+        race: bool = False,
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Stage the changes of ``repo_path`` and generate a message in the daemon.
+
+        Args:
+            repo_path: Absolute path of the repository
+            file_path: Optional specific file path
+            language: Output language for commit message
+            use_cache: Whether to reuse cached AI responses
+            refresh: Regenerate even if a cached response exists
+            race: Hedge the request across backup models
+            on_update: Streams partial fields into this callback
+
+        Returns:
+            ``{"message", "tree", "head"}`` of the draft, or None if there
+            are no changes
+        """
+        result = self.request(
+            "draft",
+            on_update=on_update,
+            repo=repo_path,
+            file=file_path,
+            language=language,
+            use_cache=use_cache,
+            refresh=refresh,
+            race=race,
+            stream=on_update is not None,
+        )
+        return result.get("draft")
+
+    def commit(self, repo_path: str, message: str, tree: str, head: Optional[str]) -> None:
+        """Commit a drafted tree with the final message.
+
+        Args:
+            repo_path: Absolute path of the repository
+            message: Edited commit message
+            tree: Tree from ``draft``
+            head: HEAD the tree was staged on, from ``draft``
+        """
+        self.request("commit", repo=repo_path, message=message, tree=tree, head=head)
+
+    def shutdown(self) -> None:
+        """Ask the daemon to exit."""
+        self.request("shutdown")
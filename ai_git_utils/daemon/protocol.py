@@ -0,0 +1,47 @@
+"""Wire format shared by ``aigit serve`` and its clients.
+
+Every message is one JSON object per line on a Unix stream socket. A
+client sends a single request ``{"op": ..., ...}`` per connection; the
+daemon answers with any number of ``{"event": "update"}`` messages
+followed by exactly one ``{"event": "result"}`` or ``{"event": "error"}``.
+"""
+import json
+import os
+from typing import Any, BinaryIO, Dict, Optional
+
+SOCKET_ENV = "AIGIT_SOCKET"
+DEFAULT_SOCKET = os.path.join("~", ".aigit", "daemon.sock")
+
+
+def socket_path() -> str:
+    """Path of the daemon socket, ``$AIGIT_SOCKET`` or ``~/.aigit/daemon.sock``."""
+    return os.path.expanduser(os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET)
+
+
+def send(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    """Write one message and flush it.
+
+    Args:
+        stream: Writable binary file of the socket
+        message: JSON-serializable message
+    """
+    stream.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def receive(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Read one message.
+
+    Args:
+        stream: Readable binary file of the socket
+
+    Returns:
+        The decoded message, or None if the peer closed the connection
+
+    Raises:
+        ValueError: If the line is not valid JSON
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
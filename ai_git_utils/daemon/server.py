@@ -0,0 +1,254 @@
+"""``aigit serve``: keeps imports, clients and repositories warm between commits."""
+import hashlib
+import json
+import os
+import socketserver
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+from git import Repo
+from .. import __version__
+from ..config_manager import get_active_model
+from ..models.commit_message import CommitMessage
+from ..models.staged_tree import StagedTree
+from ..services.client_registry import warm_up
+from ..services.commit_service import CommitService
+from .client import DaemonClient, DaemonError
+from .protocol import receive, send, socket_path
+
+T = TypeVar("T")
+
+
+class RequestCoalescer:
+    """Runs identical concurrent calls once and shares the outcome.
+
+    The first caller for a key runs the function; callers arriving with
+    the same key while it runs wait for and receive its result (or its
+    exception). Nothing is remembered once the call finished.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Call ``func`` unless an identical call is already running.
+
+        Args:
+            key: Identity of the call
+            func: Function producing the result
+
+        Returns:
+            Result of this call or of the identical call in flight
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+class _CoalescingCommitService(CommitService):
+    """CommitService whose model calls are shared by identical requests."""
+
+    def __init__(self, coalescer: RequestCoalescer, **options: Any):
+        super().__init__(**options)
+        self._coalescer = coalescer
+        self._options = options
+
+    def generate_commit_message(
+        self,
+        diff_output: str,
+        language: str = "English",
+        stream: Optional[bool] = None,
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> CommitMessage:
+        generate = super().generate_commit_message
+        key = json.dumps(
+            [
+                get_active_model(),
+                language,
+                {key: value for key, value in self._options.items() if key != "repos"},
+                hashlib.sha256(diff_output.encode("utf-8")).hexdigest(),
+            ],
+            sort_keys=True,
+        )
+        # 跟随者只拿到最终结果，不会收到流式的中间字段
+        return self._coalescer.run(
+            key, lambda: generate(diff_output, language, stream=False, on_update=on_update)
+        )
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, owner: "DaemonServer"):
+        self.owner = owner
+        super().__init__(path, _RequestHandler)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = receive(self.rfile)
+        except ValueError as e:
+            request = None
+            self._send({"event": "error", "type": "ValueError", "message": str(e)})
+        if request is None:
+            return
+        try:
+            self.server.owner.dispatch(request, self._send)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已退出（例如用户按下 Ctrl+C）
+            pass
+        except Exception as e:
+            self._send({"event": "error", "type": type(e).__name__, "message": str(e)})
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        try:
+            send(self.wfile, message)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DaemonServer:
+    """Serves ``draft`` and ``commit`` requests from ``aigit commit`` clients.
+
+    The process keeps ``openai``, ``git`` and ``rich`` imported, the model
+    configuration cached, one pooled HTTP client per endpoint and an open
+    Repo per repository. Identical requests that arrive while one is being
+    generated share a single model call. Editing and confirming the
+    message stay in the client, so hooks run here but editors do not.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the daemon.
+
+        Args:
+            path: Socket path, defaults to ``socket_path()``
+        """
+        self.path = path or socket_path()
+        self.repos: Dict[str, Repo] = {}
+        self.coalescer = RequestCoalescer()
+        self._server: Optional[_UnixServer] = None
+
+    def bind(self) -> None:
+        """Create the socket, replacing a stale one left by a dead daemon.
+
+        Raises:
+            RuntimeError: If another daemon is listening on the socket
+        """
+        if os.path.exists(self.path):
+            try:
+                DaemonClient(self.path).request("ping")
+            except (OSError, ValueError, DaemonError):
+                os.unlink(self.path)
+            else:
+                raise RuntimeError(f"Another daemon is already listening on {self.path}")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # 套接字只允许当前用户连接
+        umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(self.path, self)
+        finally:
+            os.umask(umask)
+
+        model_config = get_active_model()
+        if model_config:
+            warm_up(model_config)
+
+    def serve_forever(self) -> None:
+        """Handle requests until ``shutdown`` is called, then close the socket."""
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """Stop ``serve_forever`` from another thread."""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def close(self) -> None:
+        """Close the socket and remove its file."""
+        if self._server is None:
+            return
+        self._server.server_close()
+        self._server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def dispatch(self, request: Dict[str, Any], reply: Callable[[Dict[str, Any]], None]) -> None:
+        """Run one request and send its events through ``reply``.
+
+        Args:
+            request: Decoded request message
+            reply: Sends a message back to the client
+
+        Raises:
+            ValueError: If the operation is unknown
+        """
+        op = request.get("op")
+        if op == "ping":
+            reply({"event": "result", "version": __version__, "pid": os.getpid()})
+        elif op == "draft":
+            reply({"event": "result", "draft": self._draft(request, reply)})
+        elif op == "commit":
+            service = CommitService(repos=self.repos)
+            staged = StagedTree(request["tree"], request.get("head"))
+            service.commit_changes(request["repo"], request["message"], staged)
+            reply({"event": "result", "committed": True})
+        elif op == "shutdown":
+            reply({"event": "result"})
+            self.shutdown()
+        else:
+            raise ValueError(f"Unknown operation: {op!r}")
+
+    def _draft(
+        self,
+        request: Dict[str, Any],
+        reply: Callable[[Dict[str, Any]], None],
+    ) -> Optional[Dict[str, Any]]:
+        service = _CoalescingCommitService(
+            self.coalescer,
+            use_cache=request.get("use_cache", True),
+            refresh=request.get("refresh", False),
+            race=request.get("race", False),
+            repos=self.repos,
+        )
+
+        def on_update(fields: Dict[str, Any]) -> None:
+            reply({"event": "update", "fields": fields})
+
+        draft = service.draft_commit_message(
+            request["repo"],
+            request.get("file"),
+            request.get("language", "English"),
+            on_update=on_update if request.get("stream") else None,
+        )
+        if draft is None:
+            return None
+        return {
+            "message": draft.message.to_string(),
+            "tree": draft.staged.tree,
+            "head": draft.staged.head,
+        }
@@ -0,0 +1,120 @@
+"""Helpers for splitting and packing unified diffs."""
+import re
+from typing import List
+
+FILE_HEADER = "diff --git "
+HUNK_HEADER = "@@"
+
+_FILE_SPLIT_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+_HUNK_SPLIT_RE = re.compile(r"^(?=@@)", re.MULTILINE)
+# 含特殊字符（core.quotePath 开启时还包括非 ASCII 字符）的路径会被 git 加上引号并转义
+_FILE_PATH_RE = re.compile(
+    r'^diff --git (?:"a/(?:[^"\\]|\\.)*"|a/.*?) ("b/(?:[^"\\]|\\.)*"|b/.*)$', re.MULTILINE
+)
+_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13, '"': 34, "\\": 92}
+
+
+def split_diff_files(diff_output: str) -> List[str]:
+    """Split a multi-file diff into one diff per file.
+
+    Args:
+        diff_output: Git diff output
+
+    Returns:
+        List of per-file diffs, each starting with ``diff --git``
+    """
+    return [part for part in _FILE_SPLIT_RE.split(diff_output) if part.strip()]
+
+
+def diff_file_paths(diff_output: str) -> List[str]:
+    """List the paths after the change of every file in a diff.
+
+    Args:
+        diff_output: Git diff output
+
+    Returns:
+        The ``b/`` path of each ``diff --git`` header, in order, unquoted
+    """
+    return [unquote_path(path)[2:] for path in _FILE_PATH_RE.findall(diff_output)]
+
+
+def unquote_path(path: str) -> str:
+    """Undo git's C-style quoting of a path.
+
+    Args:
+        path: Path as printed by git, possibly in double quotes with
+            backslash and octal escapes
+
+    Returns:
+        The path itself; unquoted input is returned unchanged
+    """
+    if len(path) < 2 or not (path.startswith('"') and path.endswith('"')):
+        return path
+    raw = bytearray()
+    body = path[1:-1]
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char != "\\" or i + 1 == len(body):
+            raw += char.encode("utf-8")
+            i += 1
+        elif body[i + 1] in _ESCAPES:
+            raw.append(_ESCAPES[body[i + 1]])
+            i += 2
+        else:
+            # 非 ASCII 字节以三位八进制转义
+            raw.append(int(body[i + 1:i + 4], 8))
+            i += 4
+    return raw.decode("utf-8", errors="surrogateescape")
+
+
+def split_file_hunks(file_diff: str) -> List[str]:
+    """Split a single-file diff into its header and hunks.
+
+    Args:
+        file_diff: Diff of one file
+
+    Returns:
+        List whose first element is the file header and the rest are hunks
+    """
+    return _HUNK_SPLIT_RE.split(file_diff)
+
+
+def group_diff_chunks(diff_output: str, max_chars: int) -> List[str]:
+    """Pack a diff into chunks of at most ``max_chars`` characters.
+
+    Whole files are kept together when they fit. A file larger than
+    ``max_chars`` is split at hunk boundaries, repeating its header in
+    every chunk so each one stays a valid diff on its own.
+
+    Args:
+        diff_output: Git diff output
+        max_chars: Target maximum chunk size
+
+    Returns:
+        List of diff chunks in original order
+    """
+    pieces: List[str] = []
+    for file_diff in split_diff_files(diff_output):
+        if len(file_diff) <= max_chars:
+            pieces.append(file_diff)
+            continue
+        header, *hunks = split_file_hunks(file_diff)
+        part = header
+        for hunk in hunks:
+            if part != header and len(part) + len(hunk) > max_chars:
+                pieces.append(part)
+                part = header
+            part += hunk
+        pieces.append(part)
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,483 @@
+"""Pluggable backends for running git commands and reading objects."""
+import atexit
+import os
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from git import Repo
+from git.exc import GitCommandError
+
+GIT_BACKEND_ENV = "AIGIT_GIT_BACKEND"
+DEFAULT_BACKEND = "gitpython"
+
+# 空树对象，用于尚无提交的仓库
+EMPTY_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+LOCK_EXCLUDE = ":(exclude)*lock*"
+
+
+@dataclass
+class GitObject:
+    """A git object as reported by ``git cat-file``.
+
+    Attributes:
+        sha: Full object name
+        type: Object type (commit, tree, blob or tag)
+        size: Size of the object's content in bytes
+        data: Object content, None when only the header was requested
+    """
+    sha: str
+    type: str
+    size: int
+    data: Optional[bytes] = None
+
+
+def parse_object_header(line: bytes) -> Optional[GitObject]:
+    """Parse a ``<sha> <type> <size>`` header from ``git cat-file``.
+
+    Args:
+        line: Header line as written by ``--batch`` or ``--batch-check``
+
+    Returns:
+        GitObject without data, or None for ``missing``/``ambiguous`` replies
+    """
+    fields = line.decode("utf-8", errors="replace").split()
+    if len(fields) != 3 or not fields[2].isdigit():
+        return None
+    return GitObject(fields[0], fields[1], int(fields[2]))
+
+
+class GitBackend:
+    """Runs git on behalf of ``git_operations``.
+
+    This implementation goes through GitPython's ``repo.git`` wrapper and
+    spawns one git process per call. Subclasses may replace individual
+    operations with cheaper mechanisms.
+    """
+
+    name = "gitpython"
+
+    def __init__(self, repo: Repo):
+        """Initialize the backend.
+
+        Args:
+            repo: Git repository
+        """
+        self.repo = repo
+
+    def run(
+        self,
+        command: str,
+        *args: str,
+        strip: bool = True,
+        env: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Run ``git <command> <args>`` and return its output.
+
+        Args:
+            command: Git subcommand, e.g. ``diff``
+            args: Arguments for the subcommand
+            strip: Strip the trailing newline of the output
+            env: Extra environment variables for git
+
+        Returns:
+            Decoded standard output
+
+        Raises:
+            GitCommandError: If git exits with an error
+        """
+        method = getattr(self.repo.git, command.replace("-", "_"))
+        return method(*args, strip_newline_in_stdout=strip, env=env)
+
+    def iter_lines(
+        self,
+        command: str,
+        *args: str,
+        env: Optional[Dict[str, str]] = None,
+    ) -> Iterator[str]:
+        """Stream the output lines of ``git <command> <args>``.
+
+        The git process is killed if the caller stops iterating early.
+
+        Args:
+            command: Git subcommand
+            args: Arguments for the subcommand
+            env: Extra environment variables for git
+
+        Yields:
+            Decoded lines without the trailing newline
+
+        Raises:
+            GitCommandError: If git exits with an error
+        """
+        method = getattr(self.repo.git, command.replace("-", "_"))
+        process = method(*args, as_process=True, env=env)
+        finished = False
+        try:
+            for raw_line in process.stdout:
+                yield raw_line.decode("utf-8", errors="replace").rstrip("\n")
+            finished = True
+            process.wait()
+        finally:
+            if not finished and process.proc is not None:
+                # 调用方提前停止迭代，结束 git 进程而不是读完剩余输出
+                process.proc.kill()
+                process.proc.wait()
+
+    def diff_args(self, staged: bool, paths: List[str], binary: bool = False) -> List[str]:
+        """Arguments for diffing the index or the working tree.
+
+        Args:
+            staged: Diff the index against HEAD instead of the working tree
+                against the index
+            paths: Pathspecs limiting the diff
+            binary: Include binary patches
+
+        Returns:
+            Command name followed by its arguments
+        """
+        args = ["diff"]
+        if staged:
+            args.append("--staged")
+        if binary:
+            args.append("--binary")
+        return args + paths
+
+    def worktree_diff_args(self, paths: List[str]) -> List[str]:
+        """Arguments for diffing the working tree against HEAD.
+
+        Staged and unstaged changes to tracked files are both included and
+        the index is only read, never refreshed or rewritten.
+
+        Args:
+            paths: Pathspecs limiting the diff
+
+        Returns:
+            Command name followed by its arguments
+        """
+        return ["diff", self._base_tree(), "--"] + paths
+
+    def tree_diff_args(
+        self,
+        base: Optional[str],
+        tree: str,
+        paths: List[str],
+        options: Sequence[str] = (),
+    ) -> List[str]:
+        """Arguments for diffing two tree objects.
+
+        Args:
+            base: Tree or commit to diff from, the empty tree if None
+            tree: Tree or commit to diff to
+            paths: Pathspecs limiting the diff
+            options: Extra diff options, e.g. ``--unified=1``
+
+        Returns:
+            Command name followed by its arguments
+        """
+        return ["diff", *options, base or EMPTY_TREE_SHA, tree, "--"] + paths
+
+    def tree_numstat_args(
+        self,
+        base: Optional[str],
+        tree: str,
+        paths: List[str],
+        options: Sequence[str] = (),
+    ) -> List[str]:
+        """Arguments for NUL-separated per-file line counts between two trees.
+
+        Args:
+            base: Tree or commit to diff from, the empty tree if None
+            tree: Tree or commit to diff to
+            paths: Pathspecs limiting the diff
+            options: Extra diff options, e.g. ``--find-renames``
+
+        Returns:
+            Command name followed by its arguments
+        """
+        return ["diff", "--numstat", "-z", *options, base or EMPTY_TREE_SHA, tree, "--"] + paths
+
+    def commit_diff_args(self, commit: str, options: Sequence[str] = ()) -> List[str]:
+        """Arguments for the diff introduced by ``commit``.
+
+        Args:
+            commit: Commit to diff against its parent
+            options: Extra diff options, e.g. ``--word-diff=color``
+
+        Returns:
+            Command name followed by its arguments
+        """
+        return ["diff", *options, f"{commit}^!"]
+
+    def object_info(self, name: str) -> Optional[GitObject]:
+        """Look up an object's type and size without reading it.
+
+        Args:
+            name: Object name or revision expression
+
+        Returns:
+            GitObject without data, or None if it does not exist
+        """
+        obj, _ = self._cat_file_once("--batch-check", name)
+        return obj
+
+    def read_object(self, name: str) -> Optional[GitObject]:
+        """Read an object's content.
+
+        Args:
+            name: Object name or revision expression
+
+        Returns:
+            GitObject with data, or None if it does not exist
+        """
+        obj, rest = self._cat_file_once("--batch", name)
+        if obj is not None:
+            obj.data = rest[:obj.size]
+        return obj
+
+    def read_objects(self, names: Sequence[str]) -> List[Optional[GitObject]]:
+        """Read the content of several objects with one ``git cat-file --batch``.
+
+        Args:
+            names: Object names or revision expressions
+
+        Returns:
+            GitObject with data for every name, None for those that do not exist
+        """
+        if not names:
+            return []
+        request = "".join(f"{name}\n" for name in names).encode("utf-8")
+        process = self.repo.git.cat_file("--batch", istream=subprocess.PIPE, as_process=True)
+        output, _ = process.proc.communicate(request)
+        objects: List[Optional[GitObject]] = []
+        offset = 0
+        for _ in names:
+            end = output.index(b"\n", offset)
+            obj = parse_object_header(output[offset:end])
+            offset = end + 1
+            if obj is not None:
+                obj.data = output[offset:offset + obj.size]
+                offset += obj.size + 1
+            objects.append(obj)
+        return objects
+
+    @contextmanager
+    def object_writer(self, obj_type: str) -> Iterator[Callable[[bytes], str]]:
+        """Store objects through one long-lived ``git hash-object -w --stdin-paths``.
+
+        Git checks and writes every object itself, so the repository's
+        object format, fsync settings and alternates apply. Each object
+        is named before the next one is written, so an object may refer
+        to the ones written before it.
+
+        Args:
+            obj_type: Object type, e.g. ``commit``
+
+        Yields:
+            Function storing the raw content of an object and returning its name
+
+        Raises:
+            GitCommandError: If git rejects an object
+        """
+        with tempfile.TemporaryDirectory(prefix="aigit-") as tmp_dir:
+            path = os.path.join(tmp_dir, "object")
+            handle = self.repo.git.hash_object(
+                "-w", "-t", obj_type, "--stdin-paths", istream=subprocess.PIPE, as_process=True
+            )
+            process = handle.proc
+
+            def write(data: bytes) -> str:
+                # 每次等 git 返回对象名后才覆盖临时文件
+                with open(path, "wb") as f:
+                    f.write(data)
+                process.stdin.write(path.encode("utf-8") + b"\n")
+                process.stdin.flush()
+                name = process.stdout.readline().decode("ascii").strip()
+                if not name:
+                    raise GitCommandError(
+                        ["git", "hash-object", "-t", obj_type], process.wait(), process.stderr.read()
+                    )
+                return name
+
+            try:
+                yield write
+            finally:
+                process.stdin.close()
+                process.wait()
+
+    def _base_tree(self) -> str:
+        return "HEAD" if self.repo.head.is_valid() else EMPTY_TREE_SHA
+
+    def _cat_file_once(self, mode: str, name: str) -> Tuple[Optional[GitObject], bytes]:
+        """Run a short-lived ``git cat-file`` for a single object."""
+        if not name or "\n" in name:
+            return None, b""
+        process = self.repo.git.cat_file(mode, istream=subprocess.PIPE, as_process=True)
+        output, _ = process.proc.communicate(name.encode("utf-8") + b"\n")
+        header, _, rest = output.partition(b"\n")
+        return parse_object_header(header), rest
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class PersistentGitBackend(GitBackend):
+    """Backend that keeps long-lived ``git cat-file`` processes.
+
+    Object lookups are written to one ``git cat-file --batch-check`` and
+    one ``git cat-file --batch`` process that live as long as the backend,
+    so reading thousands of objects costs no extra fork/exec. Diffs use
+    the plumbing commands ``diff-index``, ``diff-files`` and ``diff-tree``,
+    which skip porcelain configuration such as external diff drivers and
+    textconv.
+    """
+
+    name = "persistent"
+
+    def __init__(self, repo: Repo):
+        """Initialize the backend.
+
+        Args:
+            repo: Git repository
+        """
+        super().__init__(repo)
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._handles: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def diff_args(self, staged: bool, paths: List[str], binary: bool = False) -> List[str]:
+        if staged:
+            args = ["diff-index", "-p", "-M", "--cached"]
+            if binary:
+                args.append("--binary")
+            return args + [self._base_tree(), "--"] + paths
+        args = ["diff-files", "-p"]
+        if binary:
+            args.append("--binary")
+        return args + ["--"] + paths
+
+    def worktree_diff_args(self, paths: List[str]) -> List[str]:
+        return ["diff-index", "-p", "-M", self._base_tree(), "--"] + paths
+
+    def tree_diff_args(
+        self,
+        base: Optional[str],
+        tree: str,
+        paths: List[str],
+        options: Sequence[str] = (),
+    ) -> List[str]:
+        return ["diff-tree", "-p", "-M", *options, base or EMPTY_TREE_SHA, tree, "--"] + paths
+
+    def tree_numstat_args(
+        self,
+        base: Optional[str],
+        tree: str,
+        paths: List[str],
+        options: Sequence[str] = (),
+    ) -> List[str]:
+        return [
+            "diff-tree", "-r", "-M", "--numstat", "-z", *options,
+            base or EMPTY_TREE_SHA, tree, "--",
+        ] + paths
+
+    def commit_diff_args(self, commit: str, options: Sequence[str] = ()) -> List[str]:
+        # --root 让首个提交与空树比较；合并提交与第一个父提交比较
+        return [
+            "diff-tree", "-p", "-M", "--no-commit-id", "--root", "-m", "--first-parent",
+            *options, commit,
+        ]
+
+    def object_info(self, name: str) -> Optional[GitObject]:
+        with self._lock:
+            header = self._request("--batch-check", name)
+        return header
+
+    def read_object(self, name: str) -> Optional[GitObject]:
+        with self._lock:
+            info = self._request("--batch", name)
+            if info is None:
+                return None
+            stdout = self._processes["--batch"].stdout
+            info.data = stdout.read(info.size)
+            stdout.read(1)
+        return info
+
+    def read_objects(self, names: Sequence[str]) -> List[Optional[GitObject]]:
+        return [self.read_object(name) for name in names]
+
+    def close(self) -> None:
+        with self._lock:
+            processes = list(self._processes.values())
+            self._processes.clear()
+            self._handles.clear()
+        for process in processes:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except Exception:
+                process.kill()
+
+    def _request(self, mode: str, name: str) -> Optional[GitObject]:
+        """Send ``name`` to the ``cat-file`` process for ``mode`` and read the header."""
+        if not name or "\n" in name:
+            return None
+        process = self._process(mode)
+        process.stdin.write(name.encode("utf-8") + b"\n")
+        process.stdin.flush()
+        return parse_object_header(process.stdout.readline())
+
+    def _process(self, mode: str) -> subprocess.Popen:
+        process = self._processes.get(mode)
+        if process is None or process.poll() is not None:
+            handle = self.repo.git.cat_file(mode, istream=subprocess.PIPE, as_process=True)
+            # 保留 AutoInterrupt 包装对象，进程随后端一起回收
+            self._handles[mode] = handle
+            process = self._processes[mode] = handle.proc
+        return process
+
+
+BACKENDS = {
+    GitBackend.name: GitBackend,
+    PersistentGitBackend.name: PersistentGitBackend,
+}
+
+_backends: Dict[str, GitBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(repo: Repo, name: Optional[str] = None) -> GitBackend:
+    """Return the shared backend for ``repo``.
+
+    Args:
+        repo: Git repository
+        name: Backend name; defaults to ``$AIGIT_GIT_BACKEND`` or ``gitpython``
+
+    Returns:
+        Backend instance, reused for every call on the same repository
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = name or os.environ.get(GIT_BACKEND_ENV) or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown git backend: {name}")
+    key = f"{name}:{os.path.realpath(repo.git_dir)}"
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = _backends[key] = BACKENDS[name](repo)
+        return backend
+
+
+def clear_backends() -> None:
+    """Close every shared backend and its processes."""
+    with _backends_lock:
+        backends = list(_backends.values())
+        _backends.clear()
+    for backend in backends:
+        backend.close()
+
+
+atexit.register(clear_backends)
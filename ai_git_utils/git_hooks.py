@@ -0,0 +1,119 @@
+"""Git hooks that let aigit prepare commit messages ahead of ``git commit``."""
+import os
+import shlex
+import sys
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from git import Repo
+
+# 标记由 aigit 安装的钩子，卸载和覆盖时只处理带有该标记的文件
+HOOK_MARKER = "# Installed by aigit hook install"
+# aigit 自身暂存或提交时设置，post-index-change 钩子据此跳过预生成
+PREGENERATE_GUARD_ENV = "AIGIT_NO_PREGENERATE"
+# 钩子名称与对应的 aigit hook 子命令
+HOOK_COMMANDS = {
+    "prepare-commit-msg": "prepare-commit-msg",
+    "post-index-change": "pregenerate",
+}
+
+
+def hook_script(name: str, language: str = "English") -> str:
+    """Shell script for one of aigit's hooks.
+
+    ``prepare-commit-msg`` runs in the foreground and fills in the
+    message. ``post-index-change`` starts a detached pregeneration worker
+    and returns at once, so ``git add`` never waits for it; index writes
+    made by aigit itself or by the worker do not start another worker.
+
+    Args:
+        name: Hook name, a key of ``HOOK_COMMANDS``
+        language: Output language for commit messages
+
+    Returns:
+        Script text
+    """
+    command = " ".join([
+        shlex.quote(sys.executable), "-m", "ai_git_utils.main",
+        "hook", HOOK_COMMANDS[name], "--lang", shlex.quote(language),
+    ])
+    lines = ["#!/bin/sh", HOOK_MARKER]
+    if name == "post-index-change":
+        lines += [
+            f'[ -n "${PREGENERATE_GUARD_ENV}" ] && exit 0',
+            f"{command} </dev/null >/dev/null 2>&1 &",
+            "exit 0",
+        ]
+    else:
+        lines.append(f'exec {command} "$@"')
+    return "\n".join(lines) + "\n"
+
+
+def hooks_dir(repo: "Repo") -> str:
+    """Directory git runs hooks from, honouring ``core.hooksPath``.
+
+    Args:
+        repo: Git repository
+
+    Returns:
+        Absolute path of the hooks directory
+    """
+    path = repo.git.rev_parse("--git-path", "hooks")
+    return os.path.join(repo.working_dir, path)
+
+
+def is_aigit_hook(path: str) -> bool:
+    """Whether ``path`` is a hook installed by aigit."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return HOOK_MARKER in f.read()
+    except FileNotFoundError:
+        return False
+
+
+def install_hooks(repo: "Repo", language: str = "English", force: bool = False) -> List[str]:
+    """Install the ``prepare-commit-msg`` and ``post-index-change`` hooks.
+
+    Args:
+        repo: Git repository
+        language: Output language for commit messages
+        force: Replace hooks that were not installed by aigit
+
+    Returns:
+        Paths of the installed hooks
+
+    Raises:
+        FileExistsError: If a hook of another tool exists and ``force`` is off
+    """
+    directory = hooks_dir(repo)
+    paths = [os.path.join(directory, name) for name in HOOK_COMMANDS]
+    if not force:
+        for path in paths:
+            if os.path.exists(path) and not is_aigit_hook(path):
+                raise FileExistsError(f"{path} was not installed by aigit")
+
+    os.makedirs(directory, exist_ok=True)
+    for name, path in zip(HOOK_COMMANDS, paths):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(hook_script(name, language))
+        os.chmod(path, 0o755)
+    return paths
+
+
+def uninstall_hooks(repo: "Repo") -> List[str]:
+    """Remove the hooks installed by aigit, leaving other hooks alone.
+
+    Args:
+        repo: Git repository
+
+    Returns:
+        Paths of the removed hooks
+    """
+    directory = hooks_dir(repo)
+    removed = []
+    for name in HOOK_COMMANDS:
+        path = os.path.join(directory, name)
+        if is_aigit_hook(path):
+            os.unlink(path)
+            removed.append(path)
+    return removed
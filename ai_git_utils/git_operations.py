@@ -1,19 +1,711 @@
-from git import Repo
-from typing import Optional
+import os
+import re
+import shutil
+import tempfile
+import threading
+from git import Commit, Repo
+from git.index.fun import run_commit_hook
+from typing import Dict, Iterator, List, Optional, Sequence
+from .git_backend import LOCK_EXCLUDE, get_backend
+from .models.file_stat import FileStat
+from .models.log_entry import LogEntry
+from .models.reword_plan import RewordCommit, RewordPlan
+from .models.staged_tree import StagedTree
+from .tracing import annotate, span
+
+# 只读操作禁止 git 顺便刷新并写回 .git/index
+READ_ONLY_ENV = {"GIT_OPTIONAL_LOCKS": "0"}
+# 相当于 git -c core.quotePath=false：非 ASCII 路径原样输出，便于模型阅读和解析
+UNQUOTED_PATHS_ENV = {
+    "GIT_CONFIG_COUNT": "1",
+    "GIT_CONFIG_KEY_0": "core.quotePath",
+    "GIT_CONFIG_VALUE_0": "false",
+}
+# 与 git 相同，只检查文件开头判断是否为二进制
+UNTRACKED_BINARY_PROBE = 8000
+
+# 字段之间使用 ASCII 单元分隔符，避免与作者名或提交信息冲突
+LOG_FIELD_SEPARATOR = "\x1f"
+LOG_FORMAT = LOG_FIELD_SEPARATOR.join(["%H", "%an", "%cd", "%s"])
+LOG_DATE_FORMAT = "format:%Y-%m-%d %H:%M:%S"
+# git 会给不带时间的日期补上当前时刻，这里显式补成当天的开始或结束
+_BARE_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+REWORD_FORMAT = LOG_FIELD_SEPARATOR.join(["%H", "%T", "%P", "%s"])
+# 改写提交信息后签名不再有效，与 git rebase 一样去掉
+SIGNATURE_HEADERS = (b"gpgsig", b"gpgsig-sha256")
+
+# 同一进程内并发的暂存和提交（例如 aigit serve）会争用 .git/index.lock
+_index_locks: Dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
 
 
 def get_git_diff(repo: Repo, staged: bool = False, file_path: Optional[str] = None):
-    exclude_pattern = ":(exclude)*lock*"
-    if staged:
-        return repo.git.diff("--staged", file_path, exclude_pattern)
-    else:
-        return repo.git.diff(file_path, exclude_pattern)
+    backend = get_backend(repo)
+    with span("git.diff", staged=staged):
+        return backend.run(*backend.diff_args(staged, _diff_paths(file_path)))
 
 
 def commit_changes(repo: Repo, commit_message: str):
-    repo.git.add(A=True)
-    repo.index.commit(commit_message)
+    commit_staged_tree(repo, stage_changes(repo), commit_message)
+
+
+def stage_changes(repo: Repo) -> StagedTree:
+    """Stage every change once and write the index out as a tree.
+
+    Args:
+        repo: Git repository
+
+    Returns:
+        StagedTree recording the written tree and the current HEAD
+    """
+    with _index_lock(repo):
+        with span("git.add"):
+            repo.git.add(A=True)
+        with span("git.write_tree"):
+            head = repo.head.commit.hexsha if repo.head.is_valid() else None
+            return StagedTree(repo.git.write_tree(), head)
+
+
+def write_index_tree(repo: Repo, index_path: Optional[str] = None) -> StagedTree:
+    """Write the index out as a tree without staging anything or locking it.
+
+    A copy of the index is written, so a concurrent ``git add`` never
+    finds ``.git/index.lock`` taken and ``.git/index`` is left as it is.
+
+    Args:
+        repo: Git repository
+        index_path: Index to read, defaults to ``$GIT_INDEX_FILE`` (set
+            for hooks run by ``git commit``) or the repository's index
+
+    Returns:
+        StagedTree of the index contents and the current HEAD
+    """
+    index_path = index_path or os.environ.get("GIT_INDEX_FILE") or os.path.join(repo.git_dir, "index")
+    fd, copy_path = tempfile.mkstemp(prefix="aigit-", suffix=".index")
+    os.close(fd)
+    try:
+        try:
+            shutil.copyfile(os.path.abspath(index_path), copy_path)
+        except FileNotFoundError:
+            # 尚未暂存过任何文件，不存在的索引文件按空索引处理
+            os.unlink(copy_path)
+        with span("git.write_tree"):
+            head = repo.head.commit.hexsha if repo.head.is_valid() else None
+            tree = get_backend(repo).run("write-tree", env={"GIT_INDEX_FILE": copy_path})
+        return StagedTree(tree, head)
+    finally:
+        for path in (copy_path, copy_path + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def get_staged_tree_diff(
+    repo: Repo,
+    staged: StagedTree,
+    file_path: Optional[str] = None,
+    options: Sequence[str] = (),
+    exclude: Optional[Sequence[str]] = None,
+) -> str:
+    """Diff a staged tree against the HEAD it was staged on.
+
+    Args:
+        repo: Git repository
+        staged: Snapshot from ``stage_changes``
+        file_path: Optional specific file path
+        options: Extra diff options, e.g. ``--unified=1``
+        exclude: Exclude pathspecs replacing the default lock file exclusion
+
+    Returns:
+        Diff of exactly the content that ``commit_staged_tree`` will commit
+    """
+    backend = get_backend(repo)
+    with span("git.diff", staged=True):
+        diff = backend.run(
+            *backend.tree_diff_args(staged.head, staged.tree, _diff_paths(file_path, exclude), options),
+            env=UNQUOTED_PATHS_ENV,
+        )
+        annotate(chars=len(diff))
+    return diff
+
+
+def get_staged_tree_numstat(
+    repo: Repo,
+    staged: StagedTree,
+    file_path: Optional[str] = None,
+    options: Sequence[str] = (),
+) -> List[FileStat]:
+    """Count the changed lines of every file in a staged tree.
+
+    Nothing is excluded, so the result also covers files that
+    ``get_staged_tree_diff`` leaves out.
+
+    Args:
+        repo: Git repository
+        staged: Snapshot from ``stage_changes``
+        file_path: Optional specific file path
+        options: Extra diff options, e.g. ``--find-renames``
+
+    Returns:
+        One FileStat per changed file, in git's order
+    """
+    backend = get_backend(repo)
+    paths = [file_path] if file_path else []
+    with span("git.numstat"):
+        output = backend.run(*backend.tree_numstat_args(staged.head, staged.tree, paths, options))
+    return parse_numstat(output)
+
+
+def parse_numstat(output: str) -> List[FileStat]:
+    """Parse the output of ``git diff --numstat -z``.
+
+    Args:
+        output: NUL-separated numstat output
+
+    Returns:
+        One FileStat per file; renames and copies carry the new path
+    """
+    fields = output.split("\0")
+    stats = []
+    i = 0
+    while i < len(fields):
+        entry = fields[i].strip("\n")
+        i += 1
+        if not entry:
+            continue
+        added, deleted, path = entry.split("\t", 2)
+        if not path:
+            # 重命名和复制：原路径与新路径作为随后的两个字段
+            path = fields[i + 1]
+            i += 2
+        stats.append(FileStat(
+            path,
+            None if added == "-" else int(added),
+            None if deleted == "-" else int(deleted),
+        ))
+    return stats
+
+
+def commit_staged_tree(repo: Repo, staged: StagedTree, commit_message: str) -> Commit:
+    """Commit a staged tree on top of the HEAD it was staged on.
+
+    The tree is committed as recorded, so files changed or staged after
+    ``stage_changes`` are left out of the commit rather than picked up.
+    Hooks run as for ``IndexFile.commit``.
+
+    Args:
+        repo: Git repository
+        staged: Snapshot from ``stage_changes``
+        commit_message: Commit message to use
+
+    Returns:
+        The new commit, which HEAD now points to
+
+    Raises:
+        RuntimeError: If HEAD moved since the tree was staged
+        HookExecutionError: If a commit hook rejects the commit
+    """
+    with _index_lock(repo):
+        return _commit_staged_tree(repo, staged, commit_message)
+
+
+def _commit_staged_tree(repo: Repo, staged: StagedTree, commit_message: str) -> Commit:
+    head = repo.head.commit.hexsha if repo.head.is_valid() else None
+    if head != staged.head:
+        # 在旧 HEAD 上生成的树提交到新 HEAD 会撤销期间的提交
+        raise RuntimeError("HEAD moved since the changes were staged; run the commit again.")
+
+    index = repo.index
+    with span("git.hooks", hooks="pre-commit,commit-msg"):
+        run_commit_hook("pre-commit", index)
+        message_path = os.path.join(repo.git_dir, "COMMIT_EDITMSG")
+        with open(message_path, "w", encoding="utf-8") as f:
+            f.write(commit_message)
+        run_commit_hook("commit-msg", index, message_path)
+        with open(message_path, "r", encoding="utf-8") as f:
+            commit_message = f.read()
+
+    with span("git.commit"):
+        parents = [repo.commit(staged.head)] if staged.head else []
+        commit = Commit.create_from_tree(
+            repo, repo.tree(staged.tree), commit_message, parents, head=True
+        )
+    with span("git.hooks", hooks="post-commit"):
+        run_commit_hook("post-commit", index)
+    return commit
+
+
+def get_staged_patch(repo: Repo) -> str:
+    """Return the complete staged diff as an applicable patch.
+
+    Unlike ``get_git_diff`` nothing is excluded and binary changes are
+    included, so applying every part of the patch reproduces the index.
+
+    Args:
+        repo: Git repository
+
+    Returns:
+        Output of ``git diff --staged --binary`` with its trailing newline
+    """
+    backend = get_backend(repo)
+    with span("git.diff", staged=True, binary=True):
+        return backend.run(*backend.diff_args(True, [], binary=True), strip=False)
+
+
+def reset_index(repo: Repo, tree: Optional[str] = None) -> None:
+    """Reset the index to ``tree`` without touching the work tree.
+
+    Without ``tree`` the index is reset to ``HEAD``, or emptied before
+    the first commit.
+    """
+    if tree is not None:
+        repo.git.read_tree(tree)
+    elif repo.head.is_valid():
+        repo.git.read_tree("HEAD")
+    else:
+        repo.git.read_tree("--empty")
+
+
+def apply_to_index(repo: Repo, patch: str) -> None:
+    """Apply ``patch`` to the index only, like ``git apply --cached``.
+
+    Args:
+        repo: Git repository
+        patch: Patch text produced by ``git diff --binary``
+
+    Raises:
+        GitCommandError: If the patch does not apply
+    """
+    fd, patch_path = tempfile.mkstemp(prefix="aigit-", suffix=".patch")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(patch)
+        repo.git.apply("--cached", patch_path)
+    finally:
+        os.unlink(patch_path)
+
+
+def write_patch_trees(repo: Repo, base: Optional[str], patches: Sequence[str]) -> List[str]:
+    """Apply ``patches`` one after another and write a tree after each.
+
+    The patches are applied to a temporary index, so neither
+    ``.git/index`` nor the work tree is touched.
+
+    Args:
+        repo: Git repository
+        base: Tree or commit the first patch applies to, the empty tree if None
+        patches: Patch texts produced by ``git diff --binary``
+
+    Returns:
+        The tree after each patch, in the order of ``patches``
+
+    Raises:
+        GitCommandError: If a patch does not apply
+    """
+    backend = get_backend(repo)
+    fd, index_path = tempfile.mkstemp(prefix="aigit-", suffix=".index")
+    os.close(fd)
+    os.unlink(index_path)
+    env = {"GIT_INDEX_FILE": index_path}
+    patch_fd, patch_path = tempfile.mkstemp(prefix="aigit-", suffix=".patch")
+    os.close(patch_fd)
+    try:
+        backend.run("read-tree", base or "--empty", env=env)
+        trees = []
+        for patch in patches:
+            with open(patch_path, "w", encoding="utf-8", newline="") as f:
+                f.write(patch)
+            backend.run("apply", "--cached", patch_path, env=env)
+            trees.append(backend.run("write-tree", env=env))
+        return trees
+    finally:
+        for path in (index_path, index_path + ".lock", patch_path):
+            if os.path.exists(path):
+                os.unlink(path)
 
 
 def get_commit_diff(repo: Repo, commit_hash: str):
-    return repo.git.diff(f"{commit_hash}^!", "--word-diff=color")
+    backend = get_backend(repo)
+    return backend.run(*backend.commit_diff_args(commit_hash, ["--word-diff=color"]))
+
+
+def read_commit_message(repo: Repo, rev: str) -> Optional[str]:
+    """Read the full message of a commit through the git backend.
+
+    Args:
+        repo: Git repository
+        rev: Commit name or revision expression
+
+    Returns:
+        Commit message, or None if ``rev`` is not a commit
+    """
+    obj = get_backend(repo).read_object(rev)
+    if obj is None or obj.type != "commit":
+        return None
+    _, _, message = obj.data.partition(b"\n\n")
+    return message.decode("utf-8", errors="replace")
+
+
+def plan_reword(repo: Repo, rev_range: str) -> RewordPlan:
+    """List the commits to rewrite for new messages in ``rev_range``.
+
+    Every commit between the range and HEAD is part of the plan, since
+    changing a message changes the hash of all its descendants. Merge
+    commits in the range keep their message.
+
+    Args:
+        repo: Git repository
+        rev_range: Revision range as understood by ``git rev-list``,
+            e.g. ``main..`` or ``HEAD~5..HEAD``
+
+    Returns:
+        RewordPlan, parents first
+
+    Raises:
+        ValueError: If HEAD has no commits or the range is not part of
+            the history of HEAD
+        GitCommandError: If the range is invalid
+    """
+    if rev_range.startswith("-"):
+        raise ValueError(f"Invalid revision range: {rev_range}")
+    if not repo.head.is_valid():
+        raise ValueError("HEAD has no commits to reword")
+    head = repo.head.commit.hexsha
+    backend = get_backend(repo)
+
+    with span("git.rev_list", range=rev_range):
+        selected, boundary = set(), []
+        for line in backend.run("rev-list", "--boundary", rev_range).splitlines():
+            if line.startswith("-"):
+                boundary.append(line[1:])
+            elif line:
+                selected.add(line)
+
+        # 从范围的边界重写到 HEAD，范围之后的提交只更换父提交
+        args = ["--reverse", "--topo-order", f"--format={REWORD_FORMAT}", head]
+        if boundary:
+            args += ["--not"] + boundary
+        commits = []
+        for line in iter_log_lines(repo, args):
+            hexsha, tree, parents, subject = line.split(LOG_FIELD_SEPARATOR, 3)
+            parent_list = parents.split()
+            commits.append(RewordCommit(
+                hexsha, tree, parent_list, subject,
+                selected=hexsha in selected and len(parent_list) <= 1,
+            ))
+        annotate(commits=len(commits), selected=len(selected))
+
+    if not selected.issubset(commit.hexsha for commit in commits):
+        raise ValueError(f"{rev_range} is not part of the history of HEAD")
+    return RewordPlan(rev_range, head, commits)
+
+
+def rewrite_messages(repo: Repo, plan: RewordPlan, messages: Dict[str, Optional[str]]) -> str:
+    """Recreate the commits of ``plan`` with new messages in a single pass.
+
+    Each commit object is copied with its tree, author, committer and
+    dates; only the message and the parents change, and signatures are
+    dropped since they no longer match. The commits are read with one
+    ``git cat-file --batch`` and written with one ``git hash-object``
+    (see ``GitBackend.object_writer``) instead of a git process per
+    commit. HEAD is moved once at the end and only if it still points to
+    ``plan.head``; the work tree and the index are left alone because
+    every tree stays the same.
+
+    Args:
+        repo: Git repository
+        plan: Plan from ``plan_reword``
+        messages: New messages by commit hash; commits without one (or
+            with None) keep their message
+
+    Returns:
+        Hash of the new HEAD
+
+    Raises:
+        GitCommandError: If HEAD moved since the plan was made
+    """
+    backend = get_backend(repo)
+    rewritten: Dict[str, str] = {}
+    with span("git.rewrite", commits=len(plan.commits)), backend.object_writer("commit") as write:
+        originals = backend.read_objects([commit.hexsha for commit in plan.commits])
+        for commit, original in zip(plan.commits, originals):
+            parents = [rewritten.get(parent, parent) for parent in commit.parents]
+            message = messages.get(commit.hexsha)
+            if parents == commit.parents and message is None:
+                continue
+            rewritten[commit.hexsha] = write(_reworded_commit(original.data, parents, message))
+
+        new_head = rewritten.get(plan.head, plan.head)
+        if new_head != plan.head:
+            # 带上旧值，期间 HEAD 被移动时 git 拒绝更新
+            backend.run(
+                "update-ref", "-m", f"aigit reword {plan.rev_range}", "HEAD", new_head, plan.head
+            )
+    return new_head
+
+
+def expand_log_date(value: str, end_of_day: bool = False) -> str:
+    """Give a bare ``YYYY-MM-DD`` date an explicit time of day.
+
+    Without a time git uses the current time of day, so ``--until`` would
+    drop the rest of that day depending on when the command runs.
+
+    Args:
+        value: ``--since``/``--until`` value as given by the user
+        end_of_day: Use the last second of the day instead of midnight
+
+    Returns:
+        The value with ``00:00:00`` or ``23:59:59`` appended to a bare
+        date, any other value unchanged
+    """
+    value = value.strip()
+    if not _BARE_DATE_RE.match(value):
+        return value
+    return f"{value} {'23:59:59' if end_of_day else '00:00:00'}"
+
+
+def build_log_args(
+    limit: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    author: Optional[str] = None,
+    grep: Optional[str] = None,
+    paths: Optional[List[str]] = None,
+) -> List[str]:
+    """Translate log filters into ``git log`` arguments.
+
+    Args:
+        limit: Maximum number of commits
+        since: Only commits after this date
+        until: Only commits before this date
+        author: Only commits whose author matches this pattern
+        grep: Only commits whose message matches this pattern
+        paths: Only commits touching these paths
+
+    Returns:
+        Argument list for ``git log``
+    """
+    args = [f"--format={LOG_FORMAT}", f"--date={LOG_DATE_FORMAT}"]
+    if limit is not None:
+        args.append(f"--max-count={limit}")
+    if since:
+        args.append(f"--since={expand_log_date(since)}")
+    if until:
+        args.append(f"--until={expand_log_date(until, end_of_day=True)}")
+    if author:
+        args.append(f"--author={author}")
+    if grep:
+        args.append(f"--grep={grep}")
+    if paths:
+        args.append("--")
+        args.extend(paths)
+    return args
+
+
+def iter_log(
+    repo: Repo,
+    limit: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    author: Optional[str] = None,
+    grep: Optional[str] = None,
+    paths: Optional[List[str]] = None,
+) -> Iterator[LogEntry]:
+    """Stream log entries from a single ``git log`` process.
+
+    Filtering and limiting are done by git, so memory and latency grow with
+    ``limit`` rather than with the size of the history.
+
+    Args:
+        repo: Git repository
+        limit: Maximum number of commits
+        since: Only commits after this date
+        until: Only commits before this date
+        author: Only commits whose author matches this pattern
+        grep: Only commits whose message matches this pattern
+        paths: Only commits touching these paths
+
+    Yields:
+        LogEntry for each matching commit, newest first
+
+    Raises:
+        GitCommandError: If git log fails
+    """
+    args = build_log_args(limit, since, until, author, grep, paths)
+    for line in iter_log_lines(repo, args):
+        hexsha, author_name, date, subject = line.split(LOG_FIELD_SEPARATOR, 3)
+        yield LogEntry(hexsha, author_name, date, subject)
+
+
+def iter_log_lines(repo: Repo, args: List[str]) -> Iterator[str]:
+    """Stream the non-empty output lines of ``git log`` with ``args``.
+
+    Args:
+        repo: Git repository
+        args: Arguments for ``git log``
+
+    Yields:
+        Decoded output lines without the trailing newline
+
+    Raises:
+        GitCommandError: If git log fails
+    """
+    lines = get_backend(repo).iter_lines("log", *args)
+    try:
+        for line in lines:
+            if line:
+                yield line
+    finally:
+        lines.close()
+
+
+def iter_git_diff(
+    repo: Repo,
+    staged: bool = False,
+    file_path: Optional[str] = None
+) -> Iterator[str]:
+    """Stream the lines of ``get_git_diff`` as git produces them.
+
+    Args:
+        repo: Git repository
+        staged: Diff the index instead of the working tree
+        file_path: Optional specific file path
+
+    Yields:
+        Diff lines without the trailing newline
+
+    Raises:
+        GitCommandError: If git diff fails
+    """
+    backend = get_backend(repo)
+    return backend.iter_lines(*backend.diff_args(staged, _diff_paths(file_path)))
+
+
+def iter_worktree_diff(repo: Repo, file_path: Optional[str] = None) -> Iterator[str]:
+    """Stream every change in the working tree without touching the index.
+
+    Tracked files are diffed against HEAD, covering staged and unstaged
+    changes alike; untracked files that are not ignored follow as new-file
+    diffs. Git's fsmonitor and untracked cache are used when configured,
+    and optional index lock writes are disabled, so ``.git/index`` is
+    never rewritten.
+
+    Args:
+        repo: Git repository
+        file_path: Optional specific file path
+
+    Yields:
+        Diff lines without the trailing newline
+
+    Raises:
+        GitCommandError: If a git command fails
+    """
+    backend = get_backend(repo)
+    paths = _diff_paths(file_path)
+    yield from backend.iter_lines(*backend.worktree_diff_args(paths), env=READ_ONLY_ENV)
+
+    untracked = backend.run(
+        "ls-files", "--others", "--exclude-standard", "-z", "--", *paths, env=READ_ONLY_ENV
+    )
+    paths = [path for path in untracked.split("\0") if path]
+    if not paths:
+        return
+    # core.fileMode=false 时 git 不记录可执行位，新文件一律按 100644 显示
+    file_mode = repo.config_reader().get_value("core", "filemode", True)
+    for path in paths:
+        yield from _untracked_file_diff(repo.working_dir, path, file_mode)
+
+
+def iter_commit_diff(repo: Repo, commit_hash: str) -> Iterator[str]:
+    """Stream the diff introduced by ``commit_hash`` line by line.
+
+    Args:
+        repo: Git repository
+        commit_hash: Commit to show
+
+    Yields:
+        Diff lines without the trailing newline
+
+    Raises:
+        GitCommandError: If git diff fails
+    """
+    backend = get_backend(repo)
+    return backend.iter_lines(*backend.commit_diff_args(commit_hash))
+
+
+def _index_lock(repo: Repo) -> threading.Lock:
+    """Process-wide lock serializing index writes of one repository."""
+    with _index_locks_guard:
+        return _index_locks.setdefault(repo.git_dir, threading.Lock())
+
+
+def _reworded_commit(data: bytes, parents: List[str], message: Optional[str]) -> bytes:
+    """Raw commit object ``data`` with new parents and, if given, a new message."""
+    header, _, body = data.partition(b"\n\n")
+    lines = []
+    skipping = False
+    for line in header.split(b"\n"):
+        if line.startswith(b" "):
+            # 多行头部（例如签名）的续行
+            if not skipping:
+                lines.append(line)
+            continue
+        key = line.split(b" ", 1)[0]
+        # 新信息以 UTF-8 写入，原有的 encoding 头部不再适用
+        skipping = key == b"parent" or key in SIGNATURE_HEADERS or (
+            message is not None and key == b"encoding"
+        )
+        if not skipping:
+            lines.append(line)
+        if key == b"tree":
+            lines += [b"parent " + parent.encode("ascii") for parent in parents]
+    if message is not None:
+        body = message.rstrip("\n").encode("utf-8") + b"\n"
+    return b"\n".join(lines) + b"\n\n" + body
+
+
+def _diff_paths(file_path: Optional[str], exclude: Optional[Sequence[str]] = None) -> List[str]:
+    paths = [file_path] if file_path else []
+    return paths + (list(exclude) if exclude is not None else [LOCK_EXCLUDE])
+
+
+def _untracked_file_diff(working_dir: str, path: str, file_mode: bool = True) -> Iterator[str]:
+    """Render an untracked file as a new-file diff, reading it line by line."""
+    full_path = os.path.join(working_dir, path)
+    yield f"diff --git a/{path} b/{path}"
+    if os.path.islink(full_path):
+        yield "new file mode 120000"
+        yield "--- /dev/null"
+        yield f"+++ b/{path}"
+        yield "@@ -0,0 +1 @@"
+        yield f"+{os.readlink(full_path)}"
+        yield "\\ No newline at end of file"
+        return
+
+    executable = file_mode and os.access(full_path, os.X_OK)
+    yield f"new file mode {'100755' if executable else '100644'}"
+    try:
+        f = open(full_path, "rb")
+    except OSError:
+        return
+    with f:
+        if b"\0" in f.read(UNTRACKED_BINARY_PROBE):
+            yield f"Binary files /dev/null and b/{path} differ"
+            return
+        # 先数出行数写入 hunk 头部，再逐行输出，整个文件不会同时读入内存
+        f.seek(0)
+        count = 0
+        last = b""
+        for last in f:
+            count += 1
+        if not count:
+            return
+        f.seek(0)
+        yield "--- /dev/null"
+        yield f"+++ b/{path}"
+        yield f"@@ -0,0 +1{'' if count == 1 else f',{count}'} @@"
+        for line in f:
+            if line.endswith(b"\n"):
+                line = line[:-1]
+            yield "+" + line.decode("utf-8", errors="replace")
+    if not last.endswith(b"\n"):
+        yield "\\ No newline at end of file"
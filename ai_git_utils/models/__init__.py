@@ -1,5 +1,10 @@
 """Data models module."""
+from .commit_draft import CommitDraft
 from .commit_message import CommitMessage
 from .config import ModelConfig
+from .file_stat import FileStat
+from .log_entry import LogEntry
+from .reword_plan import RewordCommit, RewordPlan
+from .staged_tree import StagedTree
 
-__all__ = ["CommitMessage", "ModelConfig"]
\ No newline at end of file
+__all__ = ["CommitDraft", "CommitMessage", "ModelConfig", "FileStat", "LogEntry", "RewordCommit", "RewordPlan", "StagedTree"]
@@ -0,0 +1,16 @@
+"""Generated commit message waiting to be edited and committed."""
+from dataclasses import dataclass
+from .commit_message import CommitMessage
+from .staged_tree import StagedTree
+
+
+@dataclass
+class CommitDraft:
+    """A generated commit message together with the tree it describes.
+
+    Attributes:
+        message: Message generated from the staged tree's diff
+        staged: Snapshot that ``commit_changes`` commits
+    """
+    message: CommitMessage
+    staged: StagedTree
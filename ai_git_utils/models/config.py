@@ -1,5 +1,5 @@
 """Configuration data models."""
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from typing import Dict, Any
 
 
@@ -12,11 +12,14 @@ class ModelConfig:
         base_url: The base URL for the API endpoint
         temperature: The temperature parameter for the model
         api_key: The API key for authentication
+        options: Optional tuning settings such as ``max_concurrency``,
+            ``map_reduce_threshold`` or ``map_chunk_size``
     """
     model: str
     base_url: str
     temperature: float
     api_key: str
+    options: Dict[str, Any] = field(default_factory=dict)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ModelConfig":
@@ -28,7 +31,9 @@ class ModelConfig:
         Returns:
             ModelConfig instance
         """
-        return cls(**data)
+        known = {f.name for f in fields(cls)} - {"options"}
+        options = {k: v for k, v in data.items() if k not in known}
+        return cls(**{k: v for k, v in data.items() if k in known}, options=options)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert ModelConfig to dictionary.
@@ -41,4 +46,5 @@ class ModelConfig:
             "base_url": self.base_url,
             "temperature": self.temperature,
             "api_key": self.api_key,
-        }
\ No newline at end of file
+            **self.options,
+        }
@@ -0,0 +1,27 @@
+"""Per-file change counts as reported by ``git diff --numstat``."""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class FileStat:
+    """Lines added and deleted in one file.
+
+    Attributes:
+        path: Path of the file after the change
+        added: Lines added, None for binary files
+        deleted: Lines deleted, None for binary files
+    """
+    path: str
+    added: Optional[int]
+    deleted: Optional[int]
+
+    @property
+    def binary(self) -> bool:
+        """Whether git reported the file as binary."""
+        return self.added is None
+
+    @property
+    def changed_lines(self) -> int:
+        """Lines added plus lines deleted, 0 for binary files."""
+        return (self.added or 0) + (self.deleted or 0)
@@ -0,0 +1,18 @@
+"""Git log entry data model."""
+from dataclasses import dataclass
+
+
+@dataclass
+class LogEntry:
+    """A single row of ``git log`` output.
+
+    Attributes:
+        hexsha: Full commit hash
+        author: Author name
+        date: Committer date formatted as ``YYYY-MM-DD HH:MM:SS``
+        subject: First line of the commit message
+    """
+    hexsha: str
+    author: str
+    date: str
+    subject: str
@@ -0,0 +1,46 @@
+"""Commits selected for ``aigit reword`` and the history rewritten with them."""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class RewordCommit:
+    """A commit between the reworded range and HEAD.
+
+    Attributes:
+        hexsha: Commit hash
+        tree: Tree of the commit
+        parents: Parent commit hashes
+        subject: First line of the current message
+        selected: Whether a new message is generated for the commit
+    """
+    hexsha: str
+    tree: str
+    parents: List[str]
+    subject: str
+    selected: bool = False
+
+    @property
+    def base(self) -> Optional[str]:
+        """First parent the commit's diff is taken against, None for a root commit."""
+        return self.parents[0] if self.parents else None
+
+
+@dataclass
+class RewordPlan:
+    """Commits to rewrite so the range gets new messages.
+
+    Attributes:
+        rev_range: Revision range given by the user, e.g. ``main..``
+        head: Commit HEAD pointed to when the plan was made
+        commits: Every commit from the range up to HEAD, parents first;
+            commits after the range keep their message but get new parents
+    """
+    rev_range: str
+    head: str
+    commits: List[RewordCommit] = field(default_factory=list)
+
+    @property
+    def selected(self) -> List[RewordCommit]:
+        """Commits whose message is regenerated, parents first."""
+        return [commit for commit in self.commits if commit.selected]
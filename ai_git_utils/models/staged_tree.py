@@ -0,0 +1,15 @@
+"""Snapshot of the index taken when changes are staged."""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class StagedTree:
+    """The index written out as a tree, together with the HEAD it builds on.
+
+    Attributes:
+        tree: Tree object written from the index
+        head: Commit HEAD pointed to when staging, None before the first commit
+    """
+    tree: str
+    head: Optional[str]
@@ -0,0 +1,102 @@
+"""Interactive terminal pager over lazily produced items."""
+from itertools import islice
+from typing import Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+import typer
+from rich.console import Console, RenderableType
+from rich.text import Text
+
+T = TypeVar("T")
+
+NEXT_KEYS = {" ", "j", "n", "\r", "\n", "\x1b[B", "\x1b[6~"}
+PREVIOUS_KEYS = {"b", "k", "p", "\x1b[A", "\x1b[5~"}
+QUIT_KEYS = {"q", "Q", "\x1b", "\x03"}
+
+
+class Pager(Generic[T]):
+    """Shows items one screen at a time, fetching each page on demand.
+
+    Items are pulled from the iterator only when the user pages past what
+    has been fetched, so the first screen costs at most two pages
+    regardless of how many items the iterator could produce. Output that
+    fits on one page is printed directly, like ``less -F``. Pages already
+    seen are kept for paging back, up to ``max_pages`` of them.
+    """
+
+    def __init__(
+        self,
+        items: Iterator[T],
+        render_page: Callable[[List[T], int], RenderableType],
+        page_size: int,
+        console: Optional[Console] = None,
+        read_key: Callable[[], str] = typer.getchar,
+        max_pages: Optional[int] = None,
+    ):
+        """Initialize the pager.
+
+        Args:
+            items: Lazily produced items to page through
+            render_page: Renders a page given its items and the index of
+                its first item
+            page_size: Items per page
+            console: Console to draw on
+            read_key: Returns the next key press
+            max_pages: Pages kept for paging back, unlimited if None
+        """
+        self.items = items
+        self.render_page = render_page
+        self.page_size = max(1, page_size)
+        self.console = console or Console()
+        self.read_key = read_key
+        # 当前页与预取的下一页必须同时保留
+        self.max_pages = max(2, max_pages) if max_pages is not None else None
+        self.pages: Dict[int, List[T]] = {}
+        self.fetched = 0
+        self.exhausted = False
+
+    def run(self) -> None:
+        """Page through the items until the user quits or input ends."""
+        current = 0
+        try:
+            if not self._fetch(current):
+                return
+            if not self._fetch(current + 1):
+                self.console.print(self.render_page(self.pages[current], 0))
+                return
+            with self.console.screen():
+                while True:
+                    self._draw(current)
+                    key = self.read_key()
+                    if key in QUIT_KEYS:
+                        return
+                    if key in NEXT_KEYS and self._fetch(current + 1):
+                        current += 1
+                    elif key in PREVIOUS_KEYS and current - 1 in self.pages:
+                        current -= 1
+        finally:
+            close = getattr(self.items, "close", None)
+            if close is not None:
+                # 提前退出时结束生成器，例如停止仍在输出的 git 进程
+                close()
+
+    def _fetch(self, page: int) -> bool:
+        """Make sure ``page`` is loaded; return False if it does not exist."""
+        while self.fetched <= page and not self.exhausted:
+            items = list(islice(self.items, self.page_size))
+            if items:
+                self.pages[self.fetched] = items
+                self.fetched += 1
+                if self.max_pages is not None and len(self.pages) > self.max_pages:
+                    # 只保留最近的页面，内存占用与输出总量无关
+                    del self.pages[min(self.pages)]
+            if len(items) < self.page_size:
+                self.exhausted = True
+        return page in self.pages
+
+    def _draw(self, current: int) -> None:
+        self.console.clear()
+        self.console.print(self.render_page(self.pages[current], current * self.page_size))
+        end = "（结束）" if self.exhausted and current == self.fetched - 1 else ""
+        self.console.print(Text(
+            f"第 {current + 1} 页{end}  空格/j 下一页  b/k 上一页  q 退出",
+            style="dim",
+        ))
@@ -1,6 +1,19 @@
 """Services module."""
-from .ai_service import AIService
-from .commit_service import CommitService
-from .prompt_builder import PromptBuilder
+import importlib
 
-__all__ = ["AIService", "CommitService", "PromptBuilder"]
\ No newline at end of file
+# 按需导入：只用到缓存或提示词的代码（例如 git 钩子）不必加载 openai
+_EXPORTS = {
+    "AIService": ".ai_service",
+    "CommitService": ".commit_service",
+    "PromptBuilder": ".prompt_builder",
+    "ResponseCache": ".response_cache",
+    "RewordService": ".reword_service",
+}
+
+__all__ = ["AIService", "CommitService", "PromptBuilder", "ResponseCache", "RewordService"]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
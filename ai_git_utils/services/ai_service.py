@@ -1,21 +1,61 @@
 """AI service for generating commit messages."""
-from openai import OpenAI
+import json
+import threading
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
 from ..models.commit_message import CommitMessage
-from ..config_manager import get_active_model
-from .prompt_builder import PromptBuilder
+from ..config_manager import get_active_model, load_config
+from ..tracing import annotate, mark, span
+from .client_registry import get_client
+from .diff_budgeter import DEFAULT_MAX_DIFF_TOKENS
+from .hedging import DEFAULT_HEDGE_DELAY, RequestCancelled, run_hedged
+from .resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable
+from .prompt_builder import DEFAULT_PROMPT_VARIANT, PromptBuilder
+from .response_cache import ResponseCache
+from .split_planner import ChangeUnit, SplitPlanner
+from .stream_parser import CommitMessageStreamParser
+
+# 决定发送给模型的 diff 和提示词的配置项，都计入响应缓存键
+PROMPT_OPTIONS = (
+    "max_diff_tokens",
+    "normalize_diff",
+    "diff_context",
+    "exclude",
+    "exclude_gitattributes",
+    "max_file_lines",
+    "map_reduce_threshold",
+    "map_chunk_size",
+)
 
 
 class AIService:
     """Service for interacting with AI models."""
     
-    def __init__(self):
-        """Initialize AI service."""
+    def __init__(
+        self,
+        use_cache: bool = True,
+        refresh: bool = False,
+        race: bool = False,
+    ):
+        """Initialize AI service.
+        
+        Args:
+            use_cache: Whether to read and write the on-disk response cache
+            refresh: Ignore cached responses but still store new ones
+            race: Hedge requests to backup models after ``hedge_delay``
+        """
         self.prompt_builder = PromptBuilder()
+        self.cache = ResponseCache() if use_cache else None
+        self.refresh = refresh
+        self.race = race
+        self.circuit_breaker = CircuitBreaker()
     
     def generate_commit_message(
         self,
         diff_output: str,
-        language: str = "English"
+        language: str = "English",
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        summaries: Optional[List[str]] = None,
     ) -> CommitMessage:
         """
         Generate commit message from git diff using AI.
@@ -23,6 +63,11 @@ class AIService:
         Args:
             diff_output: Git diff output
             language: Output language (English/Chinese)
+            on_update: If given, the response is streamed and this callback
+                receives the partially parsed fields whenever one completes;
+                ignored when a hedged race is run
+            summaries: Per-chunk summaries of ``diff_output``; when given they
+                are sent instead of the raw diff (map-reduce reduce step)
             
         Returns:
             Generated CommitMessage object
@@ -31,33 +76,376 @@ class AIService:
             ValueError: If no active model is configured
             RuntimeError: If AI API call fails
         """
-        model_config = get_active_model()
-        if not model_config:
-            raise ValueError("No active model configured")
+        model_config = self._require_model()
+        
+        cache_key = self._cache_key(model_config, diff_output, language)
+        if cache_key is not None and not self.refresh:
+            with span("ai.cache"):
+                cached = self.cache.get(cache_key)
+                annotate(hit=cached is not None)
+            if cached is not None:
+                return CommitMessage(**cached)
         
-        system_prompt = self.prompt_builder.build_system_prompt(language)
-        user_prompt = self.prompt_builder.build_user_prompt(diff_output)
+        with span("ai.prompt", diff_chars=len(diff_output)):
+            system_prompt = self.prompt_builder.build_system_prompt(
+                language,
+                model_config.get('prompt_variant', DEFAULT_PROMPT_VARIANT),
+            )
+            max_tokens = model_config.get('max_diff_tokens', DEFAULT_MAX_DIFF_TOKENS)
+            if summaries is None:
+                user_prompt = self.prompt_builder.build_user_prompt(diff_output, max_tokens)
+            else:
+                user_prompt = self.prompt_builder.build_reduce_user_prompt(summaries)
+            annotate(prompt_chars=len(system_prompt) + len(user_prompt))
         
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
         
-        client = OpenAI(
-            base_url=model_config.get('base_url'),
-            api_key=model_config.get('api_key'),
-        )
+        backups = self._backup_models(model_config) if self.race else []
+        if backups:
+            commit_message = run_hedged(
+                [model_config] + backups,
+                lambda config, cancelled: self._request_hedged(config, messages, cancelled),
+                model_config.get('hedge_delay', DEFAULT_HEDGE_DELAY),
+            )
+        else:
+            commit_message = self._request_with_failover(model_config, messages, on_update)
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, asdict(commit_message))
+        return commit_message
+    
+    def get_cached_commit_message(
+        self,
+        diff_output: str,
+        language: str = "English"
+    ) -> Optional[CommitMessage]:
+        """
+        Look up a previously generated commit message without calling AI.
+        
+        Args:
+            diff_output: Git diff output
+            language: Output language (English/Chinese)
+            
+        Returns:
+            Cached CommitMessage, or None if caching is off, refresh was
+            requested or nothing is cached
+        """
+        model_config = self._require_model()
+        cache_key = self._cache_key(model_config, diff_output, language)
+        if cache_key is None or self.refresh:
+            return None
+        cached = self.cache.get(cache_key)
+        return CommitMessage(**cached) if cached is not None else None
+    
+    def summarize_diff(self, diff_chunk: str, language: str = "English") -> str:
+        """
+        Summarize one chunk of a large diff (map-reduce map step).
+        
+        Args:
+            diff_chunk: Part of a git diff
+            language: Output language (English/Chinese)
+            
+        Returns:
+            Plain-text summary of the chunk
+            
+        Raises:
+            ValueError: If no active model is configured
+        """
+        model_config = self._require_model()
+        messages = [
+            {"role": "system", "content": self.prompt_builder.build_map_system_prompt(language)},
+            {"role": "user", "content": self.prompt_builder.build_user_prompt(
+                diff_chunk,
+                model_config.get('max_diff_tokens', DEFAULT_MAX_DIFF_TOKENS),
+            )}
+        ]
+        response = self._create_completion(model_config, messages, json_mode=False)
+        return (response.choices[0].message.content or "").strip()
+    
+    def suggest_groups(
+        self,
+        units: List[ChangeUnit],
+        suggested: List[List[int]],
+    ) -> Optional[List[List[int]]]:
+        """
+        Ask the model how to group change units into separate commits.
         
-        response = client.chat.completions.create(
-            extra_headers={"X-Title": "AIGit"},
-            extra_body={},
-            model=model_config.get('model'),
-            messages=messages,
-            temperature=model_config.get('temperature'),
-            response_format={'type': 'json_object'}
+        Args:
+            units: Change units of the staged diff
+            suggested: Heuristic grouping the model may refine
+            
+        Returns:
+            The model's groups of unit indexes, or None if the request
+            failed or the answer was not a valid partition of the units
+        """
+        model_config = self._require_model()
+        messages = [
+            {"role": "system", "content": self.prompt_builder.build_split_system_prompt()},
+            {"role": "user", "content": self.prompt_builder.build_split_user_prompt(units, suggested)}
+        ]
+        try:
+            response = self._create_completion(model_config, messages)
+            data = json.loads(response.choices[0].message.content or "")
+        except Exception:
+            # 分组只是优化，失败时退回启发式结果
+            return None
+        groups = data.get("groups") if isinstance(data, dict) else None
+        return SplitPlanner.validate_groups(groups, len(units))
+    
+    def _request_with_failover(
+        self,
+        model_config: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        on_update: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> CommitMessage:
+        """
+        Request a commit message, failing over to backup models.
+        
+        A model is skipped when its circuit is open or when it still fails
+        with a retryable error after its retry policy is exhausted.
+        
+        Args:
+            model_config: Active model configuration
+            messages: Chat messages to send
+            on_update: Optional streaming callback
+            
+        Returns:
+            Parsed CommitMessage
+            
+        Raises:
+            RuntimeError: If every model is unavailable
+        """
+        candidates = [model_config]
+        backups_loaded = False
+        last_error: Optional[Exception] = None
+        index = 0
+        while index < len(candidates):
+            config = candidates[index]
+            index += 1
+            try:
+                if on_update is None:
+                    response = self._create_completion(config, messages, json_mode=True)
+                    response_text = response.choices[0].message.content
+                else:
+                    response_text = self._create_completion(
+                        config,
+                        messages,
+                        json_mode=True,
+                        consume=lambda stream: self._consume_stream(stream, on_update),
+                    )
+            except Exception as e:
+                if not (isinstance(e, CircuitOpenError) or is_retryable(e)):
+                    raise
+                last_error = e
+                if not backups_loaded:
+                    # 只有在主模型失败时才读取备用模型
+                    candidates.extend(self._backup_models(model_config))
+                    backups_loaded = True
+                continue
+            
+            return self._parse_response(response_text)
+        
+        raise RuntimeError(f"All configured models failed: {last_error}") from last_error
+    
+    def _backup_models(self, model_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Resolve the backup models used for hedging and failover.
+        
+        Args:
+            model_config: Active model configuration
+            
+        Returns:
+            Configurations named in ``backup_models`` (or the older
+            ``hedge_models``), or every other configured model when
+            neither key is set
+        """
+        config = load_config()
+        names = model_config.get('backup_models', model_config.get('hedge_models'))
+        if names is None:
+            names = [name for name in config["models"] if name != config["active_model"]]
+        return [config["models"][name] for name in names if name in config["models"]]
+    
+    def _request_hedged(
+        self,
+        model_config: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        cancelled: threading.Event,
+    ) -> CommitMessage:
+        """
+        Perform one request of a hedged race.
+        
+        The response is streamed so that the request can be aborted between
+        chunks as soon as another model has produced a valid answer.
+        
+        Args:
+            model_config: Model configuration to query
+            messages: Chat messages to send
+            cancelled: Set once another request has won
+            
+        Returns:
+            Validated CommitMessage
+            
+        Raises:
+            RequestCancelled: If another request won first
+        """
+        def read(stream) -> str:
+            parts = []
+            with span("ai.stream", model=model_config.get('model')):
+                for chunk in stream:
+                    if cancelled.is_set():
+                        raise RequestCancelled()
+                    self._annotate_usage(getattr(chunk, "usage", None))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        mark("ttft_ms")
+                        parts.append(chunk.choices[0].delta.content)
+            return "".join(parts)
+        
+        return self._parse_response(
+            self._create_completion(model_config, messages, json_mode=True, consume=read)
         )
+    
+    def _require_model(self) -> Dict[str, Any]:
+        """Return the active model config or raise if none is configured."""
+        model_config = get_active_model()
+        if not model_config:
+            raise ValueError("No active model configured")
+        return model_config
+    
+    def _cache_key(
+        self,
+        model_config: Dict[str, Any],
+        diff_output: str,
+        language: str
+    ) -> Optional[str]:
+        """Build the response cache key, or None if caching is disabled."""
+        if self.cache is None:
+            return None
+        return ResponseCache.make_key(
+            diff_output,
+            model_config.get('model'),
+            model_config.get('base_url'),
+            model_config.get('temperature'),
+            language,
+            self.prompt_builder.prompt_version(
+                model_config.get('prompt_variant', DEFAULT_PROMPT_VARIANT)
+            ),
+            {name: model_config.get(name) for name in PROMPT_OPTIONS},
+        )
+    
+    def _create_completion(
+        self,
+        model_config: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        json_mode: bool = True,
+        consume: Optional[Callable[[Any], Any]] = None,
+    ):
+        """
+        Send a chat completion request to the configured model.
+        
+        With ``consume`` the response is streamed and read by it. The
+        request only succeeds, for retries and the circuit breaker, once
+        the whole stream was read; a connection dropped halfway is retried
+        from the start.
+        
+        Args:
+            model_config: Model configuration dictionary
+            messages: Chat messages to send
+            json_mode: Request a JSON object response
+            consume: Reads the stream of chunks of a streamed response
+            
+        Returns:
+            Completion response, or the result of ``consume`` when streaming
+            
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+        """
+        endpoint = f"{model_config.get('base_url')} {model_config.get('model')}"
+        if not self.circuit_breaker.allow(endpoint):
+            raise CircuitOpenError(f"Circuit open for {endpoint}")
+        
+        client = get_client(model_config)
         
-        return self._parse_response(response.choices[0].message.content)
+        extra: Dict[str, Any] = {}
+        if json_mode:
+            extra["response_format"] = {'type': 'json_object'}
+        
+        stream = consume is not None
+        
+        def attempt():
+            # 流式请求在收到响应头时返回，之后的输出计入 ai.stream
+            with span("ai.request", model=model_config.get('model'), stream=stream):
+                response = client.chat.completions.create(
+                    extra_headers={"X-Title": "AIGit"},
+                    extra_body={},
+                    model=model_config.get('model'),
+                    messages=messages,
+                    temperature=model_config.get('temperature'),
+                    stream=stream,
+                    **extra,
+                )
+                if not stream:
+                    self._annotate_usage(getattr(response, "usage", None))
+                    return response
+            try:
+                return consume(response)
+            finally:
+                close = getattr(response, "close", None)
+                if close is not None:
+                    close()
+        
+        try:
+            result = RetryPolicy.from_model_config(model_config).call(attempt)
+        except Exception as e:
+            if is_retryable(e):
+                self.circuit_breaker.record_failure(endpoint)
+            raise
+        self.circuit_breaker.record_success(endpoint)
+        return result
+    
+    def _consume_stream(
+        self,
+        stream,
+        on_update: Callable[[Dict[str, Any]], None],
+    ) -> str:
+        """
+        Read a streamed completion, reporting fields as they complete.
+        
+        Args:
+            stream: Iterable of chat completion chunks
+            on_update: Callback receiving a copy of the parsed fields
+            
+        Returns:
+            The full response text
+        """
+        parser = CommitMessageStreamParser()
+        with span("ai.stream"):
+            for chunk in stream:
+                self._annotate_usage(getattr(chunk, "usage", None))
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    mark("ttft_ms")
+                if content and parser.feed(content):
+                    on_update({
+                        key: list(value) if isinstance(value, list) else value
+                        for key, value in parser.fields.items()
+                    })
+        return parser.buffer
+    
+    @staticmethod
+    def _annotate_usage(usage) -> None:
+        """Attach the token usage reported by the API to the current span."""
+        if usage is None:
+            return
+        annotate(**{
+            key: getattr(usage, key)
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+            if isinstance(getattr(usage, key, None), int)
+        })
     
     def _parse_response(self, response_text: str) -> CommitMessage:
         """
@@ -73,8 +461,9 @@ class AIService:
             RuntimeError: If response cannot be parsed as JSON
         """
         import json
-        try:
-            data = json.loads(response_text)
-            return CommitMessage(**data)
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Failed to parse AI response: {e}")
\ No newline at end of file
+        with span("ai.parse"):
+            try:
+                data = json.loads(response_text)
+                return CommitMessage(**data)
+            except json.JSONDecodeError as e:
+                raise RuntimeError(f"Failed to parse AI response: {e}")
\ No newline at end of file
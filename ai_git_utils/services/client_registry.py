@@ -0,0 +1,159 @@
+"""Shared OpenAI clients with pooled keep-alive connections."""
+import threading
+from typing import Any, Dict, Tuple
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+from ..tracing import get_tracer
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+WARM_UP_TIMEOUT = 5.0
+
+# httpcore 跟踪事件 -> 记录在当前 span 上的耗时字段
+_HTTP_TRACE_MARKS = {
+    "connection.connect_tcp.complete": "connect_ms",
+    "connection.start_tls.complete": "tls_ms",
+    "http11.receive_response_headers.complete": "ttfb_ms",
+    "http2.receive_response_headers.complete": "ttfb_ms",
+}
+
+
+def _trace_http_request(request: httpx.Request) -> None:
+    """Report connection and first-byte timings of a request to the tracer."""
+    tracer = get_tracer()
+    if not tracer.enabled:
+        return
+
+    def on_event(name: str, info: Dict[str, Any]) -> None:
+        key = _HTTP_TRACE_MARKS.get(name)
+        if key is not None:
+            tracer.mark(key)
+
+    request.extensions["trace"] = on_event
+
+
+class ClientRegistry:
+    """Process-wide registry of OpenAI clients.
+
+    Clients are keyed by endpoint, API key and pool limits, so every call
+    against the same endpoint reuses one HTTP connection pool (and its
+    TLS sessions) instead of opening a new one per request.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._clients: Dict[Tuple[Any, ...], OpenAI] = {}
+        self._http_clients: Dict[Tuple[Any, ...], httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_config: Dict[str, Any]) -> OpenAI:
+        """Return the shared client for a model configuration.
+
+        Args:
+            model_config: Model configuration dictionary; the optional
+                ``max_connections``, ``max_keepalive_connections``,
+                ``keepalive_expiry`` and ``timeout`` keys tune the client
+
+        Returns:
+            OpenAI client, created on first use
+        """
+        key = self._key(model_config)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                http_client = DefaultHttpxClient(
+                    limits=self._limits(model_config),
+                    event_hooks={"request": [_trace_http_request]},
+                )
+                options: Dict[str, Any] = {}
+                if model_config.get('timeout') is not None:
+                    # 未配置时沿用 SDK 的默认超时
+                    options["timeout"] = model_config['timeout']
+                client = OpenAI(
+                    base_url=model_config.get('base_url'),
+                    api_key=model_config.get('api_key'),
+                    http_client=http_client,
+                    # 重试由 RetryPolicy 负责，以便熔断器能观察到每次失败
+                    max_retries=0,
+                    **options,
+                )
+                self._clients[key] = client
+                self._http_clients[key] = http_client
+            return client
+
+    def warm_up(self, model_config: Dict[str, Any]) -> threading.Thread:
+        """Open a connection to the model endpoint in a background thread.
+
+        The request result is ignored; its only purpose is to leave an
+        established keep-alive connection in the pool for the real call.
+
+        Args:
+            model_config: Model configuration dictionary
+
+        Returns:
+            The started daemon thread
+        """
+        client = self.get(model_config)
+        http_client = self._http_clients[self._key(model_config)]
+
+        def _warm() -> None:
+            try:
+                http_client.head(str(client.base_url), timeout=WARM_UP_TIMEOUT)
+            except Exception:
+                pass
+
+        thread = threading.Thread(target=_warm, name="aigit-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self) -> None:
+        """Close and forget every registered client."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._http_clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _key(model_config: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (
+            model_config.get('base_url'),
+            model_config.get('api_key'),
+            model_config.get('max_connections', DEFAULT_MAX_CONNECTIONS),
+            model_config.get('max_keepalive_connections', DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            model_config.get('keepalive_expiry', DEFAULT_KEEPALIVE_EXPIRY),
+            model_config.get('timeout'),
+        )
+
+    @staticmethod
+    def _limits(model_config: Dict[str, Any]) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=model_config.get('max_connections', DEFAULT_MAX_CONNECTIONS),
+            max_keepalive_connections=model_config.get(
+                'max_keepalive_connections', DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=model_config.get('keepalive_expiry', DEFAULT_KEEPALIVE_EXPIRY),
+        )
+
+
+_registry = ClientRegistry()
+
+
+def get_client(model_config: Dict[str, Any]) -> OpenAI:
+    """Return the shared client for ``model_config``."""
+    return _registry.get(model_config)
+
+
+def warm_up(model_config: Dict[str, Any]) -> threading.Thread:
+    """Warm the connection pool for ``model_config`` in the background."""
+    return _registry.warm_up(model_config)
+
+
+def clear_clients() -> None:
+    """Close every shared client."""
+    _registry.clear()
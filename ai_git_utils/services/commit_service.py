@@ -1,17 +1,70 @@
 """Commit service for handling git commit operations."""
-from typing import Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from git import Repo
-from ..git_operations import get_git_diff, commit_changes
-from ..utils import edit_commit_message
+from ..config_manager import get_active_model
+from ..diff_utils import diff_file_paths, group_diff_chunks
+from ..git_operations import (
+    apply_to_index,
+    commit_staged_tree,
+    get_staged_patch,
+    get_staged_tree_diff,
+    get_staged_tree_numstat,
+    reset_index,
+    stage_changes,
+    write_index_tree,
+    write_patch_trees,
+)
+from ..models.commit_draft import CommitDraft
+from ..models.commit_message import CommitMessage
+from ..models.file_stat import FileStat
+from ..models.staged_tree import StagedTree
+from ..tracing import span
+from ..utils import commit_preview, edit_commit_message
 from .ai_service import AIService
+from .client_registry import warm_up
+from .diff_exclusions import DiffExclusions
+from .diff_normalizer import RENAME_OPTIONS, DiffNormalizer
+from .pregenerator import find_pregenerated, tree_cache_key
+from .response_cache import ResponseCache
+from .split_planner import ChangeUnit, SplitCommit, SplitPlanner
+
+# 超过该字符数的 diff 使用 map-reduce 生成，可按模型配置覆盖
+DEFAULT_MAP_REDUCE_THRESHOLD = 48000
+DEFAULT_MAP_CHUNK_SIZE = 16000
+DEFAULT_MAX_CONCURRENCY = 4
 
 
 class CommitService:
     """Service for handling commit operations."""
     
-    def __init__(self):
-        """Initialize commit service."""
-        self.ai_service = AIService()
+    def __init__(
+        self,
+        use_cache: bool = True,
+        refresh: bool = False,
+        stream: bool = False,
+        race: bool = False,
+        repos: Optional[Dict[str, Repo]] = None,
+    ):
+        """Initialize commit service.
+        
+        Args:
+            use_cache: Whether to reuse cached AI responses and the
+                messages cached per staged tree
+            refresh: Regenerate even if a cached response exists
+            stream: Stream the response and show a live preview
+            race: Hedge the request across backup models
+            repos: Open repositories keyed by real path, shared with other
+                services (e.g. by ``aigit serve``)
+        """
+        self.ai_service = AIService(use_cache=use_cache, refresh=refresh, race=race)
+        self.tree_cache = ResponseCache() if use_cache else None
+        self.refresh = refresh
+        self.stream = stream
+        self._repos: Dict[str, Repo] = repos if repos is not None else {}
+        self._staged: Dict[str, StagedTree] = {}
     
     def prepare_commit_message(
         self,
@@ -22,6 +75,13 @@ class CommitService:
         """
         Prepare commit message with AI-generated content.
         
+        All changes are staged once and the index is written out as a
+        tree; the diff is taken from that tree and ``commit_changes``
+        later commits the very same tree, so nothing is staged twice and
+        edits made while the message is being written stay uncommitted.
+        Files excluded by ``DiffExclusions`` are only listed with their
+        line counts in front of the diff.
+        
         Args:
             repo_path: Path to git repository
             file_path: Optional specific file path
@@ -35,38 +95,376 @@ class CommitService:
             GitCommandError: If git command fails
             RuntimeError: If AI service fails
         """
-        repo = Repo(repo_path)
-        repo.git.add('.')
+        draft = self.draft_commit_message(repo_path, file_path, language)
+        if draft is None:
+            return None
+        
+        # Format and edit commit message
+        initial_message = draft.message.to_string()
+        edited_message = edit_commit_message(initial_message)
+        
+        return edited_message
+    
+    def draft_commit_message(
+        self,
+        repo_path: str = ".",
+        file_path: Optional[str] = None,
+        language: str = "English",
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Optional[CommitDraft]:
+        """
+        Stage all changes and generate a message for them, without editing.
+        
+        Args:
+            repo_path: Path to git repository
+            file_path: Optional specific file path
+            language: Output language for commit message
+            on_update: Receives partial fields while the response streams,
+                instead of the terminal preview
+            
+        Returns:
+            CommitDraft with the message and the staged tree, or None if no
+            changes detected
+            
+        Raises:
+            InvalidGitRepositoryError: If not a valid git repository
+            GitCommandError: If git command fails
+            RuntimeError: If AI service fails
+        """
+        model_config = get_active_model() or {}
+        if model_config.get("warm_up"):
+            # 在暂存和计算 diff 的同时建立到模型服务的连接
+            warm_up(model_config)
         
-        diff_output = get_git_diff(repo, True, file_path)
+        repo = self._open_repo(repo_path)
+        staged = stage_changes(repo)
+        self._staged[repo.git_dir] = staged
         
-        if not diff_output:
+        commit_message = self.message_for_tree(repo_path, staged, file_path, language, on_update)
+        if commit_message is None:
+            return None
+        return CommitDraft(commit_message, staged)
+    
+    def message_for_tree(
+        self,
+        repo_path: str,
+        staged: StagedTree,
+        file_path: Optional[str] = None,
+        language: str = "English",
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        pregenerated: bool = True,
+    ) -> Optional[CommitMessage]:
+        """
+        Generate the message of a staged tree.
+        
+        Without ``file_path`` the message is also cached under the tree,
+        so a message generated ahead of time by ``Pregenerator`` is
+        returned without computing the diff at all. If a pregeneration of
+        the same tree is still running, it is waited for (at most
+        ``pregenerate_wait`` seconds) instead of sending the request again.
+        
+        Args:
+            repo_path: Path to git repository
+            staged: Tree to describe, e.g. from ``stage_changes``
+            file_path: Optional specific file path
+            language: Output language for commit message
+            on_update: Receives partial fields while the response streams
+            pregenerated: Look up a message generated ahead of time; the
+                result is cached under the tree either way
+            
+        Returns:
+            Generated CommitMessage, or None if the tree has no changes
+            
+        Raises:
+            GitCommandError: If git command fails
+            RuntimeError: If AI service fails
+        """
+        model_config = get_active_model() or {}
+        repo = self._open_repo(repo_path)
+        
+        use_tree_cache = self.tree_cache is not None and file_path is None
+        if use_tree_cache and pregenerated and not self.refresh:
+            precomputed = find_pregenerated(
+                self.tree_cache, repo, staged, language, model_config
+            )
+            if precomputed is not None:
+                return precomputed
+        
+        prompt = self._prompt_diff(repo, staged, model_config, file_path)
+        if prompt is None:
             print("No changes detected.")
             return None
+        diff_output, _ = prompt
         
         # Generate commit message using AI
-        commit_message = self.ai_service.generate_commit_message(
-            diff_output,
-            language
+        commit_message = self.generate_commit_message(diff_output, language, on_update=on_update)
+        if use_tree_cache:
+            key = tree_cache_key(model_config, staged, language, repo.working_dir)
+            self.tree_cache.set(key, asdict(commit_message))
+        return commit_message
+    
+    def _prompt_diff(
+        self,
+        repo: Repo,
+        staged: StagedTree,
+        model_config: Dict[str, Any],
+        file_path: Optional[str] = None,
+    ) -> Optional[Tuple[str, List[FileStat]]]:
+        """
+        Build the diff of a staged tree that is sent to the model.
+        
+        Excluded files are left out of the diff and listed in a summary
+        in front of it; the diff is normalized when ``normalize_diff`` is on.
+        
+        Args:
+            repo: Git repository
+            staged: Tree to describe and the tree or commit it builds on
+            model_config: Active model configuration
+            file_path: Optional specific file path
+            
+        Returns:
+            The diff and the excluded files, or None if nothing changed
+        """
+        normalizer = self._normalizer(model_config)
+        stats = get_staged_tree_numstat(
+            repo, staged, file_path, RENAME_OPTIONS if normalizer else ()
         )
+        if not stats:
+            return None
         
-        # Format and edit commit message
-        initial_message = commit_message.to_string()
-        edited_message = edit_commit_message(initial_message)
+        exclusions = DiffExclusions.from_config(repo.working_dir, model_config)
+        diff_output = get_staged_tree_diff(
+            repo,
+            staged,
+            file_path,
+            normalizer.git_options() if normalizer else (),
+            exclusions.pathspecs(stats),
+        )
+        # 被排除的文件仍以 numstat 摘要的形式告知模型
+        excluded = exclusions.excluded(stats, diff_output)
+        summary = exclusions.summary(excluded)
+        if normalizer:
+            with span("commit.normalize", chars=len(diff_output)):
+                diff_output = normalizer.normalize(diff_output)
+        diff_output = summary + diff_output
+        return diff_output, excluded
+    
+    def generate_commit_message(
+        self,
+        diff_output: str,
+        language: str = "English",
+        stream: Optional[bool] = None,
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> CommitMessage:
+        """
+        Generate a commit message, using map-reduce for very large diffs.
         
-        return edited_message
+        Diffs above the model's ``map_reduce_threshold`` are split into
+        chunks of ``map_chunk_size`` characters that are summarized
+        concurrently (up to ``max_concurrency`` requests at once); a final
+        request merges the summaries into one commit message.
+        
+        Args:
+            diff_output: Git diff output
+            language: Output language for commit message
+            stream: Override the service's ``stream`` setting
+            on_update: Streams the response into this callback instead of
+                the terminal preview
+            
+        Returns:
+            Generated CommitMessage object
+        """
+        if stream is None:
+            stream = self.stream
+        model_config = get_active_model() or {}
+        threshold = model_config.get("map_reduce_threshold", DEFAULT_MAP_REDUCE_THRESHOLD)
+        
+        with span("commit.generate", diff_chars=len(diff_output), stream=stream):
+            kwargs: Dict[str, Any] = {}
+            if len(diff_output) > threshold:
+                cached = self.ai_service.get_cached_commit_message(diff_output, language)
+                if cached is not None:
+                    return cached
+                kwargs["summaries"] = self._summarize_chunks(diff_output, language, model_config)
+            
+            if on_update is not None:
+                return self.ai_service.generate_commit_message(
+                    diff_output, language, on_update=on_update, **kwargs
+                )
+            if stream:
+                with commit_preview() as on_update:
+                    return self.ai_service.generate_commit_message(
+                        diff_output,
+                        language,
+                        on_update=on_update,
+                        **kwargs,
+                    )
+            return self.ai_service.generate_commit_message(diff_output, language, **kwargs)
+    
+    def prepare_split_commits(
+        self,
+        repo_path: str = ".",
+        language: str = "English"
+    ) -> List[SplitCommit]:
+        """
+        Group the staged changes into separate commits and write their messages.
+        
+        Hunks are grouped by directory and identifier overlap, optionally
+        refined by the model (``split_with_model``, on by default); the
+        content of excluded files is never shown to the model. The
+        messages of all groups are then generated concurrently, up to
+        ``max_concurrency`` requests at once, each from the same kind of
+        diff ``message_for_tree`` uses.
+        
+        Args:
+            repo_path: Path to git repository
+            language: Output language for commit messages
+            
+        Returns:
+            Planned commits in commit order, empty if nothing is staged
+            
+        Raises:
+            InvalidGitRepositoryError: If not a valid git repository
+            GitCommandError: If git command fails
+            RuntimeError: If AI service fails
+        """
+        model_config = get_active_model() or {}
+        if model_config.get("warm_up"):
+            warm_up(model_config)
+        
+        repo = self._open_repo(repo_path)
+        repo.git.add(A=True)
+        
+        planner = SplitPlanner()
+        units = planner.units_from_diff(get_staged_patch(repo))
+        if not units:
+            return []
+        
+        staged = write_index_tree(repo)
+        prompt = self._prompt_diff(repo, staged, model_config)
+        hidden = {stat.path for stat in prompt[1]} if prompt else set()
+        # 被排除文件的内容不发给模型，只保留路径以维持分组序号
+        shown_units = [
+            ChangeUnit(unit.index, unit.path, unit.header, "")
+            if hidden.intersection(diff_file_paths(unit.header))
+            else unit
+            for unit in units
+        ]
+        
+        with span("commit.plan_split", units=len(units)):
+            groups = planner.heuristic_groups(units)
+            if len(units) > 1 and model_config.get("split_with_model", True):
+                groups = self.ai_service.suggest_groups(shown_units, groups) or groups
+            splits = planner.plan(units, groups)
+        
+        # 每组的 diff 与 message_for_tree 相同：不含二进制数据，经过排除和规范化
+        trees = write_patch_trees(repo, staged.head, [split.patch for split in splits])
+        bases = [staged.head] + trees[:-1]
+        concurrency = model_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        # 多个实时预览会互相覆盖，拆分模式下不使用流式预览
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(splits)))) as executor:
+            messages = list(executor.map(
+                lambda tree, base: self.generate_commit_message(
+                    self._prompt_diff(repo, StagedTree(tree, base), model_config)[0],
+                    language,
+                    stream=False,
+                ),
+                trees,
+                bases,
+            ))
+        for split, message in zip(splits, messages):
+            split.message = message.to_string()
+        return splits
+    
+    def commit_split(
+        self,
+        repo_path: str = ".",
+        splits: Optional[List[SplitCommit]] = None
+    ) -> int:
+        """
+        Commit planned groups one after another through the index.
+        
+        The index is reset to ``HEAD`` and each group's patch is applied
+        with ``git apply --cached`` before the group is committed with
+        ``commit_staged_tree``, so the working tree is never touched and
+        hooks run for every group. If a group fails, the original index
+        is restored, which leaves the groups not yet committed staged,
+        and the error is raised.
+        
+        Args:
+            repo_path: Path to git repository
+            splits: Planned commits from ``prepare_split_commits``
+            
+        Returns:
+            Number of commits created
+            
+        Raises:
+            InvalidGitRepositoryError: If not a valid git repository
+            GitCommandError: If a patch does not apply
+            RuntimeError: If HEAD moved while the groups were committed
+            HookExecutionError: If a commit hook rejects a group
+        """
+        repo = self._open_repo(repo_path)
+        original = write_index_tree(repo)
+        head = original.head
+        reset_index(repo)
+        committed = 0
+        try:
+            for split in splits or []:
+                apply_to_index(repo, split.patch)
+                staged = StagedTree(write_index_tree(repo).tree, head)
+                head = commit_staged_tree(repo, staged, split.message or "").hexsha
+                committed += 1
+        except Exception:
+            # 恢复原来的暂存区，尚未提交的分组仍处于暂存状态
+            reset_index(repo, original.tree)
+            raise
+        return committed
+    
+    def _summarize_chunks(
+        self,
+        diff_output: str,
+        language: str,
+        model_config: Dict[str, Any]
+    ) -> List[str]:
+        """
+        Summarize diff chunks concurrently (map step).
+        
+        Args:
+            diff_output: Git diff output
+            language: Output language for the summaries
+            model_config: Active model configuration
+            
+        Returns:
+            One summary per chunk, in diff order
+        """
+        chunk_size = model_config.get("map_chunk_size", DEFAULT_MAP_CHUNK_SIZE)
+        concurrency = model_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        chunks = group_diff_chunks(diff_output, chunk_size)
+        
+        with span("commit.map", chunks=len(chunks)), ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks)))) as executor:
+            return list(executor.map(
+                lambda chunk: self.ai_service.summarize_diff(chunk, language),
+                chunks,
+            ))
     
     def commit_changes(
         self,
         repo_path: str = ".",
-        commit_message: str = ""
+        commit_message: str = "",
+        staged: Optional[StagedTree] = None,
     ) -> bool:
         """
         Commit changes with the given message.
         
+        Commits the tree staged by ``prepare_commit_message`` without
+        staging again; without a prior preparation all changes are
+        staged first.
+        
         Args:
             repo_path: Path to git repository
             commit_message: Commit message to use
+            staged: Tree to commit instead of the one prepared by this service
             
         Returns:
             True if commit was successful
@@ -74,7 +472,25 @@ class CommitService:
         Raises:
             InvalidGitRepositoryError: If not a valid git repository
             GitCommandError: If git command fails
+            RuntimeError: If HEAD moved since the changes were staged
         """
-        repo = Repo(repo_path)
-        commit_changes(repo, commit_message)
-        return True
\ No newline at end of file
+        repo = self._open_repo(repo_path)
+        prepared = self._staged.pop(repo.git_dir, None)
+        staged = staged or prepared or stage_changes(repo)
+        commit_staged_tree(repo, staged, commit_message)
+        return True
+    
+    @staticmethod
+    def _normalizer(model_config: Dict[str, Any]) -> Optional[DiffNormalizer]:
+        """Diff normalizer for the model, None if ``normalize_diff`` is off."""
+        if not model_config.get("normalize_diff", True):
+            return None
+        return DiffNormalizer.from_model_config(model_config)
+    
+    def _open_repo(self, repo_path: str) -> Repo:
+        """Open ``repo_path`` once and reuse the Repo for later calls."""
+        key = os.path.realpath(repo_path)
+        repo = self._repos.get(key)
+        if repo is None:
+            repo = self._repos[key] = Repo(repo_path)
+        return repo
\ No newline at end of file
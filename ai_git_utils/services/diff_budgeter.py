@@ -0,0 +1,176 @@
+"""Token-budgeted packing of diffs into prompts."""
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+from ..diff_utils import split_diff_files, split_file_hunks
+
+DEFAULT_MAX_DIFF_TOKENS = 16000
+
+# 函数、类、接口等签名的变更对提交信息最有价值
+_SIGNATURE_RE = re.compile(
+    r"^[+-]\s*(?:export\s+|public\s+|private\s+|protected\s+|static\s+|async\s+)*"
+    r"(?:def|class|function|func|fn|interface|struct|enum|trait|type|impl|module)\b"
+)
+_FILE_PATH_RE = re.compile(r"^diff --git a/(.*?) b/(.*)$", re.MULTILINE)
+_SUMMARY_RESERVE = 48
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` without a tokenizer.
+
+    ASCII text averages about four characters per token; other characters
+    (CJK in particular) are counted as one token each.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated number of tokens
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+@dataclass
+class _Hunk:
+    file_index: int
+    order: int
+    text: str
+    tokens: int
+    score: float
+    added: int
+    removed: int
+
+
+class DiffBudgeter:
+    """Fits a diff into a token budget by keeping the most valuable hunks.
+
+    Hunks touching signatures come first, ordinary hunks next, and pure
+    deletions and hunks repeated verbatim elsewhere in the diff last; longer
+    hunks rank below shorter ones of the same kind. Hunks that do not fit
+    are replaced by a ``--stat``-style summary of the files they belong to.
+    """
+
+    def __init__(self, max_tokens: int = DEFAULT_MAX_DIFF_TOKENS):
+        """Initialize the budgeter.
+
+        Args:
+            max_tokens: Maximum estimated tokens for the packed diff
+        """
+        self.max_tokens = max_tokens
+
+    def fit(self, diff_output: str) -> str:
+        """Pack ``diff_output`` into the token budget.
+
+        Args:
+            diff_output: Git diff output
+
+        Returns:
+            The diff unchanged if it fits, otherwise the highest-value hunks
+            followed by a summary of what was omitted
+        """
+        if estimate_tokens(diff_output) <= self.max_tokens:
+            return diff_output
+
+        headers: List[str] = []
+        hunks: List[_Hunk] = []
+        seen: Dict[str, int] = {}
+        for file_index, file_diff in enumerate(split_diff_files(diff_output)):
+            header, *file_hunks = split_file_hunks(file_diff)
+            headers.append(header)
+            for order, text in enumerate(file_hunks):
+                body = text.split("\n", 1)[-1]
+                seen[body] = seen.get(body, 0) + 1
+                hunks.append(self._make_hunk(file_index, order, text))
+        for hunk in hunks:
+            if seen[hunk.text.split("\n", 1)[-1]] > 1:
+                hunk.score -= 3
+
+        # 为省略摘要预留空间，避免打包结果超出预算
+        budget = self.max_tokens - min(_SUMMARY_RESERVE + 8 * len(headers), self.max_tokens // 4)
+        header_tokens = [estimate_tokens(header) for header in headers]
+        files_with_hunks = {hunk.file_index for hunk in hunks}
+        included_files = set()
+        for file_index in range(len(headers)):
+            # 没有 hunk 的文件（二进制、重命名、权限变更）只有头部，始终保留
+            if file_index not in files_with_hunks:
+                included_files.add(file_index)
+                budget -= header_tokens[file_index]
+
+        kept = set()
+        for hunk in sorted(hunks, key=lambda h: (-h.score, h.file_index, h.order)):
+            cost = hunk.tokens
+            if hunk.file_index not in included_files:
+                cost += header_tokens[hunk.file_index]
+            if cost <= budget:
+                kept.add((hunk.file_index, hunk.order))
+                included_files.add(hunk.file_index)
+                budget -= cost
+
+        return self._render(headers, hunks, kept, included_files)
+
+    def _make_hunk(self, file_index: int, order: int, text: str) -> _Hunk:
+        lines = text.split("\n")[1:]
+        added = sum(1 for line in lines if line.startswith("+"))
+        removed = sum(1 for line in lines if line.startswith("-"))
+
+        score = 1.0
+        if any(_SIGNATURE_RE.match(line) for line in lines):
+            score += 3
+        if added == 0 and removed > 0:
+            score -= 2
+        score -= min(len(lines) / 200, 1.0)
+
+        return _Hunk(file_index, order, text, estimate_tokens(text), score, added, removed)
+
+    def _render(
+        self,
+        headers: List[str],
+        hunks: List[_Hunk],
+        kept: set,
+        included_files: set,
+    ) -> str:
+        by_file: Dict[int, List[_Hunk]] = {}
+        for hunk in hunks:
+            by_file.setdefault(hunk.file_index, []).append(hunk)
+
+        parts: List[str] = []
+        omitted: Dict[int, List[_Hunk]] = {}
+        for file_index, header in enumerate(headers):
+            if file_index in included_files:
+                parts.append(header)
+            for hunk in by_file.get(file_index, []):
+                if (file_index, hunk.order) in kept:
+                    parts.append(hunk.text)
+                else:
+                    omitted.setdefault(file_index, []).append(hunk)
+
+        if omitted:
+            parts.append("\n[omitted to fit token budget]\n")
+            remaining = self.max_tokens - estimate_tokens("".join(parts)) - _SUMMARY_RESERVE // 2
+            rest = [0, 0, 0]
+            for file_index, file_hunks in omitted.items():
+                added = sum(h.added for h in file_hunks)
+                removed = sum(h.removed for h in file_hunks)
+                line = (
+                    f" {self._file_path(headers[file_index])} | +{added} -{removed} "
+                    f"({len(file_hunks)} hunks omitted)\n"
+                )
+                cost = estimate_tokens(line) + 1
+                if rest[0] == 0 and cost <= remaining:
+                    parts.append(line)
+                    remaining -= cost
+                else:
+                    # 预算不足时，剩余文件合并成一行汇总
+                    rest[0] += 1
+                    rest[1] += added
+                    rest[2] += removed
+            if rest[0]:
+                parts.append(f" ... {rest[0]} more files | +{rest[1]} -{rest[2]}\n")
+        return "".join(parts)
+
+    @staticmethod
+    def _file_path(header: str) -> str:
+        match = _FILE_PATH_RE.search(header)
+        return match.group(2) if match else header.split("\n", 1)[0]
@@ -0,0 +1,140 @@
+"""Keep generated, vendored and oversized files out of the model's diff."""
+import os
+from typing import Any, Dict, List, Sequence
+from ..diff_utils import diff_file_paths
+from ..models.file_stat import FileStat
+
+# 与原先硬编码的 ":(exclude)*lock*" 相同，默认排除锁文件
+DEFAULT_EXCLUDE_PATTERNS = ("*lock*",)
+# 单个文件增删行数超过该值时只保留统计，0 表示不限制
+DEFAULT_MAX_FILE_LINES = 1000
+REPO_EXCLUDE_FILE = ".aigitexclude"
+
+# linguist-generated / linguist-vendored 既可能是 set 状态，也可能写成 =true
+GITATTRIBUTE_PATHSPECS = (
+    ":(exclude,attr:linguist-generated)",
+    ":(exclude,attr:linguist-generated=true)",
+    ":(exclude,attr:linguist-vendored)",
+    ":(exclude,attr:linguist-vendored=true)",
+    ":(exclude,attr:-diff)",
+)
+
+
+class DiffExclusions:
+    """Decides which files are left out of the diff sent to the model.
+
+    A file is excluded when it matches a pattern from the ``exclude``
+    model option or the repository's ``.aigitexclude`` file, when
+    ``.gitattributes`` marks it ``linguist-generated``,
+    ``linguist-vendored`` or ``-diff``, or when more than
+    ``max_file_lines`` lines of it changed. Patterns follow
+    ``.gitignore`` syntax without negation: a pattern without a slash
+    matches at any depth, a trailing slash matches a whole directory and
+    a leading slash anchors it at the repository root.
+
+    Excluded files are still listed with their numstat counts (see
+    ``summary``), so the model knows they changed.
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[str] = DEFAULT_EXCLUDE_PATTERNS,
+        use_gitattributes: bool = True,
+        max_file_lines: int = DEFAULT_MAX_FILE_LINES,
+    ):
+        """Initialize the exclusions.
+
+        Args:
+            patterns: ``.gitignore``-style patterns of excluded paths
+            use_gitattributes: Honour linguist and ``-diff`` attributes
+            max_file_lines: Exclude files with more changed lines, 0 for no limit
+        """
+        self.patterns = [p.strip() for p in patterns if p.strip() and not p.startswith(("#", "!"))]
+        self.use_gitattributes = use_gitattributes
+        self.max_file_lines = max_file_lines
+
+    @classmethod
+    def from_config(cls, repo_dir: str, model_config: Dict[str, Any]) -> "DiffExclusions":
+        """Build exclusions from the model options and the repository file.
+
+        Args:
+            repo_dir: Working directory of the repository
+            model_config: Active model configuration
+
+        Returns:
+            DiffExclusions combining ``exclude`` and ``.aigitexclude``
+        """
+        patterns = list(model_config.get("exclude", DEFAULT_EXCLUDE_PATTERNS))
+        try:
+            with open(os.path.join(repo_dir, REPO_EXCLUDE_FILE), "r", encoding="utf-8") as f:
+                patterns.extend(f.read().splitlines())
+        except FileNotFoundError:
+            pass
+        return cls(
+            patterns,
+            use_gitattributes=model_config.get("exclude_gitattributes", True),
+            max_file_lines=model_config.get("max_file_lines", DEFAULT_MAX_FILE_LINES),
+        )
+
+    def pathspecs(self, stats: Sequence[FileStat] = ()) -> List[str]:
+        """Exclude pathspecs for ``git diff``.
+
+        Args:
+            stats: Numstat of the diff, used for the size limit
+
+        Returns:
+            ``:(exclude...)`` pathspecs
+        """
+        pathspecs = [spec for pattern in self.patterns for spec in self._pathspecs(pattern)]
+        if self.use_gitattributes:
+            pathspecs.extend(GITATTRIBUTE_PATHSPECS)
+        if self.max_file_lines:
+            pathspecs.extend(
+                f":(exclude,literal){stat.path}"
+                for stat in stats
+                if stat.changed_lines > self.max_file_lines
+            )
+        return pathspecs
+
+    @staticmethod
+    def excluded(stats: Sequence[FileStat], diff_output: str) -> List[FileStat]:
+        """Files counted in ``stats`` that are missing from ``diff_output``.
+
+        Args:
+            stats: Numstat of all changes
+            diff_output: Diff produced with ``pathspecs``
+
+        Returns:
+            FileStat of every excluded file
+        """
+        shown = set(diff_file_paths(diff_output))
+        return [stat for stat in stats if stat.path not in shown]
+
+    @staticmethod
+    def summary(excluded: Sequence[FileStat]) -> str:
+        """Compact listing of excluded files to put in front of the diff.
+
+        Args:
+            excluded: Files left out of the diff
+
+        Returns:
+            Summary text, empty if nothing was excluded
+        """
+        if not excluded:
+            return ""
+        lines = ["# Changed but not shown (generated, vendored or too large):"]
+        for stat in excluded:
+            counts = "binary" if stat.binary else f"+{stat.added} -{stat.deleted}"
+            lines.append(f"# {counts} {stat.path}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _pathspecs(pattern: str) -> List[str]:
+        if pattern.startswith("/"):
+            pattern = pattern[1:]
+        elif "/" not in pattern.rstrip("/"):
+            pattern = "**/" + pattern
+        if pattern.endswith("/"):
+            return [f":(exclude,glob){pattern}**"]
+        # 与 .gitignore 相同，匹配目录时排除其中的所有文件
+        return [f":(exclude,glob){pattern}", f":(exclude,glob){pattern}/**"]
@@ -0,0 +1,138 @@
+"""Token-reducing normalization of diffs before they are sent to the model."""
+import re
+from typing import Any, Dict, List, Tuple
+from ..diff_utils import split_diff_files, split_file_hunks
+
+DEFAULT_DIFF_CONTEXT = 1
+# 单行超过该长度视为压缩或生成的内容
+MINIFIED_LINE_CHARS = 1000
+# 较短的重复 hunk 替换成引用并不能节省 token
+DEDUP_MIN_CHARS = 80
+RENAME_OPTIONS = ("--find-renames", "--find-copies")
+
+_FILE_PATH_RE = re.compile(r"^diff --git a/(.*?) b/(.*)$", re.MULTILINE)
+_MINIFIED_PATH_RE = re.compile(r"\.min\.(?:js|css|mjs)$|\.(?:js|css)\.map$")
+# 对模型没有价值的头部行：对象哈希，以及与 "diff --git" 重复的文件名
+_DROPPED_HEADER_PREFIXES = ("index ", "--- ", "+++ ")
+
+
+class DiffNormalizer:
+    """Shrinks a diff to what the model needs to describe the change.
+
+    Git is asked for less context and for rename and copy detection (see
+    ``git_options``). The diff text is then rewritten: ``index`` lines and
+    the ``---``/``+++`` lines repeating the file names are dropped, binary
+    patches and minified or generated files become one-line summaries,
+    hunks that only change whitespace are collapsed, and a hunk repeated
+    verbatim in several files (license headers, mass renames) is kept once
+    and referenced elsewhere.
+    """
+
+    def __init__(
+        self,
+        context_lines: int = DEFAULT_DIFF_CONTEXT,
+        minified_line_chars: int = MINIFIED_LINE_CHARS,
+    ):
+        """Initialize the normalizer.
+
+        Args:
+            context_lines: Unchanged lines git shows around each change
+            minified_line_chars: Lines longer than this mark a file as
+                minified or generated
+        """
+        self.context_lines = context_lines
+        self.minified_line_chars = minified_line_chars
+
+    @classmethod
+    def from_model_config(cls, model_config: Dict[str, Any]) -> "DiffNormalizer":
+        """Build a normalizer from the ``diff_context`` model option."""
+        return cls(context_lines=model_config.get("diff_context", DEFAULT_DIFF_CONTEXT))
+
+    def git_options(self) -> List[str]:
+        """Diff options to pass to git for a compact diff.
+
+        Returns:
+            Options for reduced context and rename/copy detection
+        """
+        return [f"--unified={self.context_lines}", *RENAME_OPTIONS]
+
+    def normalize(self, diff_output: str) -> str:
+        """Rewrite ``diff_output`` into a smaller diff with the same meaning.
+
+        Args:
+            diff_output: Git diff output
+
+        Returns:
+            Normalized diff text
+        """
+        seen: Dict[str, str] = {}
+        parts: List[str] = []
+        for file_diff in split_diff_files(diff_output):
+            header, *hunks = split_file_hunks(file_diff)
+            match = _FILE_PATH_RE.search(header)
+            path = match.group(2) if match else ""
+            header = self._clean_header(header)
+
+            if "GIT binary patch" in header:
+                # 二进制补丁数据本身对模型没有意义
+                parts.append(header.split("GIT binary patch", 1)[0] + "Binary file changed\n")
+                continue
+            if hunks and self._is_minified(path, hunks):
+                added, removed = self._count_changes(hunks)
+                parts.append(
+                    header + f"[minified or generated content: +{added} -{removed} lines]\n"
+                )
+                continue
+
+            parts.append(header)
+            for hunk in hunks:
+                parts.append(self._normalize_hunk(hunk, path, seen))
+        return self._terminated("".join(parts)) if parts else diff_output
+
+    def _normalize_hunk(self, hunk: str, path: str, seen: Dict[str, str]) -> str:
+        hunk_header, _, body = hunk.partition("\n")
+        lines = body.split("\n")
+        removed = [line[1:] for line in lines if line.startswith("-")]
+        added = [line[1:] for line in lines if line.startswith("+")]
+
+        if (removed or added) and self._squash(removed) == self._squash(added):
+            return f"{hunk_header}\n[whitespace-only change: +{len(added)} -{len(removed)} lines]\n"
+
+        changed = "\n".join(line for line in lines if line[:1] in ("+", "-"))
+        if len(changed) >= DEDUP_MIN_CHARS:
+            first = seen.setdefault(changed, path)
+            if first != path:
+                return f"{hunk_header}\n[same change as in {first}]\n"
+        return self._terminated(hunk)
+
+    def _is_minified(self, path: str, hunks: List[str]) -> bool:
+        if _MINIFIED_PATH_RE.search(path):
+            return True
+        return any(
+            len(line) > self.minified_line_chars
+            for hunk in hunks
+            for line in hunk.split("\n")
+            if line[:1] in ("+", "-")
+        )
+
+    @staticmethod
+    def _clean_header(header: str) -> str:
+        lines = header.split("\n")
+        kept = [line for line in lines if not line.startswith(_DROPPED_HEADER_PREFIXES)]
+        return "\n".join(kept)
+
+    @staticmethod
+    def _count_changes(hunks: List[str]) -> Tuple[int, int]:
+        lines = [line for hunk in hunks for line in hunk.split("\n")[1:]]
+        return (
+            sum(1 for line in lines if line.startswith("+")),
+            sum(1 for line in lines if line.startswith("-")),
+        )
+
+    @staticmethod
+    def _squash(lines: List[str]) -> str:
+        return "".join("".join(line.split()) for line in lines)
+
+    @staticmethod
+    def _terminated(text: str) -> str:
+        return text if not text or text.endswith("\n") else text + "\n"
@@ -0,0 +1,79 @@
+"""Hedged requests: race several endpoints and keep the first good answer."""
+import queue
+import threading
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_HEDGE_DELAY = 2.0
+
+
+class RequestCancelled(Exception):
+    """Raised inside a hedged request after another request has won."""
+
+
+def run_hedged(
+    candidates: List[T],
+    request: Callable[[T, threading.Event], R],
+    delay: float = DEFAULT_HEDGE_DELAY,
+) -> R:
+    """Run ``request`` against candidates, adding one more every ``delay``.
+
+    The first candidate starts immediately. Each further candidate starts
+    when ``delay`` seconds pass without a successful result, or right away
+    when a running request fails. The first request to return without
+    raising wins; the shared cancel event is then set so the others can
+    abort, and they run on daemon threads so they never block exit.
+
+    Args:
+        candidates: Request targets in priority order
+        request: Callable performing one request; it receives the target and
+            a cancel event it should check while waiting on I/O
+        delay: Seconds to wait before hedging with the next candidate
+
+    Returns:
+        Result of the first successful request
+
+    Raises:
+        Exception: The last error if every candidate fails
+    """
+    results: "queue.Queue[Tuple[Optional[R], Optional[BaseException]]]" = queue.Queue()
+    cancelled = threading.Event()
+
+    def _worker(candidate: T) -> None:
+        try:
+            results.put((request(candidate, cancelled), None))
+        except BaseException as e:
+            results.put((None, e))
+
+    def _launch(index: int) -> None:
+        threading.Thread(
+            target=_worker,
+            args=(candidates[index],),
+            name=f"aigit-hedge-{index}",
+            daemon=True,
+        ).start()
+
+    launched, finished = 1, 0
+    last_error: Optional[BaseException] = None
+    _launch(0)
+    while True:
+        more = launched < len(candidates)
+        try:
+            result, error = results.get(timeout=delay if more else None)
+        except queue.Empty:
+            _launch(launched)
+            launched += 1
+            continue
+
+        finished += 1
+        if error is None:
+            cancelled.set()
+            return result
+        last_error = error
+        if more:
+            _launch(launched)
+            launched += 1
+        elif finished == launched:
+            raise last_error
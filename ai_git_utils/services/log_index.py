@@ -0,0 +1,319 @@
+"""Incremental on-disk index of commit metadata for ``aigit log``."""
+import json
+import os
+import re
+import tempfile
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from git import Repo
+from ..git_operations import LOG_FIELD_SEPARATOR, expand_log_date, iter_log_lines
+from ..models.log_entry import LogEntry
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+INDEX_VERSION = 1
+INDEX_DIR_NAME = os.path.join("aigit", "log-index")
+
+# 作者、时间戳、时区和主题，按列分别存储；父提交只用于识别合并
+_INDEX_FORMAT = LOG_FIELD_SEPARATOR.join(["%H", "%P", "%an", "%ae", "%ct", "%cd", "%s"])
+_TZ_DATE_FORMAT = "format:%z"
+_DISPLAY_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?$")
+
+# 列文件及其数组类型；sha 以 20 字节原始形式存储
+_COLUMNS = {
+    "times": "q",
+    "tz": "h",
+    "authors": "I",
+    "subject_offsets": "Q",
+}
+
+
+def parse_log_date(value: str, end_of_day: bool = False) -> Optional[float]:
+    """Parse a ``--since``/``--until`` value the index can evaluate.
+
+    A bare date is completed by ``expand_log_date``, exactly as it is
+    before being passed to git, so both paths select the same commits.
+
+    Args:
+        value: ``YYYY-MM-DD`` optionally followed by ``HH:MM[:SS]``
+        end_of_day: For a bare date, use the last second of that day
+
+    Returns:
+        Local-time POSIX timestamp, or None for formats only git understands
+    """
+    value = value.strip()
+    if not _DATE_RE.match(value):
+        return None
+    value = expand_log_date(value, end_of_day).replace("T", " ")
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+class LogIndex:
+    """Columnar commit metadata index stored under ``.git/aigit/log-index``.
+
+    Each column (sha, commit time, timezone, author id, subject offset) is
+    a flat array file, with authors and the subject bytes kept alongside.
+    Commits are appended oldest first; ``meta.json`` records the indexed
+    HEAD and the number of valid rows, and is replaced atomically last, so
+    a torn update is simply truncated away on the next refresh. When HEAD
+    moves forward only the new commits are read from git; if history was
+    rewritten, or the new commits include a merge, the index is rebuilt.
+    """
+
+    def __init__(self, repo: Repo, index_dir: Optional[str] = None):
+        """Initialize the index.
+
+        Args:
+            repo: Git repository
+            index_dir: Directory holding the index, defaults to
+                ``<git dir>/aigit/log-index``
+        """
+        self.repo = repo
+        self.index_dir = index_dir or os.path.join(repo.git_dir, INDEX_DIR_NAME)
+        self._meta: Optional[Dict] = None
+        self._shas = b""
+        self._subjects = b""
+        self._columns: Dict[str, array] = {}
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with HEAD.
+
+        Returns:
+            False if the repository has no commits, True otherwise
+        """
+        if not self.repo.head.is_valid():
+            return False
+        head = self.repo.head.commit.hexsha
+
+        with self._locked():
+            meta = self._read_meta()
+            if meta is not None and meta["head"] == head:
+                self._load(meta)
+                return True
+
+            revision = head
+            if meta is not None and meta["count"] and self._is_ancestor(meta["head"], head):
+                revision = f"{meta['head']}..{head}"
+            else:
+                meta = None
+            self._append(meta, head, revision)
+            self._load(self._read_meta())
+        return True
+
+    def query(
+        self,
+        limit: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        author: Optional[str] = None,
+    ) -> Optional[Iterator[LogEntry]]:
+        """Answer a log query from the index.
+
+        Args:
+            limit: Maximum number of commits
+            since: Only commits after this date
+            until: Only commits before this date
+            author: Only commits whose ``Name <email>`` matches this regex
+
+        Returns:
+            Iterator of matching entries, newest first, or None if the query
+            must be answered by git (unsupported date format, invalid
+            pattern or empty repository)
+        """
+        since_ts = parse_log_date(since) if since else None
+        until_ts = parse_log_date(until, end_of_day=True) if until else None
+        if (since and since_ts is None) or (until and until_ts is None):
+            return None
+
+        try:
+            pattern = re.compile(author) if author else None
+        except re.error:
+            return None
+
+        if not self.refresh():
+            return None
+        author_ids = None
+        if pattern is not None:
+            # 作者数量远小于提交数量，先匹配作者再按 id 过滤
+            author_ids = {
+                index for index, (name, email) in enumerate(self._meta["authors"])
+                if pattern.search(f"{name} <{email}>")
+            }
+        return self._iter_rows(limit, since_ts, until_ts, author_ids)
+
+    @property
+    def count(self) -> int:
+        """Number of indexed commits."""
+        return self._meta["count"] if self._meta else 0
+
+    def _iter_rows(
+        self,
+        limit: Optional[int],
+        since_ts: Optional[float],
+        until_ts: Optional[float],
+        author_ids: Optional[set],
+    ) -> Iterator[LogEntry]:
+        times = self._columns["times"]
+        authors = self._columns["authors"]
+        produced = 0
+        for row in range(self.count - 1, -1, -1):
+            if limit is not None and produced >= limit:
+                return
+            if since_ts is not None and times[row] < since_ts:
+                continue
+            if until_ts is not None and times[row] > until_ts:
+                continue
+            if author_ids is not None and authors[row] not in author_ids:
+                continue
+            produced += 1
+            yield self._entry(row)
+
+    def _entry(self, row: int) -> LogEntry:
+        offsets = self._columns["subject_offsets"]
+        end = offsets[row + 1] if row + 1 < self.count else self._meta["subjects_size"]
+        tz = timezone(timedelta(minutes=self._columns["tz"][row]))
+        date = datetime.fromtimestamp(self._columns["times"][row], tz)
+        return LogEntry(
+            self._shas[row * 20:(row + 1) * 20].hex(),
+            self._meta["authors"][self._columns["authors"][row]][0],
+            date.strftime(_DISPLAY_DATE_FORMAT),
+            self._subjects[offsets[row]:end].decode("utf-8", errors="replace"),
+        )
+
+    def _append(self, meta: Optional[Dict], head: str, revision: str) -> None:
+        """Read commits in ``revision`` from git and append them to the columns."""
+        os.makedirs(self.index_dir, exist_ok=True)
+        if meta is None:
+            meta = {
+                "version": INDEX_VERSION,
+                "head": None,
+                "count": 0,
+                "subjects_size": 0,
+                "authors": [],
+            }
+        author_ids: Dict[Tuple[str, str], int] = {
+            tuple(identity): index for index, identity in enumerate(meta["authors"])
+        }
+
+        rows = self._read_rows(revision)
+        if meta["count"] and any(" " in parents for _, parents, *_ in rows):
+            # 合并进来的提交会与已索引的提交按时间交错，追加后顺序与 git log
+            # 不一致，只能整体重建
+            return self._append(None, head, head)
+
+        shas = bytearray()
+        subjects = bytearray()
+        columns = {name: array(code) for name, code in _COLUMNS.items()}
+        offset = meta["subjects_size"]
+        # git log 输出最新的提交在前，索引按时间正序追加
+        for hexsha, _, name, email, timestamp, tz, subject in reversed(rows):
+            identity = (name, email)
+            if identity not in author_ids:
+                author_ids[identity] = len(meta["authors"])
+                meta["authors"].append([name, email])
+            shas += bytes.fromhex(hexsha)
+            columns["times"].append(int(timestamp))
+            columns["tz"].append(self._tz_minutes(tz))
+            columns["authors"].append(author_ids[identity])
+            columns["subject_offsets"].append(offset)
+            encoded = subject.encode("utf-8")
+            subjects += encoded
+            offset += len(encoded)
+
+        count = meta["count"]
+        self._write_column("shas.bin", bytes(shas), count * 20)
+        self._write_column("subjects.bin", bytes(subjects), meta["subjects_size"])
+        for name, values in columns.items():
+            self._write_column(f"{name}.bin", values.tobytes(), count * values.itemsize)
+
+        meta.update(head=head, count=count + len(rows), subjects_size=offset)
+        self._write_meta(meta)
+
+    def _read_rows(self, revision: str) -> List[List[str]]:
+        args = [f"--format={_INDEX_FORMAT}", f"--date={_TZ_DATE_FORMAT}", revision]
+        return [line.split(LOG_FIELD_SEPARATOR, 6) for line in iter_log_lines(self.repo, args)]
+
+    def _write_column(self, file_name: str, data: bytes, valid_size: int) -> None:
+        """Append ``data`` after the first ``valid_size`` bytes of a column file."""
+        path = os.path.join(self.index_dir, file_name)
+        mode = "r+b" if valid_size and os.path.exists(path) else "wb"
+        with open(path, mode) as f:
+            # 丢弃上次中断的更新留下的多余数据
+            f.truncate(valid_size)
+            f.seek(valid_size)
+            f.write(data)
+
+    def _load(self, meta: Dict) -> None:
+        count = meta["count"]
+        self._meta = meta
+        self._shas = self._read_file("shas.bin")[:count * 20]
+        self._subjects = self._read_file("subjects.bin")[:meta["subjects_size"]]
+        self._columns = {}
+        for name, code in _COLUMNS.items():
+            values = array(code)
+            values.frombytes(self._read_file(f"{name}.bin")[:count * values.itemsize])
+            self._columns[name] = values
+
+    def _read_file(self, file_name: str) -> bytes:
+        with open(os.path.join(self.index_dir, file_name), "rb") as f:
+            return f.read()
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.index_dir, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        return meta
+
+    def _write_meta(self, meta: Dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, os.path.join(self.index_dir, "meta.json"))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _is_ancestor(self, ancestor: str, head: str) -> bool:
+        try:
+            self.repo.git.merge_base("--is-ancestor", ancestor, head)
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _tz_minutes(value: str) -> int:
+        try:
+            sign = -1 if value.startswith("-") else 1
+            return sign * (int(value[1:3]) * 60 + int(value[3:5]))
+        except (ValueError, IndexError):
+            return 0
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize index updates between concurrent aigit processes."""
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(os.path.join(self.index_dir, "lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
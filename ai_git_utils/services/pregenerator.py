@@ -0,0 +1,307 @@
+"""Speculative generation of commit messages while changes are being staged."""
+import os
+import tempfile
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from git import Repo
+from ..config_manager import get_active_model
+from ..git_backend import EMPTY_TREE_SHA
+from ..git_operations import write_index_tree
+from ..models.commit_message import CommitMessage
+from ..models.staged_tree import StagedTree
+from ..tracing import annotate, span
+from .diff_exclusions import DiffExclusions
+from .prompt_builder import DEFAULT_PROMPT_VARIANT, PromptBuilder
+from .response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from .commit_service import CommitService
+
+# 索引在该秒数内没有再变化才开始生成，连续的 git add 只产生一次请求
+DEFAULT_PREGENERATE_DEBOUNCE = 2.0
+# 提交时最多等待正在进行的预生成的秒数，超时后自行生成
+DEFAULT_PREGENERATE_WAIT = 30.0
+POLL_INTERVAL = 0.1
+STATE_DIR = "aigit-pregenerate"
+PENDING_FILE = "pending"
+
+
+class Pregenerator:
+    """Generates the message of the index before ``git commit`` asks for it.
+
+    The ``post-index-change`` hook (see ``aigit hook install``) starts a
+    worker after every index write. Each worker is ``schedule``d and
+    ``run`` waits ``debounce`` seconds; a worker superseded by a newer
+    one in the meantime gives up, so a burst of ``git add`` commands
+    costs a single request. The message is cached under the staged tree
+    by ``CommitService.message_for_tree``, where ``aigit commit`` and the
+    ``prepare-commit-msg`` hook find it without computing a diff.
+
+    While a worker generates, a marker file named after the tree makes
+    other processes wait for its result (``find_pregenerated``) instead
+    of sending the same request. Finding a cached message needs neither
+    ``openai`` nor the CommitService, so the hook returns in milliseconds.
+    """
+
+    def __init__(
+        self,
+        repo_path: str = ".",
+        language: str = "English",
+        debounce: float = DEFAULT_PREGENERATE_DEBOUNCE,
+        service: Optional["CommitService"] = None,
+    ):
+        """Initialize the pregenerator.
+
+        Args:
+            repo_path: Path to git repository
+            language: Output language for commit messages
+            debounce: Seconds the index must stay unchanged before generating
+            service: CommitService generating and caching the messages,
+                created when a message has to be generated
+        """
+        self.repo_path = repo_path
+        self.language = language
+        self.debounce = debounce
+        self.repo = Repo(repo_path)
+        self._service = service
+
+    @classmethod
+    def from_model_config(
+        cls,
+        repo_path: str,
+        language: str,
+        model_config: Dict[str, Any],
+    ) -> "Pregenerator":
+        """Build a pregenerator using the ``pregenerate_debounce`` model option."""
+        return cls(
+            repo_path,
+            language,
+            model_config.get("pregenerate_debounce", DEFAULT_PREGENERATE_DEBOUNCE),
+        )
+
+    @property
+    def service(self) -> "CommitService":
+        """CommitService used for generation, imported on first use."""
+        if self._service is None:
+            from .commit_service import CommitService
+
+            self._service = CommitService()
+        return self._service
+
+    def schedule(self) -> str:
+        """Register a worker for the latest index change.
+
+        Returns:
+            Token to pass to ``run``; older tokens are superseded
+        """
+        token = uuid.uuid4().hex
+        _write_atomic(os.path.join(_state_dir(self.repo.git_dir), PENDING_FILE), token)
+        return token
+
+    def run(self, token: str) -> Optional[CommitMessage]:
+        """Wait out the debounce period, then generate the index's message.
+
+        Args:
+            token: Token returned by ``schedule``
+
+        Returns:
+            Generated or cached CommitMessage, or None if the worker was
+            superseded, nothing is staged or another worker handles the tree
+        """
+        time.sleep(self.debounce)
+        if self._pending() != token:
+            return None
+
+        # 工作进程可能继承了 git commit -a 的临时索引，始终读取仓库自己的索引
+        staged = write_index_tree(self.repo, os.path.join(self.repo.git_dir, "index"))
+        if self._unchanged(staged):
+            return None
+
+        marker = _marker_path(self.repo.git_dir, staged)
+        if not _claim(marker):
+            return None
+        try:
+            with span("pregenerate.generate", tree=staged.tree):
+                return self.service.message_for_tree(
+                    self.repo_path, staged, language=self.language
+                )
+        finally:
+            _release(marker)
+
+    def message_for_index(self) -> Optional[CommitMessage]:
+        """Message of the index being committed, pregenerated if possible.
+
+        Used by the ``prepare-commit-msg`` hook, which sees the index
+        through ``$GIT_INDEX_FILE``. A running worker for the same tree is
+        waited for; without a result the message is generated right away.
+
+        Returns:
+            CommitMessage, or None if nothing is staged
+        """
+        staged = write_index_tree(self.repo)
+        if self._unchanged(staged):
+            return None
+        message = find_pregenerated(
+            ResponseCache(), self.repo, staged, self.language, get_active_model() or {}
+        )
+        if message is not None:
+            return message
+        return self.service.message_for_tree(
+            self.repo_path, staged, language=self.language, pregenerated=False
+        )
+
+    def _pending(self) -> Optional[str]:
+        try:
+            with open(os.path.join(_state_dir(self.repo.git_dir), PENDING_FILE), "r") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _unchanged(self, staged: StagedTree) -> bool:
+        """Whether ``staged`` equals the tree of the HEAD it was staged on."""
+        if staged.head is None:
+            return staged.tree == EMPTY_TREE_SHA
+        return self.repo.commit(staged.head).tree.hexsha == staged.tree
+
+
+def tree_cache_key(
+    model_config: Dict[str, Any], staged: StagedTree, language: str, repo_dir: str
+) -> str:
+    """Response cache key of the message of ``staged``.
+
+    Args:
+        model_config: Active model configuration
+        staged: Staged tree
+        language: Output language
+        repo_dir: Working directory of the repository, whose
+            ``.aigitexclude`` shapes the diff as well
+
+    Returns:
+        Key for ``ResponseCache``
+    """
+    prompt_version = PromptBuilder().prompt_version(
+        model_config.get("prompt_variant", DEFAULT_PROMPT_VARIANT)
+    )
+    return ResponseCache.make_tree_key(
+        staged.tree,
+        staged.head,
+        language,
+        prompt_version,
+        model_config,
+        DiffExclusions.from_config(repo_dir, model_config).patterns,
+    )
+
+
+def find_pregenerated(
+    cache: ResponseCache,
+    repo: Repo,
+    staged: StagedTree,
+    language: str,
+    model_config: Dict[str, Any],
+) -> Optional[CommitMessage]:
+    """Cached message of ``staged``, waiting for a pregeneration still running.
+
+    Args:
+        cache: Response cache holding the messages
+        repo: Repository the tree was staged in
+        staged: Staged tree
+        language: Output language
+        model_config: Active model configuration, ``pregenerate_wait``
+            limits the wait
+
+    Returns:
+        CommitMessage, or None if none was generated for the tree
+    """
+    key = tree_cache_key(model_config, staged, language, repo.working_dir)
+    with span("commit.tree_cache"):
+        cached = cache.get(key)
+        wait = model_config.get("pregenerate_wait", DEFAULT_PREGENERATE_WAIT)
+        if cached is None and wait_for_pregeneration(repo.git_dir, staged, wait):
+            cached = cache.get(key)
+        annotate(hit=cached is not None)
+    return CommitMessage(**cached) if cached is not None else None
+
+
+def wait_for_pregeneration(git_dir: str, staged: StagedTree, timeout: float) -> bool:
+    """Wait until no other process is generating the message of ``staged``.
+
+    Args:
+        git_dir: Git directory of the repository
+        staged: Tree whose message is wanted
+        timeout: Maximum number of seconds to wait
+
+    Returns:
+        True if a running pregeneration was waited for
+    """
+    marker = _marker_path(git_dir, staged)
+    if not _running(marker):
+        return False
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and _running(marker):
+        time.sleep(POLL_INTERVAL)
+    return True
+
+
+def _state_dir(git_dir: str) -> str:
+    path = os.path.join(git_dir, STATE_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _marker_path(git_dir: str, staged: StagedTree) -> str:
+    return os.path.join(git_dir, STATE_DIR, f"{staged.head or 'root'}-{staged.tree}.pid")
+
+
+def _claim(marker: str) -> bool:
+    """Create ``marker`` for this process unless a live process holds it."""
+    directory = os.path.dirname(marker)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(str(os.getpid()))
+    try:
+        while True:
+            try:
+                # 硬链接原子地创建已写好 pid 的标记，其他进程不会读到空文件
+                os.link(tmp_path, marker)
+                return True
+            except FileExistsError:
+                if _running(marker):
+                    return False
+                # 持有者已退出（例如被终止），清理残留的标记
+                _release(marker)
+    finally:
+        os.unlink(tmp_path)
+
+
+def _release(marker: str) -> None:
+    try:
+        os.unlink(marker)
+    except FileNotFoundError:
+        pass
+
+
+def _running(marker: str) -> bool:
+    """Whether ``marker`` is held by another live process."""
+    try:
+        with open(marker, "r") as f:
+            pid = int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return False
+    if pid <= 0 or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _write_atomic(path: str, content: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
@@ -1,11 +1,25 @@
 """Prompt building service for AI commit message generation."""
-from typing import List, Tuple
+import json
+from dataclasses import asdict
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from ..models.commit_message import CommitMessage
+from .diff_budgeter import DiffBudgeter
+from .split_planner import ChangeUnit
+
+# 分组提示中每个变更单元最多展示的改动行数
+SPLIT_EXCERPT_LINES = 12
+
+PROMPT_VARIANTS = ("full", "compact")
+DEFAULT_PROMPT_VARIANT = "full"
 
 
 class PromptBuilder:
     """Builds prompts for AI commit message generation."""
     
+    # 修改提示词模板时递增，使旧的缓存结果失效
+    PROMPT_VERSION = "1"
+    
     EMOJI_LIST: List[Tuple[str, str]] = [
         ("✨", "New feature"),
         ("🐛", "Fix bug"),
@@ -22,25 +36,73 @@ class PromptBuilder:
         ("👷", "Add or update CI build system"),
     ]
     
-    def build_system_prompt(self, language: str = "English") -> str:
+    EXAMPLE = CommitMessage(
+        type="fix",
+        scope="cli",
+        emoji="🐛",
+        subject="segmentation fault in inference",
+        fix_items=["fix segmentation fault in inference"],
+    )
+    
+    def build_system_prompt(
+        self,
+        language: str = "English",
+        variant: str = DEFAULT_PROMPT_VARIANT
+    ) -> str:
         """Build system prompt for AI model.
         
+        The prompt is a static prefix (instructions, emoji list, example)
+        followed by a single line naming the language, so the prefix is
+        byte-identical across calls and languages and can be served from
+        a provider's prompt cache. Prompts are memoized per prompt version,
+        variant and language.
+        
         Args:
             language: Output language (English/Chinese)
+            variant: ``full`` or the shorter ``compact`` prompt
             
         Returns:
             Formatted system prompt string
+            
+        Raises:
+            ValueError: If the variant is unknown
         """
-        emoji_list = "\n".join(f"- {emoji} {desc}" for emoji, desc in self.EMOJI_LIST)
+        if variant not in PROMPT_VARIANTS:
+            raise ValueError(f"Unknown prompt variant: {variant}")
+        return _system_prompt(type(self), self.PROMPT_VERSION, variant, language)
+    
+    def prompt_version(self, variant: str = DEFAULT_PROMPT_VARIANT) -> str:
+        """Version identifying the prompt template, used in cache keys.
         
-        example = CommitMessage(
-            type="fix",
-            scope="cli",
-            emoji="🐛",
-            subject="segmentation fault in inference",
-            fix_items=["fix segmentation fault in inference"],
-        )
+        Args:
+            variant: Prompt variant
+            
+        Returns:
+            ``PROMPT_VERSION``, suffixed with the variant unless it is ``full``
+        """
+        if variant == DEFAULT_PROMPT_VARIANT:
+            return self.PROMPT_VERSION
+        return f"{self.PROMPT_VERSION}-{variant}"
+    
+    def static_prefix(self, variant: str = DEFAULT_PROMPT_VARIANT) -> str:
+        """Language-independent beginning of the system prompt.
         
+        Args:
+            variant: ``full`` or ``compact``
+            
+        Returns:
+            Prompt text shared by every language
+        """
+        if variant == "compact":
+            emojis = ", ".join(f"{emoji} {desc.lower()}" for emoji, desc in self.EMOJI_LIST)
+            example = json.dumps(asdict(self.EXAMPLE), ensure_ascii=False, separators=(",", ":"))
+            return (
+                "Write a Conventional Commits message for the given git diff as a JSON "
+                "object. Be concise; lines at most 74 characters.\n"
+                f"Emojis: {emojis}\n"
+                f"Example: {example}\n"
+            )
+        emoji_list = "\n".join(f"- {emoji} {desc}" for emoji, desc in self.EMOJI_LIST)
         return f'''
 Craft clear and concise commit messages following the Conventional Commits standard format for git. 
 When presented with a git diff summary, your task is to convert it into a useful commit message and add a brief description of the changes made, ensuring that lines are not longer than 74 characters. 
@@ -52,22 +114,89 @@ emoji list:
 {emoji_list}
 
 EXAMPLE JSON OUTPUT:
-{self._format_example(example)}
+{self._format_example(self.EXAMPLE)}
 
-output only the json object and answer all my questions in {language}.
 '''
     
-    def build_user_prompt(self, diff_output: str) -> str:
+    def build_user_prompt(
+        self,
+        diff_output: str,
+        max_tokens: Optional[int] = None
+    ) -> str:
         """Build user prompt with git diff.
         
         Args:
             diff_output: Git diff output string
+            max_tokens: Optional token budget for the diff; larger diffs
+                keep their most valuable hunks and summarize the rest
             
         Returns:
             Formatted user prompt string
         """
+        if max_tokens is not None:
+            diff_output = DiffBudgeter(max_tokens).fit(diff_output)
         return f"git diff summary: \n{diff_output}"
     
+    def build_map_system_prompt(self, language: str = "English") -> str:
+        """Build system prompt for summarizing one chunk of a large diff.
+        
+        Args:
+            language: Output language (English/Chinese)
+            
+        Returns:
+            Formatted system prompt string
+        """
+        return _map_system_prompt(language)
+    
+    def build_reduce_user_prompt(self, summaries: List[str]) -> str:
+        """Build user prompt from per-chunk summaries of a large diff.
+        
+        Args:
+            summaries: Summaries produced for each diff chunk
+            
+        Returns:
+            Formatted user prompt string
+        """
+        parts = "\n\n".join(
+            f"part {index}:\n{summary}" for index, summary in enumerate(summaries, 1)
+        )
+        return f"git diff summary (summarized in {len(summaries)} parts): \n{parts}"
+    
+    def build_split_system_prompt(self) -> str:
+        """Build system prompt for grouping staged changes into commits.
+        
+        Returns:
+            Formatted system prompt string
+        """
+        return '''
+You are given numbered parts of a staged git diff. Group them into separate, atomic commits so that each group is one logical change that builds on its own. 
+Keep parts that depend on each other (a definition and its callers, a rename across files) in the same group, and do not create more groups than there are logical changes. 
+Every part number must appear in exactly one group. Keep the order of groups in which they should be committed. 
+Answer with JSON only: {"groups": [[0, 2], [1]]}
+'''
+    
+    def build_split_user_prompt(self, units: List[ChangeUnit], suggested: List[List[int]]) -> str:
+        """Build user prompt listing the change units to group.
+        
+        Args:
+            units: Change units of the staged diff
+            suggested: Heuristic grouping the model may refine
+            
+        Returns:
+            Formatted user prompt string
+        """
+        parts = []
+        for unit in units:
+            changed = [line for line in unit.body.split("\n") if line[:1] in ("+", "-")]
+            excerpt = "\n".join(changed[:SPLIT_EXCERPT_LINES])
+            if len(changed) > SPLIT_EXCERPT_LINES:
+                excerpt += f"\n... {len(changed) - SPLIT_EXCERPT_LINES} more changed lines"
+            parts.append(f"part {unit.index}: {unit.path}\n{excerpt}")
+        return (
+            f"suggested groups: {json.dumps({'groups': suggested})}\n\n"
+            + "\n\n".join(parts)
+        )
+    
     def _format_example(self, example: CommitMessage) -> str:
         """Format example commit message as JSON.
         
@@ -77,6 +206,26 @@ output only the json object and answer all my questions in {language}.
         Returns:
             JSON string representation
         """
-        from dataclasses import asdict
-        import json
-        return json.dumps(asdict(example), indent=2, ensure_ascii=False)
\ No newline at end of file
+        return json.dumps(asdict(example), indent=2, ensure_ascii=False)
+    
+    def _language_suffix(self, variant: str, language: str) -> str:
+        """Language-dependent end of the system prompt."""
+        if variant == "compact":
+            return f"Output only the JSON object, in {language}.\n"
+        return f"output only the json object and answer all my questions in {language}.\n"
+
+
+@lru_cache(maxsize=None)
+def _system_prompt(builder: type, version: str, variant: str, language: str) -> str:
+    # 版本号参与缓存键，模板升级后不会复用旧的提示词
+    prompt_builder = builder()
+    return prompt_builder.static_prefix(variant) + prompt_builder._language_suffix(variant, language)
+
+
+@lru_cache(maxsize=None)
+def _map_system_prompt(language: str) -> str:
+    return f'''
+You are given one part of a larger git diff. Summarize what changed in this part as a short list of bullet points, one per logical change, mentioning the files or symbols involved. 
+Do not write a commit message and do not speculate about parts you cannot see. 
+Answer in {language}.
+'''
@@ -0,0 +1,239 @@
+"""Retry with backoff, rate limiting and per-endpoint circuit breaking for model calls."""
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, TypeVar
+import httpx
+import openai
+
+CIRCUIT_FILE = os.path.expanduser("~/.aigit/circuit.json")
+
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 30.0
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 60.0
+
+_RETRYABLE_STATUS = {408, 409, 429}
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when an endpoint is skipped because its circuit is open."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Return True for rate limits, server errors, timeouts and network errors."""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    # 读取流式响应时连接中断，httpx 的异常不会被 openai 包装
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Read the server's requested delay from ``Retry-After`` headers.
+
+    Args:
+        error: Error raised by the OpenAI client
+
+    Returns:
+        Delay in seconds, or None if the response did not specify one
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms:
+        try:
+            return float(retry_ms) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    Attributes:
+        max_retries: Retries after the first attempt
+        base_delay: Backoff base in seconds
+        max_delay: Upper bound for a single delay in seconds
+    """
+    max_retries: int = DEFAULT_MAX_RETRIES
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY
+    max_delay: float = DEFAULT_RETRY_MAX_DELAY
+
+    @classmethod
+    def from_model_config(cls, model_config: Dict[str, Any]) -> "RetryPolicy":
+        """Create a policy from the ``retry_*`` keys of a model config."""
+        return cls(
+            max_retries=model_config.get("max_retries", DEFAULT_MAX_RETRIES),
+            base_delay=model_config.get("retry_base_delay", DEFAULT_RETRY_BASE_DELAY),
+            max_delay=model_config.get("retry_max_delay", DEFAULT_RETRY_MAX_DELAY),
+        )
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """Delay before retry number ``attempt`` (starting at 0).
+
+        A ``Retry-After`` from the server takes precedence over backoff.
+        """
+        requested = retry_after(error)
+        if requested is not None:
+            return min(requested, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Call ``fn``, retrying retryable errors.
+
+        Args:
+            fn: Zero-argument callable performing the request
+
+        Returns:
+            Result of the first successful call
+
+        Raises:
+            Exception: The last error once retries are exhausted, or any
+                non-retryable error immediately
+        """
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                time.sleep(self.delay(attempt, e))
+                attempt += 1
+
+
+class RateLimiter:
+    """Spaces out calls made from several threads to a maximum rate.
+
+    Calls are started at least ``60 / rate`` seconds apart, so a pool of
+    workers never bursts past a provider's requests-per-minute limit.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize rate limiter.
+
+        Args:
+            rate: Maximum calls per minute, None or 0 for no limit
+            clock: Monotonic clock in seconds
+            sleep: Function used to wait
+        """
+        self.interval = 60.0 / rate if rate else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next call may start."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            self._sleep(start - now)
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker persisted under ``~/.aigit/``.
+
+    After ``failure_threshold`` consecutive failed calls the circuit opens
+    and later invocations, including new aigit processes, skip the endpoint
+    until ``cooldown`` seconds have passed. The next call after that is a
+    trial: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        state_file: Optional[str] = None,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        """Initialize circuit breaker.
+
+        Args:
+            state_file: JSON file holding circuit state, defaults to CIRCUIT_FILE
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds an open circuit rejects calls
+        """
+        self.state_file = state_file or CIRCUIT_FILE
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def allow(self, endpoint: str) -> bool:
+        """Return True if a call to ``endpoint`` may be attempted."""
+        entry = self._load().get(endpoint)
+        if not entry or entry.get("opened_at") is None:
+            return True
+        return time.time() - entry["opened_at"] >= self.cooldown
+
+    def record_success(self, endpoint: str) -> None:
+        """Close the circuit for ``endpoint``."""
+        with self._lock:
+            state = self._load()
+            if state.pop(endpoint, None) is not None:
+                self._save(state)
+
+    def record_failure(self, endpoint: str) -> None:
+        """Count a failure and open the circuit past the threshold."""
+        with self._lock:
+            state = self._load()
+            entry = state.setdefault(endpoint, {"failures": 0, "opened_at": None})
+            entry["failures"] += 1
+            if entry["failures"] >= self.failure_threshold:
+                entry["opened_at"] = time.time()
+            self._save(state)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, state: Dict[str, Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.state_file)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
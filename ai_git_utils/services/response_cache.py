@@ -0,0 +1,183 @@
+"""Persistent on-disk cache of AI responses."""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional, Sequence
+
+CACHE_DIR = os.path.expanduser("~/.aigit/cache")
+DEFAULT_MAX_ENTRIES = 256
+
+
+def normalize_diff(diff_output: str) -> str:
+    """Normalize a diff so that cosmetic differences share a cache key.
+
+    Args:
+        diff_output: Git diff output
+
+    Returns:
+        Diff with unified line endings and trailing whitespace removed
+    """
+    lines = diff_output.replace("\r\n", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+class ResponseCache:
+    """LRU cache of generated commit messages stored under ``~/.aigit/``.
+
+    Each entry is a small JSON file named after its key. Reads refresh the
+    file's mtime, and writes evict the least recently used files once the
+    cache grows past ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Initialize response cache.
+
+        Args:
+            cache_dir: Directory holding cache entries, defaults to CACHE_DIR
+            max_entries: Maximum number of entries kept on disk
+        """
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(
+        diff_output: str,
+        model: Optional[str],
+        base_url: Optional[str],
+        temperature: Optional[float],
+        language: str,
+        prompt_version: str,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Build a cache key for a generation request.
+
+        Args:
+            diff_output: Git diff output
+            model: Model identifier
+            base_url: API endpoint of the model
+            temperature: Sampling temperature
+            language: Output language
+            prompt_version: Version of the prompt template
+            options: Other settings that shape the prompt, e.g. the
+                ``max_diff_tokens`` budget the diff is packed into
+
+        Returns:
+            Hex digest identifying the request
+        """
+        digest = hashlib.sha256()
+        for part in (model, base_url, temperature, language, prompt_version):
+            digest.update(f"{part}\0".encode("utf-8"))
+        digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_diff(diff_output).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_tree_key(
+        tree: str,
+        head: Optional[str],
+        language: str,
+        prompt_version: str,
+        model_config: Dict[str, Any],
+        exclude_patterns: Sequence[str] = (),
+    ) -> str:
+        """Build a cache key for the message of a staged tree.
+
+        The diff is not needed: the tree and the HEAD it was staged on
+        determine it, together with the model options (``exclude``,
+        ``diff_context`` and so on) and the repository's own exclusion
+        patterns, which are all part of the key.
+
+        Args:
+            tree: Tree object written from the index
+            head: Commit the tree was staged on, None before the first commit
+            language: Output language
+            prompt_version: Version of the prompt template
+            model_config: Active model configuration
+            exclude_patterns: Effective exclusion patterns, including
+                those of ``.aigitexclude``
+
+        Returns:
+            Hex digest identifying the staged tree's message
+        """
+        digest = hashlib.sha256()
+        for part in ("tree", tree, head, language, prompt_version):
+            digest.update(f"{part}\0".encode("utf-8"))
+        digest.update(json.dumps(model_config, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(list(exclude_patterns)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for ``key`` and mark it recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss or unreadable entry
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``key`` and evict old entries.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        for name in self._entries():
+            os.unlink(os.path.join(self.cache_dir, name))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _entries(self):
+        try:
+            return [n for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        aged = []
+        for name in entries:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                aged.append((os.stat(path).st_mtime_ns, path))
+            except FileNotFoundError:
+                continue
+        aged.sort()
+        for _, path in aged[: len(aged) - self.max_entries]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
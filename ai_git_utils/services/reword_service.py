@@ -0,0 +1,218 @@
+"""Regenerating the messages of a range of existing commits."""
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Optional
+from git import Repo
+from ..git_operations import plan_reword, rewrite_messages
+from ..models.reword_plan import RewordCommit, RewordPlan
+from ..models.staged_tree import StagedTree
+from ..tracing import span
+from .commit_service import DEFAULT_MAX_CONCURRENCY, CommitService
+from .resilience import RateLimiter
+
+# 保存在 .git 中的进度文件，中断后重新运行时跳过已生成的提交
+CHECKPOINT_FILE = "aigit-reword.json"
+
+
+class RewordService:
+    """Generates new messages for a commit range and rewrites it.
+    
+    Each selected commit is described like a staged tree: its tree is
+    diffed against its first parent by ``CommitService.message_for_tree``,
+    with the same exclusions, normalization and caching as ``aigit
+    commit``. Up to ``workers`` messages are generated at once, started no
+    faster than ``rate_limit`` per minute. Every finished message is
+    written to a checkpoint in the git directory right away, so an
+    interrupted run resumes with the commits still missing.
+    """
+    
+    def __init__(
+        self,
+        commit_service: Optional[CommitService] = None,
+        workers: int = DEFAULT_MAX_CONCURRENCY,
+        rate_limit: Optional[float] = None,
+    ):
+        """Initialize reword service.
+        
+        Args:
+            commit_service: Service generating the messages
+            workers: Maximum number of messages generated at once
+            rate_limit: Maximum number of messages started per minute,
+                None for no limit
+        """
+        self.commit_service = commit_service or CommitService()
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate_limit)
+    
+    @classmethod
+    def from_model_config(
+        cls,
+        model_config: Dict[str, Any],
+        commit_service: Optional[CommitService] = None,
+        workers: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+    ) -> "RewordService":
+        """Build a service from the ``max_concurrency`` and ``reword_rate_limit`` model options.
+        
+        Explicit ``workers`` and ``rate_limit`` take precedence over the options.
+        """
+        if workers is None:
+            workers = model_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        if rate_limit is None:
+            rate_limit = model_config.get("reword_rate_limit")
+        return cls(commit_service, workers, rate_limit)
+    
+    def plan(self, repo_path: str, rev_range: str) -> RewordPlan:
+        """
+        List the commits of ``rev_range`` and those up to HEAD.
+        
+        Args:
+            repo_path: Path to git repository
+            rev_range: Revision range, e.g. ``main..`` or ``HEAD~5..``
+        
+        Returns:
+            RewordPlan, parents first
+        
+        Raises:
+            ValueError: If the range is not part of the history of HEAD
+            GitCommandError: If the range is invalid
+        """
+        return plan_reword(Repo(repo_path), rev_range)
+    
+    def load_checkpoint(self, repo_path: str, plan: RewordPlan, language: str) -> Dict[str, Optional[str]]:
+        """
+        Messages generated for ``plan`` by an earlier, interrupted run.
+        
+        Messages are stored by commit hash and a commit's diff never
+        changes, so they stay valid when the range or HEAD changes; only
+        the language has to match.
+        
+        Args:
+            repo_path: Path to git repository
+            plan: Plan being worked on
+            language: Output language
+        
+        Returns:
+            Messages by commit hash; None means the commit keeps its message
+        """
+        try:
+            with open(_checkpoint_path(Repo(repo_path)), "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if checkpoint.get("language") != language:
+            return {}
+        
+        selected = {commit.hexsha for commit in plan.selected}
+        return {
+            hexsha: message
+            for hexsha, message in checkpoint.get("messages", {}).items()
+            if hexsha in selected
+        }
+    
+    def generate(
+        self,
+        repo_path: str,
+        plan: RewordPlan,
+        language: str = "English",
+        on_message: Optional[Callable[[RewordCommit, Optional[str]], None]] = None,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Generate the messages of the selected commits.
+        
+        Commits found in the checkpoint are not generated again. If a
+        generation fails or the run is interrupted, the messages finished
+        so far stay in the checkpoint and the error is raised.
+        
+        Args:
+            repo_path: Path to git repository
+            plan: Plan from ``plan``
+            language: Output language for commit messages
+            on_message: Called in the calling thread for every newly
+                generated message
+        
+        Returns:
+            Messages by commit hash; None for commits without changes,
+            which keep their message
+        
+        Raises:
+            GitCommandError: If git command fails
+            RuntimeError: If AI service fails
+        """
+        messages = self.load_checkpoint(repo_path, plan, language)
+        checkpoint_path = _checkpoint_path(Repo(repo_path))
+        pending = [commit for commit in plan.selected if commit.hexsha not in messages]
+        if not pending:
+            return messages
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.workers, len(pending)))
+        futures = {
+            executor.submit(self._generate_one, repo_path, commit, language): commit
+            for commit in pending
+        }
+        try:
+            with span("reword.generate", commits=len(pending)):
+                for future in as_completed(futures):
+                    commit = futures[future]
+                    messages[commit.hexsha] = future.result()
+                    _save_checkpoint(checkpoint_path, plan, language, messages)
+                    if on_message is not None:
+                        on_message(commit, messages[commit.hexsha])
+        finally:
+            # 出错或被中断时不再开始新的请求，已在进行的请求结果仍写入响应缓存
+            executor.shutdown(wait=True, cancel_futures=True)
+        return messages
+    
+    def rewrite(self, repo_path: str, plan: RewordPlan, messages: Dict[str, Optional[str]]) -> str:
+        """
+        Rewrite the history with the new messages and drop the checkpoint.
+        
+        Args:
+            repo_path: Path to git repository
+            plan: Plan from ``plan``
+            messages: Messages from ``generate``
+        
+        Returns:
+            Hash of the new HEAD
+        
+        Raises:
+            GitCommandError: If HEAD moved since the plan was made
+        """
+        repo = Repo(repo_path)
+        new_head = rewrite_messages(repo, plan, messages)
+        try:
+            os.unlink(_checkpoint_path(repo))
+        except FileNotFoundError:
+            pass
+        return new_head
+    
+    def _generate_one(self, repo_path: str, commit: RewordCommit, language: str) -> Optional[str]:
+        """Generate the message of one commit, None if it changes nothing."""
+        self.limiter.acquire()
+        message = self.commit_service.message_for_tree(
+            repo_path, StagedTree(commit.tree, commit.base), language=language
+        )
+        return message.to_string() if message is not None else None
+
+
+def _checkpoint_path(repo: Repo) -> str:
+    return os.path.join(repo.git_dir, CHECKPOINT_FILE)
+
+
+def _save_checkpoint(
+    path: str,
+    plan: RewordPlan,
+    language: str,
+    messages: Dict[str, Optional[str]],
+) -> None:
+    checkpoint = {
+        "range": plan.rev_range,
+        "language": language,
+        "messages": messages,
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
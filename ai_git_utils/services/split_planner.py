@@ -0,0 +1,209 @@
+"""Grouping of staged changes into separate logical commits."""
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+from ..diff_utils import split_diff_files, split_file_hunks
+
+# 文件级变更（新建、删除、重命名、二进制）无法按 hunk 拆分
+_WHOLE_FILE_MARKERS = (
+    "new file mode",
+    "deleted file mode",
+    "rename from",
+    "copy from",
+    "Binary files",
+    "GIT binary patch",
+)
+_PATH_RE = re.compile(r"^diff --git a/(.*?) b/(.*)$", re.MULTILINE)
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+
+SIMILARITY_THRESHOLD = 0.6
+MAX_SIMILARITY_UNITS = 200
+
+
+@dataclass
+class ChangeUnit:
+    """Smallest piece of a staged diff that can be committed on its own.
+
+    Attributes:
+        index: Position of the unit in the staged diff
+        path: Path of the changed file
+        header: File header of the diff (``diff --git`` up to the first hunk)
+        body: Hunk text, or the remaining file diff for whole-file changes
+    """
+    index: int
+    path: str
+    header: str
+    body: str
+
+
+@dataclass
+class SplitCommit:
+    """One commit of a split, with its patch and generated message.
+
+    Attributes:
+        units: Indexes of the change units in this commit
+        patch: Patch applied to the index for this commit
+        paths: Files touched by the commit
+        message: Generated commit message, once available
+    """
+    units: List[int]
+    patch: str
+    paths: List[str]
+    message: Optional[str] = None
+
+
+class SplitPlanner:
+    """Clusters the units of a staged diff into logical groups.
+
+    Units start out grouped by directory; groups whose changes share most
+    of their identifiers (for example a rename across packages) are then
+    merged. An optional model pass may refine the result, and its answer
+    is accepted only if it is a valid partition of the units.
+    """
+
+    def plan(self, units: List[ChangeUnit], groups: List[List[int]]) -> List[SplitCommit]:
+        """Turn groups of unit indexes into commits with their patches.
+
+        Args:
+            units: All change units of the diff
+            groups: Validated groups in commit order
+
+        Returns:
+            One SplitCommit per group, without messages
+        """
+        return [
+            SplitCommit(
+                group,
+                self.build_patch(units, group),
+                list(dict.fromkeys(units[index].path for index in group)),
+            )
+            for group in groups
+        ]
+
+    def units_from_diff(self, diff_output: str) -> List[ChangeUnit]:
+        """Split a staged diff into change units.
+
+        Args:
+            diff_output: Output of ``git diff --staged --binary``
+
+        Returns:
+            Units in diff order; files with several hunks yield one unit
+            per hunk, whole-file changes yield a single unit
+        """
+        units: List[ChangeUnit] = []
+        for file_diff in split_diff_files(diff_output):
+            match = _PATH_RE.search(file_diff)
+            path = match.group(2) if match else ""
+            header, *hunks = [self._terminated(part) for part in split_file_hunks(file_diff)]
+            if len(hunks) <= 1 or any(m in header for m in _WHOLE_FILE_MARKERS):
+                units.append(ChangeUnit(len(units), path, header, "".join(hunks)))
+                continue
+            for hunk in hunks:
+                units.append(ChangeUnit(len(units), path, header, hunk))
+        return units
+
+    def heuristic_groups(self, units: List[ChangeUnit]) -> List[List[int]]:
+        """Group units by directory and merge groups with similar changes.
+
+        Args:
+            units: Change units of the diff
+
+        Returns:
+            Groups of unit indexes, ordered by their first unit
+        """
+        by_dir: Dict[str, List[int]] = {}
+        for unit in units:
+            by_dir.setdefault(os.path.dirname(unit.path), []).append(unit.index)
+        groups = list(by_dir.values())
+
+        if len(units) <= MAX_SIMILARITY_UNITS:
+            tokens = [self._tokens(unit.body) for unit in units]
+            parent = list(range(len(groups)))
+
+            def find(i: int) -> int:
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            for a in range(len(groups)):
+                for b in range(a + 1, len(groups)):
+                    if find(a) != find(b) and self._similar(groups[a], groups[b], tokens):
+                        parent[find(b)] = find(a)
+
+            merged: Dict[int, List[int]] = {}
+            for i, group in enumerate(groups):
+                merged.setdefault(find(i), []).extend(group)
+            groups = list(merged.values())
+
+        return self.validate_groups(groups, len(units)) or [list(range(len(units)))]
+
+    @staticmethod
+    def validate_groups(groups, count: int) -> Optional[List[List[int]]]:
+        """Normalize ``groups`` if it is a partition of ``range(count)``.
+
+        Args:
+            groups: Candidate grouping, e.g. parsed from a model answer
+            count: Number of units
+
+        Returns:
+            Sorted groups ordered by first unit, or None if invalid
+        """
+        if not isinstance(groups, list):
+            return None
+        seen: Set[int] = set()
+        normalized = []
+        for group in groups:
+            if not isinstance(group, list) or not group:
+                return None
+            if not all(isinstance(i, int) and 0 <= i < count for i in group):
+                return None
+            if seen.intersection(group) or len(set(group)) != len(group):
+                return None
+            seen.update(group)
+            normalized.append(sorted(group))
+        if len(seen) != count:
+            return None
+        return sorted(normalized, key=lambda group: group[0])
+
+    @staticmethod
+    def build_patch(units: List[ChangeUnit], indexes: List[int]) -> str:
+        """Build one patch from the given units, one header per file.
+
+        Args:
+            units: All change units of the diff
+            indexes: Units to include
+
+        Returns:
+            Patch text suitable for ``git apply --cached``
+        """
+        files: Dict[str, List[ChangeUnit]] = {}
+        for index in sorted(indexes):
+            files.setdefault(units[index].header, []).append(units[index])
+        parts = []
+        for header, file_units in files.items():
+            parts.append(header)
+            parts.extend(unit.body for unit in file_units)
+        return "".join(parts)
+
+    @staticmethod
+    def _terminated(text: str) -> str:
+        # 最后一个 hunk 可能缺少结尾换行，拼接补丁时需要补上
+        return text if not text or text.endswith("\n") else text + "\n"
+
+    @staticmethod
+    def _tokens(text: str) -> Set[str]:
+        changed = [line[1:] for line in text.split("\n") if line[:1] in ("+", "-")]
+        return set(_TOKEN_RE.findall("\n".join(changed)))
+
+    @staticmethod
+    def _similar(a: List[int], b: List[int], tokens: List[Set[str]]) -> bool:
+        for i in a:
+            for j in b:
+                if not tokens[i] or not tokens[j]:
+                    continue
+                overlap = len(tokens[i] & tokens[j]) / len(tokens[i] | tokens[j])
+                if overlap >= SIMILARITY_THRESHOLD:
+                    return True
+        return False
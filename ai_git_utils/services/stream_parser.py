@@ -0,0 +1,128 @@
+"""Incremental JSON parser for streamed commit messages."""
+import json
+from typing import Any, Dict
+
+_WHITESPACE = " \t\r\n"
+
+
+class CommitMessageStreamParser:
+    """Parses a streamed JSON commit message as tokens arrive.
+
+    The parser walks the top-level object once, resuming where it stopped
+    on the previous chunk. A field is published in ``fields`` as soon as its
+    value is complete; array fields such as ``fix_items`` grow item by item.
+    The complete buffer is still validated with ``json.loads`` at the end by
+    ``AIService``, so this parser only needs to be tolerant, not strict.
+    """
+
+    def __init__(self):
+        """Initialize parser state."""
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of the response.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            True if at least one field or list item was completed
+        """
+        self.buffer += chunk
+        changed = False
+        while self._step():
+            changed = changed or self._state in ("after_value", "after_item")
+        return changed
+
+    def _skip_whitespace(self) -> bool:
+        while self._pos < len(self.buffer) and self.buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        return self._pos < len(self.buffer)
+
+    def _decode(self):
+        """Decode one complete JSON value at the current position.
+
+        Returns:
+            Decoded value, or ``...`` if more input is needed
+        """
+        try:
+            value, end = self._decoder.raw_decode(self.buffer, self._pos)
+        except ValueError:
+            return ...
+        # 数字等标量在缓冲区末尾时可能尚未接收完整
+        if end == len(self.buffer) and self.buffer[self._pos] not in "\"[{":
+            return ...
+        self._pos = end
+        return value
+
+    def _step(self) -> bool:
+        """Advance the state machine by one token.
+
+        Returns:
+            True if progress was made, False if more input is needed
+        """
+        if self._state == "done" or not self._skip_whitespace():
+            return False
+        char = self.buffer[self._pos]
+
+        if self._state == "start":
+            # 跳过对象前的任何前缀（例如 ```json 代码块标记）
+            self._pos += 1
+            if char == "{":
+                self._state = "key"
+            return True
+
+        if self._state in ("key", "after_value"):
+            if char == "}":
+                self._pos += 1
+                self._state = "done"
+                return True
+            if char == ",":
+                self._pos += 1
+                self._state = "key"
+                return True
+            key = self._decode()
+            if key is ...:
+                return False
+            self._key = key
+            self._state = "colon"
+            return True
+
+        if self._state == "colon":
+            self._pos += 1
+            self._state = "value"
+            return True
+
+        if self._state == "value":
+            if char == "[":
+                self._pos += 1
+                self.fields[self._key] = []
+                self._state = "item"
+                return True
+            value = self._decode()
+            if value is ...:
+                return False
+            self.fields[self._key] = value
+            self._state = "after_value"
+            return True
+
+        # 数组内部："item" 等待元素，"after_item" 等待逗号或右括号
+        if char == "]":
+            self._pos += 1
+            self._state = "after_value"
+            return True
+        if char == ",":
+            self._pos += 1
+            self._state = "item"
+            return True
+        value = self._decode()
+        if value is ...:
+            return False
+        self.fields[self._key].append(value)
+        self._state = "after_item"
+        return True
@@ -0,0 +1,247 @@
+"""Opt-in phase timing spans exported as Chrome trace events."""
+import atexit
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACE_ENV = "AIGIT_TRACE"
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"", "0", "false", "no", "off"}
+
+
+@dataclass
+class Span:
+    """A timed phase of one aigit run.
+
+    Attributes:
+        name: Phase name such as ``git.add`` or ``ai.request``
+        category: Trace category, the part of the name before the first dot
+        start_ns: Start time from ``time.perf_counter_ns``
+        end_ns: End time, 0 while the span is open
+        thread_id: Identifier of the thread that ran the phase
+        args: Extra details, e.g. token usage or time to first token
+    """
+    name: str
+    category: str
+    start_ns: int
+    end_ns: int = 0
+    thread_id: int = 0
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        """Duration of the span in milliseconds."""
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class Tracer:
+    """Records nested spans per thread while enabled.
+
+    When disabled, ``span`` costs one attribute check, so instrumented
+    code paths stay on the normal fast path.
+    """
+
+    def __init__(self):
+        """Initialize a disabled tracer."""
+        self.enabled = False
+        self.path: Optional[str] = None
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self, path: str) -> None:
+        """Start recording spans; they are written to ``path`` by ``finish``.
+
+        Args:
+            path: Destination of the Chrome trace-event JSON
+        """
+        self.enabled = True
+        self.path = path
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[Optional[Span]]:
+        """Time the enclosed block as a span named ``name``.
+
+        Args:
+            name: Phase name; the part before the first dot is the category
+            args: Initial span details
+
+        Yields:
+            The open span, or None when tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = Span(
+            name,
+            name.split(".", 1)[0],
+            time.perf_counter_ns(),
+            thread_id=threading.get_ident(),
+            args=dict(args),
+        )
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.args["error"] = type(e).__name__
+            raise
+        finally:
+            span.end_ns = time.perf_counter_ns()
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+
+    def annotate(self, **args: Any) -> None:
+        """Add details to the innermost open span of this thread."""
+        stack = self._stack() if self.enabled else None
+        if stack:
+            stack[-1].args.update(args)
+
+    def mark(self, key: str) -> None:
+        """Record the milliseconds since the innermost span started as ``key``.
+
+        Only the first mark of a key is kept, so marking every chunk of a
+        stream records the time to the first one.
+        """
+        stack = self._stack() if self.enabled else None
+        if stack and key not in stack[-1].args:
+            stack[-1].args[key] = round((time.perf_counter_ns() - stack[-1].start_ns) / 1e6, 3)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Completed spans in Chrome trace-event format (``chrome://tracing``)."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start_ns - self._origin_ns) / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": span.args,
+                }
+                for span in spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Aggregate spans by name in order of first appearance.
+
+        Returns:
+            One row per phase with ``name``, ``count``, ``total_ms`` and
+            ``max_ms``, plus summed token fields where spans reported them
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        for span in spans:
+            row = rows.setdefault(
+                span.name, {"name": span.name, "count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            row["count"] += 1
+            row["total_ms"] += span.duration_ms
+            row["max_ms"] = max(row["max_ms"], span.duration_ms)
+            for key in TOKEN_FIELDS:
+                if isinstance(span.args.get(key), int):
+                    row[key] = row.get(key, 0) + span.args[key]
+        return list(rows.values())
+
+    def finish(self) -> None:
+        """Write the trace file and print the summary table to stderr."""
+        if not self.enabled or not self.spans:
+            return
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=f"aigit trace → {self.path}")
+        table.add_column("阶段")
+        table.add_column("次数", justify="right")
+        table.add_column("总耗时 (ms)", justify="right")
+        table.add_column("最长 (ms)", justify="right")
+        table.add_column("Tokens (输入/输出)", justify="right")
+        for row in self.summary():
+            tokens = ""
+            if "prompt_tokens" in row or "completion_tokens" in row:
+                tokens = f"{row.get('prompt_tokens', 0)}/{row.get('completion_tokens', 0)}"
+            table.add_row(
+                row["name"],
+                str(row["count"]),
+                f"{row['total_ms']:.1f}",
+                f"{row['max_ms']:.1f}",
+                tokens,
+            )
+        Console(file=sys.stderr).print(table)
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+def configure(trace: bool = False) -> bool:
+    """Enable tracing from ``--trace`` or ``$AIGIT_TRACE``.
+
+    ``AIGIT_TRACE`` may be a truthy value (``1``, ``true``) or the path of
+    the trace file. The default file lives in the temp directory rather
+    than the work tree, where ``git add -A`` would pick it up. The trace
+    is written when the process exits.
+
+    Args:
+        trace: Whether ``--trace`` was passed
+
+    Returns:
+        True if tracing is enabled
+    """
+    value = os.environ.get(TRACE_ENV, "").strip()
+    if not trace and value.lower() in _FALSE_VALUES:
+        return False
+    if value.lower() in _TRUE_VALUES | _FALSE_VALUES:
+        path = os.path.join(tempfile.gettempdir(), f"aigit-trace-{os.getpid()}.json")
+    else:
+        path = value
+    if not _tracer.enabled:
+        _tracer.enable(path)
+        atexit.register(_tracer.finish)
+    return True
+
+
+def span(name: str, **args: Any):
+    """Time a block on the process-wide tracer; see ``Tracer.span``."""
+    return _tracer.span(name, **args)
+
+
+def annotate(**args: Any) -> None:
+    """Add details to the current span; see ``Tracer.annotate``."""
+    _tracer.annotate(**args)
+
+
+def mark(key: str) -> None:
+    """Record time since the current span started; see ``Tracer.mark``."""
+    _tracer.mark(key)
@@ -2,23 +2,118 @@ import os
 import tempfile
 import subprocess
 import shutil
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
 from rich.syntax import Syntax
 from rich.console import Console
+from rich.live import Live
+from rich.text import Text
+from .pager import Pager
+from .tracing import span
 
 console = Console()
 
 ALLOWED_EDITORS = ["vim", "vi", "nano", "emacs", "code", "subl"]
 
-def beautify_diff(diff_output: str) -> None:
-    syntax = Syntax(
-        diff_output,
+# 逐块高亮输出：遇到文件或 hunk 边界且块已足够大时立即输出
+DIFF_BLOCK_MIN_LINES = 40
+DIFF_BLOCK_MAX_LINES = 400
+# 分页浏览 diff 时最多保留的页数，保证内存占用有上限
+DIFF_PAGER_MAX_PAGES = 64
+
+
+def iter_diff_blocks(
+    lines: Iterable[str],
+    min_lines: int = DIFF_BLOCK_MIN_LINES,
+    max_lines: int = DIFF_BLOCK_MAX_LINES,
+) -> Iterator[Tuple[int, List[str]]]:
+    """Group diff lines into blocks that can be highlighted independently.
+
+    Blocks end at a file or hunk boundary once they hold ``min_lines``
+    lines, and unconditionally at ``max_lines``, so a block is emitted as
+    soon as it is complete instead of after the whole diff was read.
+
+    Args:
+        lines: Diff lines without trailing newlines
+        min_lines: Lines before a block may end at a boundary
+        max_lines: Maximum lines per block
+
+    Yields:
+        Tuples of (number of the block's first line, block lines)
+    """
+    block: List[str] = []
+    start = 1
+    for number, line in enumerate(lines, 1):
+        at_boundary = line.startswith("diff --git ") or line.startswith("@@")
+        if block and ((at_boundary and len(block) >= min_lines) or len(block) >= max_lines):
+            yield start, block
+            block = []
+            start = number
+        block.append(line)
+    if block:
+        yield start, block
+
+
+def render_diff_block(lines: List[str], start_line: int = 1, word_wrap: bool = True) -> Syntax:
+    """Highlight a block of diff lines, numbered from ``start_line``."""
+    return Syntax(
+        "\n".join(lines),
         "diff",
         line_numbers=True,
-        word_wrap=True,
+        start_line=start_line,
+        word_wrap=word_wrap,
         indent_guides=False,
         theme="monokai",
     )
-    console.print(syntax)
+
+
+def beautify_diff(diff_output: Union[str, Iterable[str]], pager: bool = False) -> None:
+    """Print a highlighted diff while it is being read.
+
+    Args:
+        diff_output: Diff text, or an iterable of lines such as a git pipe
+        pager: Page through the diff when writing to a terminal
+    """
+    with span("render.diff", pager=pager):
+        _print_diff(diff_output, pager)
+
+
+def _print_diff(diff_output: Union[str, Iterable[str]], pager: bool) -> None:
+    lines = diff_output.split("\n") if isinstance(diff_output, str) else diff_output
+    if pager and console.is_terminal:
+        # 分页模式不折行，每页行数才与屏幕高度一致
+        Pager(
+            iter(lines),
+            lambda page, start: render_diff_block(page, start + 1, word_wrap=False),
+            console.size.height - 1,
+            console,
+            max_pages=DIFF_PAGER_MAX_PAGES,
+        ).run()
+        return
+    for start, block in iter_diff_blocks(lines):
+        console.print(render_diff_block(block, start))
+
+
+def render_partial_commit(fields: Dict[str, Any]) -> str:
+    """Render a partially generated commit message for the live preview."""
+    header = f"{fields.get('type', '…')}({fields.get('scope', '…')}): "
+    header += f"{fields.get('emoji', '')} {fields.get('subject', '…')}".strip()
+    items = "\n".join(f"- {item}" for item in fields.get("fix_items", []))
+    return f"{header}\n\n{items}" if items else header
+
+
+@contextmanager
+def commit_preview() -> Iterator[Callable[[Dict[str, Any]], None]]:
+    """Show a live preview of a commit message while it is being generated.
+
+    Yields:
+        Callback that re-renders the preview from the partial fields
+    """
+    with Live(Text("正在生成提交信息…", style="dim"), console=console, transient=True) as live:
+        def update(fields: Dict[str, Any]) -> None:
+            live.update(Text(render_partial_commit(fields), style="yellow"))
+
+        yield update
 
 
 def edit_commit_message(initial_message: str) -> str:
@@ -55,7 +150,8 @@ def edit_commit_message(initial_message: str) -> str:
     try:
         # 推荐使用 subprocess.run 替代 subprocess.call
         # check=True 会在命令返回非零退出码时抛出 CalledProcessError 异常
-        subprocess.run([editor_to_use, tf_name], check=True)
+        with span("editor", editor=editor_to_use):
+            subprocess.run([editor_to_use, tf_name], check=True)
     except FileNotFoundError:
         console.print(f"[red]Error:[/red] Editor command '{editor_to_use}' not found. Please check your installation and PATH.")
         os.unlink(tf_name)
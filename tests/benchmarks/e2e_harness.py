@@ -0,0 +1,254 @@
+"""Run ``aigit`` in a subprocess and compare its cost with stored baselines."""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# 回归判定的容差，可通过环境变量调整；设置 AIGIT_E2E_UPDATE_BASELINES=1 重新记录基线
+TIME_TOLERANCE = float(os.environ.get("AIGIT_E2E_TIME_TOLERANCE", "2.0"))
+# 耗时依赖机器，默认只报告；在记录基线的同一台机器上设置 AIGIT_E2E_CHECK_TIME=1 才比较
+CHECK_TIME = os.environ.get("AIGIT_E2E_CHECK_TIME") == "1"
+RSS_TOLERANCE = float(os.environ.get("AIGIT_E2E_RSS_TOLERANCE", "1.3"))
+SUBPROCESS_SLACK = int(os.environ.get("AIGIT_E2E_SUBPROCESS_SLACK", "0"))
+UPDATE_BASELINES = os.environ.get("AIGIT_E2E_UPDATE_BASELINES") == "1"
+
+# 在被测进程内统计子进程数量和峰值内存，退出时写入 $AIGIT_E2E_STATS
+_BOOTSTRAP = """
+import atexit, json, os, resource, subprocess, sys
+
+_spawned = []
+_popen_init = subprocess.Popen.__init__
+
+def _counting_init(self, args, *rest, **kwargs):
+    argv = [args] if isinstance(args, (str, bytes)) else list(args)
+    _spawned.append(" ".join(str(arg) for arg in argv[:2]))
+    _popen_init(self, args, *rest, **kwargs)
+
+subprocess.Popen.__init__ = _counting_init
+
+def _report():
+    with open(os.environ["AIGIT_E2E_STATS"], "w") as f:
+        json.dump({
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "commands": _spawned,
+        }, f)
+
+atexit.register(_report)
+sys.argv = ["aigit"] + sys.argv[1:]
+from ai_git_utils.main import app
+app()
+"""
+
+
+@dataclass
+class RunStats:
+    """Cost of one ``aigit`` invocation.
+
+    Attributes:
+        wall_ms: Wall time of the whole process, including interpreter start
+        peak_rss_mb: Peak resident memory of the aigit process
+        subprocesses: Number of processes it spawned (git, editor, ...)
+        returncode: Exit status
+        stdout: Captured standard output
+        stderr: Captured standard error
+        commands: First two arguments of every spawned process
+    """
+    wall_ms: float
+    peak_rss_mb: float
+    subprocesses: int
+    returncode: int
+    stdout: str
+    stderr: str
+    commands: List[str] = field(default_factory=list)
+
+
+def run_aigit(
+    args: List[str],
+    cwd: str,
+    home: str,
+    input: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> RunStats:
+    """Run ``aigit <args>`` in a fresh interpreter and measure it.
+
+    Args:
+        args: Command line arguments
+        cwd: Working directory, usually the synthetic repository
+        home: HOME for the run, holding ``.aigit/model.json``
+        input: Text fed to standard input
+        env: Extra environment variables
+
+    Returns:
+        RunStats of the run
+    """
+    fd, stats_path = tempfile.mkstemp(prefix="aigit-e2e-", suffix=".json")
+    os.close(fd)
+    run_env = dict(os.environ, HOME=home, AIGIT_E2E_STATS=stats_path, TERM="dumb", COLUMNS="120")
+    run_env.update(env or {})
+    try:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _BOOTSTRAP, *args],
+            cwd=cwd,
+            env=run_env,
+            input=input,
+            capture_output=True,
+            text=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        with open(stats_path, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    finally:
+        os.unlink(stats_path)
+    return RunStats(
+        wall_ms=wall_ms,
+        peak_rss_mb=stats["peak_rss_kb"] / 1024,
+        subprocesses=len(stats["commands"]),
+        returncode=result.returncode,
+        stdout=result.stdout,
+        stderr=result.stderr,
+        commands=stats["commands"],
+    )
+
+
+@contextmanager
+def running_daemon(home: str, env: Optional[Dict[str, str]] = None) -> Iterator[subprocess.Popen]:
+    """Run ``aigit serve`` for the duration of the block.
+
+    Args:
+        home: HOME for the daemon, holding ``.aigit/model.json``
+        env: Extra environment variables
+
+    Yields:
+        The daemon process, once its socket accepts connections
+    """
+    run_env = dict(os.environ, HOME=home)
+    run_env.update(env or {})
+    code = "import sys; sys.argv = ['aigit', 'serve']; from ai_git_utils.main import app; app()"
+    process = subprocess.Popen(
+        [sys.executable, "-c", code],
+        env=run_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    socket_path = run_env.get("AIGIT_SOCKET") or os.path.join(home, ".aigit", "daemon.sock")
+    try:
+        deadline = time.monotonic() + 30
+        while not os.path.exists(socket_path):
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"aigit serve did not start: {process.stderr.read().decode()}")
+            time.sleep(0.02)
+        yield process
+    finally:
+        process.terminate()
+        process.wait(10)
+        process.stderr.close()
+
+
+def stage_with_pregeneration(
+    cwd: str,
+    home: str,
+    env: Optional[Dict[str, str]] = None,
+    timeout: float = 60.0,
+) -> None:
+    """Install aigit's hooks, ``git add -A`` and wait for the background message.
+
+    Args:
+        cwd: Repository to stage in
+        home: HOME holding ``.aigit/model.json`` and the response cache
+        env: Extra environment variables
+        timeout: Seconds to wait for the pregeneration worker
+
+    Raises:
+        RuntimeError: If no message was pregenerated in time
+    """
+    from ai_git_utils.git_hooks import PREGENERATE_GUARD_ENV
+
+    run_env = dict(os.environ, HOME=home)
+    run_env.update(env or {})
+    run_env.pop(PREGENERATE_GUARD_ENV, None)
+    subprocess.run([sys.executable, "-m", "ai_git_utils.main", "hook", "install"],
+                   cwd=cwd, env=run_env, check=True, capture_output=True)
+    subprocess.run(["git", "add", "-A"], cwd=cwd, env=run_env, check=True)
+
+    cache_dir = os.path.join(home, ".aigit", "cache")
+    state_dir = os.path.join(cwd, ".git", "aigit-pregenerate")
+    deadline = time.monotonic() + timeout
+    # 工作进程写入缓存后才删除它的 .pid 标记
+    while not (_list(cache_dir) and not [n for n in _list(state_dir) if n.endswith(".pid")]):
+        if time.monotonic() > deadline:
+            raise RuntimeError("no commit message was pregenerated")
+        time.sleep(0.05)
+
+
+def _list(path: str) -> List[str]:
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+def load_baselines() -> Dict[str, Dict[str, float]]:
+    """Read the stored baselines, keyed by scenario name."""
+    try:
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def check_baseline(name: str, stats: RunStats) -> List[str]:
+    """Compare ``stats`` with the baseline of scenario ``name``.
+
+    Subprocess count and peak RSS are always checked. Wall time depends
+    on the machine, so it is only reported unless ``AIGIT_E2E_CHECK_TIME=1``
+    asks for it to be compared too. With ``AIGIT_E2E_UPDATE_BASELINES=1``
+    the baseline is replaced by ``stats`` instead. Scenarios without a
+    baseline always pass.
+
+    Args:
+        name: Scenario name
+        stats: Measured cost
+
+    Returns:
+        Human-readable regressions, empty if within tolerance
+    """
+    baselines = load_baselines()
+    if UPDATE_BASELINES:
+        measured = asdict(stats)
+        baselines[name] = {
+            key: round(measured[key], 1) for key in ("wall_ms", "peak_rss_mb", "subprocesses")
+        }
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return []
+
+    baseline = baselines.get(name)
+    if baseline is None:
+        return []
+    print(f"{name}: wall time {stats.wall_ms:.0f}ms (baseline {baseline['wall_ms']:.0f}ms)")
+    regressions = []
+    if CHECK_TIME and stats.wall_ms > baseline["wall_ms"] * TIME_TOLERANCE:
+        regressions.append(
+            f"{name}: wall time {stats.wall_ms:.0f}ms > {TIME_TOLERANCE}x baseline "
+            f"{baseline['wall_ms']:.0f}ms"
+        )
+    if stats.peak_rss_mb > baseline["peak_rss_mb"] * RSS_TOLERANCE:
+        regressions.append(
+            f"{name}: peak RSS {stats.peak_rss_mb:.1f}MB > {RSS_TOLERANCE}x baseline "
+            f"{baseline['peak_rss_mb']:.1f}MB"
+        )
+    if stats.subprocesses > baseline["subprocesses"] + SUBPROCESS_SLACK:
+        regressions.append(
+            f"{name}: {stats.subprocesses} subprocesses > baseline "
+            f"{baseline['subprocesses']:.0f} ({', '.join(stats.commands)})"
+        )
+    return regressions
@@ -0,0 +1,186 @@
+"""Local OpenAI-compatible chat completion server for benchmarks."""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+DEFAULT_CONTENT = json.dumps({
+    "type": "feat",
+    "scope": "bench",
+    "emoji": "✨",
+    "subject": "add synthetic changes",
+    "fix_items": ["update generated modules", "extend generated fixtures"],
+})
+# 流式响应中每个 chunk 携带的字符数，近似一个 token
+TOKEN_CHARS = 4
+
+
+class FakeLLMServer:
+    """OpenAI-compatible ``/chat/completions`` endpoint on localhost.
+
+    Latency, throughput and failures are configurable so that benchmarks
+    can reproduce slow or flaky providers without network access. Use it
+    as a context manager and point a model's ``base_url`` at
+    ``server.base_url``.
+
+    Attributes:
+        requests: Number of completion requests received
+        errors: Number of requests answered with an injected error
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_second: Optional[float] = None,
+        fail_first: int = 0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        content: str = DEFAULT_CONTENT,
+        seed: int = 0,
+    ):
+        """Initialize the server.
+
+        Args:
+            latency: Seconds before the first byte of every response
+            tokens_per_second: Generation speed, unlimited if None
+            fail_first: Answer this many requests with ``error_status``
+            error_rate: Probability of an injected error after that
+            error_status: HTTP status of injected errors
+            content: Message content returned by every completion
+            seed: Seed for the error injection
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.fail_first = fail_first
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.content = content
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to configure as the model's ``base_url``."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeLLMServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            fail = self.requests <= self.fail_first or self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+    def _tokens(self) -> List[str]:
+        return [
+            self.content[i:i + TOKEN_CHARS] for i in range(0, len(self.content), TOKEN_CHARS)
+        ]
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                # 连接预热只发送 HEAD 请求
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                time.sleep(server.latency)
+                if server._should_fail():
+                    self._send_json(server.error_status, {
+                        "error": {"message": "injected failure", "type": "server_error"},
+                    })
+                    return
+                if body.get("stream"):
+                    self._stream(body.get("model", "fake"))
+                else:
+                    self._complete(body.get("model", "fake"))
+
+            def _complete(self, model: str):
+                tokens = server._tokens()
+                time.sleep(server._token_delay() * len(tokens))
+                self._send_json(200, {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": 0,
+                        "completion_tokens": len(tokens),
+                        "total_tokens": len(tokens),
+                    },
+                })
+
+            def _stream(self, model: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                delay = server._token_delay()
+                for token in server._tokens() + [None]:
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": token} if token is not None else {},
+                            "finish_reason": None if token is not None else "stop",
+                        }],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def _send_json(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
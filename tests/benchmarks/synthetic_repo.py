@@ -0,0 +1,102 @@
+"""Synthetic git repositories of configurable size for benchmarks."""
+import os
+import subprocess
+from dataclasses import dataclass
+
+from git import Repo
+
+FILE_LINES = 40
+AUTHORS = 50
+
+
+@dataclass
+class SyntheticRepoSpec:
+    """Shape of a generated repository.
+
+    Attributes:
+        commits: History depth, including the initial commit
+        files: Number of tracked files, spread over ten packages
+        diff_lines: Lines changed in the working tree after the history
+    """
+    commits: int = 1000
+    files: int = 200
+    diff_lines: int = 500
+
+    @classmethod
+    def from_env(cls, prefix: str = "AIGIT_E2E") -> "SyntheticRepoSpec":
+        """Read the shape from ``<prefix>_COMMITS``, ``_FILES`` and ``_DIFF_LINES``."""
+        defaults = cls()
+        return cls(
+            commits=int(os.environ.get(f"{prefix}_COMMITS", defaults.commits)),
+            files=int(os.environ.get(f"{prefix}_FILES", defaults.files)),
+            diff_lines=int(os.environ.get(f"{prefix}_DIFF_LINES", defaults.diff_lines)),
+        )
+
+
+def file_path(index: int) -> str:
+    """Path of the ``index``-th generated file."""
+    return f"pkg{index % 10}/module_{index}.py"
+
+
+def file_content(index: int, revision: int = 0) -> str:
+    """Content of a generated file at a given revision."""
+    return "".join(
+        f"value_{index}_{line} = {revision * FILE_LINES + line}  # generated\n"
+        for line in range(FILE_LINES)
+    )
+
+
+def build_synthetic_repo(path: str, spec: SyntheticRepoSpec) -> Repo:
+    """Create a repository with ``spec.commits`` commits over ``spec.files`` files.
+
+    The first commit adds every file; each later commit rewrites one file,
+    cycling through them. The history is written with ``git fast-import``
+    and checked out, then ``spec.diff_lines`` lines are changed in the
+    working tree, spread over as few files as possible.
+
+    Args:
+        path: Directory to create the repository in
+        spec: Shape of the repository
+
+    Returns:
+        The checked-out repository with uncommitted changes
+    """
+    repo = Repo.init(path)
+    revisions = [0] * spec.files
+    chunks = []
+    for i in range(spec.commits):
+        author = f"Dev{i % AUTHORS} <dev{i % AUTHORS}@example.com> {1_500_000_000 + i * 60} +0000"
+        message = f"chore: update generated module {i}\n"
+        chunks.append(
+            f"commit refs/heads/master\nauthor {author}\ncommitter {author}\n"
+            f"data {len(message.encode('utf-8'))}\n{message}"
+        )
+        changed = range(spec.files) if i == 0 else [i % spec.files]
+        for index in changed:
+            if i:
+                revisions[index] += 1
+            content = file_content(index, revisions[index]).encode("utf-8")
+            chunks.append(f"M 100644 inline {file_path(index)}\ndata {len(content)}\n")
+            chunks.append(content.decode("utf-8") + "\n")
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        cwd=path,
+        input="".join(chunks),
+        text=True,
+        check=True,
+    )
+    repo.git.symbolic_ref("HEAD", "refs/heads/master")
+    repo.git.reset("--hard", "HEAD")
+
+    remaining = spec.diff_lines
+    for index in range(spec.files):
+        if remaining <= 0:
+            break
+        changed = min(remaining, FILE_LINES)
+        lines = file_content(index, revisions[index]).splitlines(keepends=True)
+        for line in range(changed):
+            lines[line] = f"value_{index}_{line} = 'changed'  # edited\n"
+        with open(os.path.join(path, file_path(index)), "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        remaining -= changed
+    return repo
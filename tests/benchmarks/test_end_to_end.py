@@ -0,0 +1,197 @@
+"""End-to-end benchmarks of ``aigit commit``, ``log`` and ``diff``.
+
+Every scenario runs the real CLI in a fresh interpreter against a
+synthetic repository (``AIGIT_E2E_COMMITS``, ``AIGIT_E2E_FILES`` and
+``AIGIT_E2E_DIFF_LINES`` set its shape) and, for ``commit``, a local
+fake OpenAI server. Peak RSS and spawned subprocesses are compared
+with ``baselines.json``; wall time is reported, and compared as well
+with ``AIGIT_E2E_CHECK_TIME=1``. ``commit_daemon`` measures the thin
+client forwarding to an already running ``aigit serve``;
+``commit_pregenerated`` a commit whose message the ``post-index-change``
+hook generated in the background after ``git add``; ``reword`` the
+regeneration of the last ``REWORD_COMMITS`` messages with bounded
+concurrency and a single history rewrite.
+"""
+import json
+import os
+import shutil
+
+import pytest
+from git import Repo
+
+from .e2e_harness import (
+    RunStats,
+    check_baseline,
+    run_aigit,
+    running_daemon,
+    stage_with_pregeneration,
+)
+from .fake_llm import FakeLLMServer
+from .synthetic_repo import SyntheticRepoSpec, build_synthetic_repo
+
+SPEC = SyntheticRepoSpec.from_env()
+# 模拟服务商的首字节延迟（秒）和生成速度（token/秒）
+LLM_LATENCY = float(os.environ.get("AIGIT_E2E_LLM_LATENCY", "0.05"))
+LLM_TOKENS_PER_SECOND = float(os.environ.get("AIGIT_E2E_LLM_TPS", "500"))
+REWORD_COMMITS = 20
+
+
+@pytest.fixture(scope="module")
+def synthetic_repo(tmp_path_factory) -> str:
+    """Build the synthetic repository once per module."""
+    path = str(tmp_path_factory.mktemp("e2e") / "repo")
+    build_synthetic_repo(path, SPEC)
+    return path
+
+
+@pytest.fixture
+def commit_repo(synthetic_repo, tmp_path) -> Repo:
+    """Private copy of the synthetic repository that a commit may modify."""
+    path = str(tmp_path / "repo")
+    shutil.copytree(synthetic_repo, path, symlinks=True)
+    return Repo(path)
+
+
+@pytest.fixture
+def aigit_home(tmp_path):
+    """HOME with an editor stub and a config factory for the fake server."""
+    home = tmp_path / "home"
+    bin_dir = home / "bin"
+    bin_dir.mkdir(parents=True)
+    # 允许列表中的编辑器名，直接接受生成的提交信息
+    editor = bin_dir / "nano"
+    editor.write_text("#!/bin/sh\nexit 0\n")
+    editor.chmod(0o755)
+
+    def configure(server: FakeLLMServer, **options) -> dict:
+        model = {
+            "model": "fake-model",
+            "base_url": server.base_url,
+            "api_key": "sk-fake",
+            "temperature": 0.2,
+            "retry_base_delay": 0.01,
+            **options,
+        }
+        (home / ".aigit").mkdir(exist_ok=True)
+        (home / ".aigit" / "model.json").write_text(json.dumps({
+            "models": {"fake": model},
+            "active_model": "fake",
+        }))
+        return {"EDITOR": "nano", "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}
+
+    configure.home = str(home)
+    return configure
+
+
+def _assert_within_baseline(name: str, stats: RunStats) -> None:
+    assert stats.returncode == 0, stats.stderr or stats.stdout
+    regressions = check_baseline(name, stats)
+    assert not regressions, "\n".join(regressions)
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+class TestEndToEndBenchmark:
+    """Guard memory and process count of whole commands and report their wall time."""
+
+    def test_commit(self, commit_repo, aigit_home):
+        """Test a full commit against a fake provider."""
+        with FakeLLMServer(LLM_LATENCY, LLM_TOKENS_PER_SECOND) as server:
+            env = aigit_home(server)
+            stats = run_aigit(["commit", "--no-cache"], commit_repo.working_dir,
+                              aigit_home.home, input="y\n", env=env)
+
+        _assert_within_baseline("commit", stats)
+        assert server.requests == 1
+        assert "add synthetic changes" in commit_repo.head.commit.message
+        assert not commit_repo.is_dirty(untracked_files=True)
+
+    def test_commit_stream(self, commit_repo, aigit_home):
+        """Test a streamed commit against a throughput-limited provider."""
+        with FakeLLMServer(LLM_LATENCY, LLM_TOKENS_PER_SECOND) as server:
+            env = aigit_home(server)
+            stats = run_aigit(["commit", "--no-cache", "--stream"], commit_repo.working_dir,
+                              aigit_home.home, input="y\n", env=env)
+
+        _assert_within_baseline("commit_stream", stats)
+        assert "add synthetic changes" in commit_repo.head.commit.message
+
+    def test_commit_daemon(self, commit_repo, aigit_home):
+        """Test a commit forwarded to a warm ``aigit serve``."""
+        with FakeLLMServer(LLM_LATENCY, LLM_TOKENS_PER_SECOND) as server:
+            env = aigit_home(server)
+            with running_daemon(aigit_home.home, env):
+                stats = run_aigit(["commit", "--no-cache"], commit_repo.working_dir,
+                                  aigit_home.home, input="y\n", env=env)
+        
+        _assert_within_baseline("commit_daemon", stats)
+        assert server.requests == 1
+        # 客户端只启动编辑器，git 命令都在守护进程中执行
+        assert stats.commands == [stats.commands[0]] and stats.commands[0].startswith("nano")
+        assert "add synthetic changes" in commit_repo.head.commit.message
+        assert not commit_repo.is_dirty(untracked_files=True)
+    
+    def test_commit_pregenerated(self, commit_repo, aigit_home):
+        """Test a commit whose message was generated in the background after ``git add``."""
+        with FakeLLMServer(LLM_LATENCY, LLM_TOKENS_PER_SECOND) as server:
+            env = aigit_home(server, pregenerate_debounce=0.1)
+            stage_with_pregeneration(commit_repo.working_dir, aigit_home.home, env)
+            assert server.requests == 1
+            stats = run_aigit(["commit"], commit_repo.working_dir,
+                              aigit_home.home, input="y\n", env=env)
+        
+        _assert_within_baseline("commit_pregenerated", stats)
+        assert server.requests == 1
+        assert "add synthetic changes" in commit_repo.head.commit.message
+        assert not commit_repo.is_dirty(untracked_files=True)
+    
+    def test_commit_retries_injected_errors(self, commit_repo, aigit_home):
+        """Test that transient provider errors are retried to success."""
+        with FakeLLMServer(LLM_LATENCY, fail_first=2) as server:
+            env = aigit_home(server, max_retries=3)
+            stats = run_aigit(["commit", "--no-cache"], commit_repo.working_dir,
+                              aigit_home.home, input="y\n", env=env)
+
+        _assert_within_baseline("commit_retry", stats)
+        assert (server.requests, server.errors) == (3, 2)
+        assert "add synthetic changes" in commit_repo.head.commit.message
+
+    def test_reword(self, commit_repo, aigit_home):
+        """Test regenerating the messages of a range of commits."""
+        old_head = commit_repo.head.commit
+        with FakeLLMServer(LLM_LATENCY, LLM_TOKENS_PER_SECOND) as server:
+            env = aigit_home(server, max_concurrency=4)
+            stats = run_aigit(["reword", f"HEAD~{REWORD_COMMITS}..", "--no-cache", "--yes"],
+                              commit_repo.working_dir, aigit_home.home, env=env)
+        
+        _assert_within_baseline("reword", stats)
+        assert server.requests == REWORD_COMMITS
+        new_commits = list(commit_repo.iter_commits(max_count=REWORD_COMMITS + 1))
+        assert all("add synthetic changes" in commit.message for commit in new_commits[:-1])
+        assert new_commits[-1] == commit_repo.commit(f"{old_head.hexsha}~{REWORD_COMMITS}")
+        assert commit_repo.head.commit.tree == old_head.tree
+    
+    def test_log(self, synthetic_repo, tmp_path):
+        """Test ``aigit log`` on a warm index and straight from git."""
+        home = str(tmp_path)
+        run_aigit(["log", "-n", "50"], synthetic_repo, home)
+        indexed = run_aigit(["log", "-n", "50"], synthetic_repo, home)
+        direct = run_aigit(["log", "-n", "50", "--no-index"], synthetic_repo, home)
+
+        _assert_within_baseline("log", indexed)
+        _assert_within_baseline("log_no_index", direct)
+        assert f"module {SPEC.commits - 1}" in indexed.stdout
+
+    def test_diff_current(self, synthetic_repo, tmp_path):
+        """Test the read-only working tree diff."""
+        stats = run_aigit(["diff", "current", "--no-pager"], synthetic_repo, str(tmp_path))
+
+        _assert_within_baseline("diff_current", stats)
+        assert "edited" in stats.stdout
+
+    def test_diff_commit(self, synthetic_repo, tmp_path):
+        """Test showing the diff of the latest commit."""
+        stats = run_aigit(["diff", "commit", "HEAD", "--no-pager"], synthetic_repo, str(tmp_path))
+
+        _assert_within_baseline("diff_commit", stats)
+        assert "generated" in stats.stdout
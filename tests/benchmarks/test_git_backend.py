@@ -0,0 +1,44 @@
+"""Benchmark comparing the GitPython and persistent git backends."""
+import os
+import time
+
+import pytest
+from git import Repo
+
+from ai_git_utils.git_backend import GitBackend, PersistentGitBackend
+
+# 读取的对象数量和持久化后端至少应达到的加速比，可通过环境变量调整
+OBJECT_READS = int(os.environ.get("AIGIT_BACKEND_BENCH_READS", "200"))
+MIN_SPEEDUP = float(os.environ.get("AIGIT_BACKEND_MIN_SPEEDUP", "3"))
+
+
+def _read_history(backend: GitBackend, count: int) -> float:
+    """Read ``count`` commits walking back from HEAD; return seconds taken."""
+    start = time.perf_counter()
+    for i in range(count):
+        assert backend.read_object(f"HEAD~{i}").type == "commit"
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+class TestGitBackendBenchmark:
+    """Compare object reads between the two backends."""
+
+    def test_persistent_backend_is_faster(self, temp_git_repo: Repo, temp_dir):
+        """Test that batched cat-file beats one git process per read."""
+        for i in range(OBJECT_READS):
+            temp_git_repo.index.commit(f"chore: commit {i}")
+
+        gitpython = GitBackend(temp_git_repo)
+        persistent = PersistentGitBackend(temp_git_repo)
+        try:
+            spawning = _read_history(gitpython, OBJECT_READS)
+            batched = _read_history(persistent, OBJECT_READS)
+        finally:
+            persistent.close()
+
+        assert spawning / batched >= MIN_SPEEDUP, (
+            f"persistent backend {batched * 1000:.1f}ms vs "
+            f"gitpython {spawning * 1000:.1f}ms for {OBJECT_READS} reads"
+        )
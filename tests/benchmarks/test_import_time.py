@@ -0,0 +1,72 @@
+"""Cold-start import benchmarks based on ``python -X importtime``."""
+import os
+import re
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+# 冷启动预算（毫秒），可通过环境变量调整以适配较慢的 CI 机器
+IMPORT_BUDGET_MS = float(os.environ.get("AIGIT_IMPORT_BUDGET_MS", "500"))
+
+HEAVY_MODULES = ["openai", "git", "rich.syntax", "rich.table"]
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _import_times(*argv: str) -> Dict[str, int]:
+    """Run the CLI under ``-X importtime`` and collect cumulative times.
+
+    Args:
+        argv: Arguments passed to the ``aigit`` entry point
+
+    Returns:
+        Mapping of module name to cumulative import time in microseconds,
+        plus a ``"<total>"`` entry summing all top-level imports
+    """
+    code = (
+        "import sys; sys.argv = ['aigit'] + sys.argv[1:]; "
+        "from ai_git_utils.main import app; app()"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *argv],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+    times: Dict[str, int] = {"<total>": 0}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        times[module] = cumulative
+        if len(indent) == 1:
+            times["<total>"] += cumulative
+    return times
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+class TestImportTime:
+    """Guard the cold-start cost of lightweight commands."""
+
+    @pytest.mark.parametrize("argv", [("version",), ("model", "list")])
+    def test_light_commands_skip_heavy_modules(self, argv):
+        """Test that light commands never import openai, git or rich.syntax."""
+        times = _import_times(*argv)
+
+        for module in HEAVY_MODULES:
+            if argv[0] == "model" and module == "rich.table":
+                continue
+            assert module not in times, f"'{' '.join(argv)}' imported {module}"
+
+    def test_version_cold_start_budget(self):
+        """Test that ``aigit version`` imports within the configured budget."""
+        total_ms = _import_times("version")["<total>"] / 1000
+
+        assert total_ms < IMPORT_BUDGET_MS, (
+            f"cold start {total_ms:.1f}ms exceeds budget {IMPORT_BUDGET_MS:.0f}ms"
+        )
@@ -0,0 +1,61 @@
+"""Query latency benchmark for the on-disk log index."""
+import os
+import subprocess
+import time
+
+import pytest
+from git import Repo
+
+from ai_git_utils.services.log_index import LogIndex
+
+# 合成历史的提交数量和查询预算（毫秒），可通过环境变量调整
+HISTORY_SIZE = int(os.environ.get("AIGIT_LOG_BENCH_COMMITS", "100000"))
+QUERY_BUDGET_MS = float(os.environ.get("AIGIT_LOG_QUERY_BUDGET_MS", "200"))
+
+
+def _synthetic_history(path: str, commits: int) -> Repo:
+    """Create a repository with ``commits`` empty commits via fast-import."""
+    repo = Repo.init(path)
+    lines = []
+    for i in range(commits):
+        author = f"Dev{i % 50} <dev{i % 50}@example.com> {1_500_000_000 + i * 60} +0000"
+        message = f"chore: commit {i}\n"
+        lines.append("commit refs/heads/master")
+        lines.append(f"author {author}")
+        lines.append(f"committer {author}")
+        # 同一分支上的后续提交由 fast-import 自动以上一个提交为父提交
+        lines.append(f"data {len(message)}\n{message}")
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        cwd=path,
+        input="\n".join(lines) + "\n",
+        text=True,
+        check=True,
+    )
+    repo.git.symbolic_ref("HEAD", "refs/heads/master")
+    return repo
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+class TestLogIndexBenchmark:
+    """Guard query latency on large histories."""
+
+    def test_indexed_queries_within_budget(self, tmp_path):
+        """Test that filtered queries on an up-to-date index stay fast."""
+        repo = _synthetic_history(str(tmp_path), HISTORY_SIZE)
+        LogIndex(repo).refresh()
+
+        start = time.perf_counter()
+        index = LogIndex(repo)
+        latest = list(index.query(limit=50))
+        by_author = list(index.query(limit=50, author="Dev7"))
+        by_date = list(index.query(limit=50, since="2017-08-01", until="2017-08-02"))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert latest[0].subject == f"chore: commit {HISTORY_SIZE - 1}"
+        assert len(by_author) == 50
+        assert by_date
+        assert elapsed_ms < QUERY_BUDGET_MS, (
+            f"indexed queries took {elapsed_ms:.1f}ms, budget {QUERY_BUDGET_MS:.0f}ms"
+        )
@@ -10,6 +10,53 @@ from git import Repo
 load_dotenv(".env.test", override=True)
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep the response cache and circuit state out of the real ~/.aigit."""
+    cache_dir = tmp_path_factory.mktemp("aigit_cache")
+    monkeypatch.setattr("ai_git_utils.services.response_cache.CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(
+        "ai_git_utils.services.resilience.CIRCUIT_FILE", str(cache_dir / "circuit.json")
+    )
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(tmp_path_factory, monkeypatch):
+    """Point the daemon socket at an empty directory so commands run in-process."""
+    socket_dir = tmp_path_factory.mktemp("aigit_daemon")
+    monkeypatch.setenv("AIGIT_SOCKET", str(socket_dir / "daemon.sock"))
+    return socket_dir / "daemon.sock"
+
+
+@pytest.fixture(autouse=True)
+def no_pregenerate(monkeypatch):
+    """Keep installed post-index-change hooks from starting background workers."""
+    from ai_git_utils.git_hooks import PREGENERATE_GUARD_ENV
+    
+    monkeypatch.setenv(PREGENERATE_GUARD_ENV, "1")
+    return PREGENERATE_GUARD_ENV
+
+
+@pytest.fixture(autouse=True)
+def fresh_client_registry():
+    """Give every test its own set of shared OpenAI clients."""
+    from ai_git_utils.services.client_registry import clear_clients
+    
+    clear_clients()
+    yield
+    clear_clients()
+
+
+@pytest.fixture(autouse=True)
+def fresh_git_backends():
+    """Close persistent git processes started by a test."""
+    from ai_git_utils.git_backend import clear_backends
+    
+    yield
+    clear_backends()
+
+
 @pytest.fixture(scope="session")
 def test_env_vars():
     """Provide test environment variables for integration tests."""
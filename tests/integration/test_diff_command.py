@@ -1,5 +1,6 @@
 """Integration tests for diff command."""
 import pytest
+from pathlib import Path
 from typer.testing import CliRunner
 from ai_git_utils.cli.app import app
 
@@ -54,4 +55,21 @@ class TestDiffCommand:
         result = runner.invoke(app, ["diff", "current"])
         
         assert result.exit_code == 0
-        assert "没有检测到更改" in result.stdout
\ No newline at end of file
+        assert "没有检测到更改" in result.stdout    
+    def test_diff_current_is_read_only(self, temp_git_repo, temp_dir, monkeypatch):
+        """Test that viewing changes shows untracked files and leaves the index alone."""
+        (temp_dir / "README.md").write_text("# Changed")
+        (temp_dir / "untracked.py").write_text("print('new')\n")
+        index_path = Path(temp_git_repo.git_dir) / "index"
+        index_before = index_path.read_bytes()
+        
+        monkeypatch.chdir(temp_dir)
+        
+        runner = CliRunner()
+        result = runner.invoke(app, ["diff", "current", "--no-pager"])
+        
+        assert result.exit_code == 0
+        assert "README.md" in result.stdout
+        assert "untracked.py" in result.stdout
+        assert index_path.read_bytes() == index_before
+        assert temp_git_repo.git.diff("--staged") == ""
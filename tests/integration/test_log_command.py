@@ -147,4 +147,60 @@ with multiple lines
         # Check that there's a line with exactly 7 characters (the hash)
         lines = result.stdout.split('\n')
         hash_lines = [line.strip() for line in lines if len(line.strip()) == 7]
-        assert len(hash_lines) > 0
\ No newline at end of file
+        assert len(hash_lines) > 0
+    
+    def test_log_with_author_filter(self, temp_git_repo, temp_dir, monkeypatch):
+        """Test log command filtering by author."""
+        test_file = temp_dir / "test.py"
+        test_file.write_text("def test(): pass")
+        temp_git_repo.index.add(["test.py"])
+        temp_git_repo.index.commit("Test commit")
+        
+        monkeypatch.chdir(temp_dir)
+        
+        runner = CliRunner()
+        result = runner.invoke(app, ["log", "--author", "Nobody"])
+        
+        assert result.exit_code == 0
+        assert "Test commit" not in result.stdout
+        
+        result = runner.invoke(app, ["log", "--author", "Test User"])
+        assert "Test commit" in result.stdout
+    
+    def test_log_with_grep_and_path(self, temp_git_repo, temp_dir, monkeypatch):
+        """Test log command filtering by message and path."""
+        (temp_dir / "a.py").write_text("a = 1")
+        temp_git_repo.index.add(["a.py"])
+        temp_git_repo.index.commit("feat: add a")
+        (temp_dir / "b.py").write_text("b = 1")
+        temp_git_repo.index.add(["b.py"])
+        temp_git_repo.index.commit("fix: add b")
+        
+        monkeypatch.chdir(temp_dir)
+        
+        runner = CliRunner()
+        result = runner.invoke(app, ["log", "--grep", "feat"])
+        assert "feat: add a" in result.stdout
+        assert "fix: add b" not in result.stdout
+        
+        result = runner.invoke(app, ["log", "b.py"])
+        assert "fix: add b" in result.stdout
+        assert "feat: add a" not in result.stdout
+    
+    def test_log_pager_without_tty_streams_plain_rows(self, temp_git_repo, temp_dir, monkeypatch):
+        """Test that --pager falls back to plain rows when not on a terminal."""
+        (temp_dir / "a.py").write_text("a = 1")
+        temp_git_repo.index.add(["a.py"])
+        temp_git_repo.index.commit("feat: add a")
+        
+        monkeypatch.chdir(temp_dir)
+        
+        runner = CliRunner()
+        result = runner.invoke(app, ["log", "--pager"])
+        
+        assert result.exit_code == 0
+        lines = result.stdout.strip().split("\n")
+        assert len(lines) == 2
+        assert lines[0].split("\t")[3] == "feat: add a"
+        assert lines[0].split("\t")[1] == "Test User"
+        assert "Git Log" not in result.stdout
@@ -0,0 +1,43 @@
+"""Unit tests for the lazily loaded CLI application."""
+import subprocess
+import sys
+
+import pytest
+from typer.testing import CliRunner
+from ai_git_utils.cli.app import app
+
+
+@pytest.mark.unit
+class TestApp:
+    """Test cases for lazy command registration."""
+
+    def test_importing_app_skips_command_modules(self):
+        """Test that importing the app does not import command modules."""
+        code = (
+            "import sys; import ai_git_utils.cli.app; "
+            "print(','.join(m for m in ('ai_git_utils.cli.commit', 'openai', 'git') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == ""
+
+    def test_help_lists_all_commands(self):
+        """Test that top-level help lists every lazy command."""
+        runner = CliRunner()
+        result = runner.invoke(app, ["--help"])
+
+        assert result.exit_code == 0
+        for name in ("commit", "log", "version", "model", "diff", "serve", "hook", "reword"):
+            assert name in result.stdout
+
+    def test_sub_app_help(self):
+        """Test that lazy sub-applications keep their own commands."""
+        runner = CliRunner()
+        result = runner.invoke(app, ["model", "--help"])
+
+        assert result.exit_code == 0
+        assert "list" in result.stdout
+        assert "--install-completion" not in result.stdout
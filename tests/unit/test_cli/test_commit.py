@@ -32,7 +32,7 @@ class TestCommitCommand:
                 'temperature': 0.7
             }
             
-            with patch('ai_git_utils.cli.commit.CommitService') as mock_service_class:
+            with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
                 mock_service = Mock()
                 mock_service_class.return_value = mock_service
                 mock_service.prepare_commit_message.side_effect = InvalidGitRepositoryError()
@@ -53,7 +53,7 @@ class TestCommitCommand:
                 'temperature': 0.7
             }
             
-            with patch('ai_git_utils.cli.commit.CommitService') as mock_service_class:
+            with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
                 mock_service = Mock()
                 mock_service_class.return_value = mock_service
                 mock_service.prepare_commit_message.side_effect = GitCommandError("git error")
@@ -74,7 +74,7 @@ class TestCommitCommand:
                 'temperature': 0.7
             }
             
-            with patch('ai_git_utils.cli.commit.CommitService') as mock_service_class:
+            with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
                 mock_service = Mock()
                 mock_service_class.return_value = mock_service
                 mock_service.prepare_commit_message.return_value = None
@@ -95,7 +95,7 @@ class TestCommitCommand:
                 'temperature': 0.7
             }
             
-            with patch('ai_git_utils.cli.commit.CommitService') as mock_service_class:
+            with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
                 mock_service = Mock()
                 mock_service_class.return_value = mock_service
                 mock_service.prepare_commit_message.return_value = "feat: test commit"
@@ -116,11 +116,109 @@ class TestCommitCommand:
                 'temperature': 0.7
             }
             
-            with patch('ai_git_utils.cli.commit.CommitService') as mock_service_class:
+            with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
                 mock_service = Mock()
                 mock_service_class.return_value = mock_service
                 mock_service.prepare_commit_message.return_value = "feat: 测试提交"
                 
                 runner.invoke(app, ["commit", "--lang", "Chinese"])
                 
-                mock_service.prepare_commit_message.assert_called_once_with(".", None, "Chinese")
\ No newline at end of file
+                mock_service.prepare_commit_message.assert_called_once_with(".", None, "Chinese")
+
+    def test_commit_cache_flags(self):
+        """Test that --no-cache and --refresh reach the commit service."""
+        runner = CliRunner()
+        
+        with patch('ai_git_utils.cli.commit.get_active_model') as mock_get_model:
+            mock_get_model.return_value = {'model': 'gpt-4'}
+            
+            with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
+                mock_service_class.return_value.prepare_commit_message.return_value = None
+                
+                runner.invoke(app, ["commit", "--no-cache", "--refresh"])
+                
+                mock_service_class.assert_called_once_with(
+                    use_cache=False, refresh=True, stream=False, race=False
+                )
+
+    def test_commit_split(self):
+        """Test that --split shows every planned commit and commits them together."""
+        runner = CliRunner()
+        
+        with patch('ai_git_utils.cli.commit.get_active_model') as mock_get_model:
+            mock_get_model.return_value = {'model': 'gpt-4'}
+            
+            with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
+                mock_service = mock_service_class.return_value
+                splits = [
+                    Mock(paths=["src/app.py"], message="✨ feat: add app"),
+                    Mock(paths=["docs/guide.md"], message="📚 docs: add guide"),
+                ]
+                mock_service.prepare_split_commits.return_value = splits
+                mock_service.commit_split.return_value = 2
+                
+                result = runner.invoke(app, ["commit", "--split"], input="y\n")
+                
+                assert "src/app.py" in result.stdout
+                assert "📚 docs: add guide" in result.stdout
+                mock_service.prepare_split_commits.assert_called_once_with(".", "English")
+                mock_service.commit_split.assert_called_once_with(".", splits)
+                mock_service.prepare_commit_message.assert_not_called()
+
+    def test_commit_split_rejects_file(self):
+        """Test that --split cannot be limited to one file."""
+        runner = CliRunner()
+        
+        with patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
+            result = runner.invoke(app, ["commit", "--split", "--file", "a.py"])
+            
+            assert result.exit_code == 1
+            assert "不能与 --file 同时使用" in result.stderr
+            mock_service_class.assert_not_called()
+
+    def test_commit_through_daemon(self):
+        """Test that a running daemon drafts and commits while editing stays local."""
+        runner = CliRunner()
+        client = Mock()
+        client.draft.return_value = {"message": "feat: daemon", "tree": "t" * 40, "head": "h" * 40}
+        
+        with patch('ai_git_utils.cli.commit.get_active_model', return_value={'model': 'gpt-4'}), \
+                patch('ai_git_utils.daemon.client.DaemonClient.connect', return_value=client), \
+                patch('ai_git_utils.utils.edit_commit_message', side_effect=lambda m: m + " (edited)"), \
+                patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
+            result = runner.invoke(app, ["commit", "--lang", "Chinese"], input="y\n")
+        
+        assert "更改已成功提交" in result.stdout
+        assert client.draft.call_args.args[1:] == (None, "Chinese", True, False, False)
+        client.commit.assert_called_once_with(
+            client.draft.call_args.args[0], "feat: daemon (edited)", "t" * 40, "h" * 40
+        )
+        mock_service_class.assert_not_called()
+
+    def test_commit_daemon_error(self):
+        """Test that errors raised inside the daemon are reported like local ones."""
+        from ai_git_utils.daemon.client import DaemonError
+        
+        runner = CliRunner()
+        client = Mock()
+        client.draft.side_effect = DaemonError("InvalidGitRepositoryError", "/tmp/x")
+        
+        with patch('ai_git_utils.cli.commit.get_active_model', return_value={'model': 'gpt-4'}), \
+                patch('ai_git_utils.daemon.client.DaemonClient.connect', return_value=client):
+            result = runner.invoke(app, ["commit"])
+        
+        assert "当前目录不是有效的Git仓库" in result.stderr
+
+    def test_commit_no_daemon_flag(self):
+        """Test that --no-daemon never contacts the daemon."""
+        runner = CliRunner()
+        
+        with patch('ai_git_utils.cli.commit.get_active_model', return_value={'model': 'gpt-4'}), \
+                patch('ai_git_utils.daemon.client.DaemonClient.connect') as mock_connect, \
+                patch('ai_git_utils.services.commit_service.CommitService') as mock_service_class:
+            mock_service_class.return_value.prepare_commit_message.return_value = None
+            
+            runner.invoke(app, ["commit", "--no-daemon"])
+        
+        mock_connect.assert_not_called()
+        mock_service_class.return_value.prepare_commit_message.assert_called_once()
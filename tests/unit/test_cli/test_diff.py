@@ -10,8 +10,8 @@ class TestDiff:
     
     def test_diff_current_no_changes(self, mocker, temp_git_repo):
         """Test diff current command when there are no changes."""
-        # Mock get_git_diff to return None
-        mocker.patch('ai_git_utils.cli.diff.get_git_diff', return_value=None)
+        # Mock iter_worktree_diff to produce no lines
+        mocker.patch('ai_git_utils.cli.diff.iter_worktree_diff', return_value=iter([]))
         runner = CliRunner()
         
         result = runner.invoke(diff_app, ["current"])
@@ -20,24 +20,42 @@ class TestDiff:
     
     def test_diff_current_with_changes(self, mocker, temp_git_repo):
         """Test diff current command with changes."""
-        # Mock get_git_diff to return diff output
-        mock_diff = "diff --git a/file.py b/file.py\n+ new line"
-        mocker.patch('ai_git_utils.cli.diff.get_git_diff', return_value=mock_diff)
-        mocker.patch('ai_git_utils.cli.diff.beautify_diff')
+        # Mock iter_worktree_diff to stream diff lines
+        mock_diff = ["diff --git a/file.py b/file.py", "+ new line"]
+        mocker.patch('ai_git_utils.cli.diff.iter_worktree_diff', return_value=iter(mock_diff))
+        mock_beautify = mocker.patch('ai_git_utils.cli.diff.beautify_diff')
         runner = CliRunner()
         
         result = runner.invoke(diff_app, ["current"])
         
         assert result.exit_code == 0
+        lines, pager = mock_beautify.call_args[0]
+        assert list(lines) == mock_diff
+        assert pager is True
+    
+    def test_diff_current_stage(self, mocker, temp_git_repo):
+        """Test that --stage stages everything and diffs the index."""
+        mock_staged = mocker.patch('ai_git_utils.cli.diff.iter_git_diff', return_value=iter([]))
+        mock_worktree = mocker.patch('ai_git_utils.cli.diff.iter_worktree_diff')
+        mock_repo = mocker.patch('ai_git_utils.cli.diff.Repo').return_value
+        runner = CliRunner()
+        
+        result = runner.invoke(diff_app, ["current", "--stage"])
+        
+        assert result.exit_code == 0
+        mock_repo.git.add.assert_called_once_with('.')
+        mock_staged.assert_called_once_with(mock_repo, True, None)
+        mock_worktree.assert_not_called()
     
     def test_diff_commit(self, mocker, temp_git_repo):
         """Test diff commit command."""
-        # Mock get_commit_diff to return diff output
-        mock_diff = "diff --git a/file.py b/file.py\n+ new line"
-        mocker.patch('ai_git_utils.cli.diff.get_commit_diff', return_value=mock_diff)
-        mocker.patch('ai_git_utils.cli.diff.beautify_diff')
+        # Mock iter_commit_diff to stream diff lines
+        mock_diff = iter(["diff --git a/file.py b/file.py", "+ new line"])
+        mocker.patch('ai_git_utils.cli.diff.iter_commit_diff', return_value=mock_diff)
+        mock_beautify = mocker.patch('ai_git_utils.cli.diff.beautify_diff')
         runner = CliRunner()
         
-        result = runner.invoke(diff_app, ["commit", "abc123"])
+        result = runner.invoke(diff_app, ["commit", "abc123", "--no-pager"])
         
-        assert result.exit_code == 0
\ No newline at end of file
+        assert result.exit_code == 0
+        mock_beautify.assert_called_once_with(mock_diff, False)
\ No newline at end of file
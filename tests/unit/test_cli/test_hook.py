@@ -0,0 +1,108 @@
+"""Unit tests for hook command."""
+import os
+import pytest
+from typer.testing import CliRunner
+from unittest.mock import patch
+from ai_git_utils.cli.app import app
+from ai_git_utils.models.commit_message import CommitMessage
+
+TEMPLATE = "\n# Please enter the commit message for your changes.\n"
+
+
+@pytest.mark.unit
+class TestHookCommand:
+    """Test cases for hook command."""
+    
+    def test_install_and_uninstall(self, temp_git_repo, temp_dir, monkeypatch):
+        """Test installing and removing the hooks."""
+        monkeypatch.chdir(temp_dir)
+        runner = CliRunner()
+        
+        result = runner.invoke(app, ["hook", "install", "--lang", "Chinese"])
+        
+        assert result.exit_code == 0
+        assert "prepare-commit-msg" in result.stdout
+        assert "post-index-change" in result.stdout
+        assert (temp_dir / ".git" / "hooks" / "post-index-change").exists()
+        
+        result = runner.invoke(app, ["hook", "uninstall"])
+        
+        assert result.exit_code == 0
+        assert not (temp_dir / ".git" / "hooks" / "post-index-change").exists()
+        assert "没有找到" in runner.invoke(app, ["hook", "uninstall"]).stdout
+    
+    def test_install_refuses_foreign_hook(self, temp_git_repo, temp_dir, monkeypatch):
+        """Test that another tool's hook is kept unless --force is given."""
+        monkeypatch.chdir(temp_dir)
+        (temp_dir / ".git" / "hooks").mkdir(exist_ok=True)
+        (temp_dir / ".git" / "hooks" / "post-index-change").write_text("#!/bin/sh\n")
+        runner = CliRunner()
+        
+        result = runner.invoke(app, ["hook", "install"])
+        
+        assert result.exit_code == 1
+        assert "--force" in result.stderr
+        assert runner.invoke(app, ["hook", "install", "--force"]).exit_code == 0
+    
+    def test_prepare_commit_msg_fills_message(self, tmp_path):
+        """Test that the message is written above git's template."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text(TEMPLATE)
+        message = CommitMessage(type="feat", scope="", subject="add a", emoji="", fix_items=[])
+        
+        with patch('ai_git_utils.cli.hook.get_active_model', return_value={"model": "m"}), \
+                patch('ai_git_utils.cli.hook.Pregenerator') as mock_pregenerator:
+            mock_pregenerator.return_value.message_for_index.return_value = message
+            result = CliRunner().invoke(app, ["hook", "prepare-commit-msg", str(message_file)])
+        
+        assert result.exit_code == 0
+        assert message_file.read_text() == message.to_string() + "\n" + TEMPLATE
+    
+    @pytest.mark.parametrize("source", ["message", "merge", "commit"])
+    def test_prepare_commit_msg_keeps_given_message(self, tmp_path, source):
+        """Test that -m, merges and amends keep their message."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("fix: typo\n" + TEMPLATE)
+        
+        with patch('ai_git_utils.cli.hook.get_active_model', return_value={"model": "m"}), \
+                patch('ai_git_utils.cli.hook.Pregenerator') as mock_pregenerator:
+            result = CliRunner().invoke(
+                app, ["hook", "prepare-commit-msg", str(message_file), source, "HEAD"]
+            )
+        
+        assert result.exit_code == 0
+        assert message_file.read_text() == "fix: typo\n" + TEMPLATE
+        mock_pregenerator.assert_not_called()
+    
+    def test_prepare_commit_msg_never_blocks_commit(self, tmp_path):
+        """Test that a failing generation leaves the commit to the user."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text(TEMPLATE)
+        
+        with patch('ai_git_utils.cli.hook.get_active_model', return_value={"model": "m"}), \
+                patch('ai_git_utils.cli.hook.Pregenerator') as mock_pregenerator:
+            mock_pregenerator.return_value.message_for_index.side_effect = RuntimeError("offline")
+            result = CliRunner().invoke(app, ["hook", "prepare-commit-msg", str(message_file)])
+        
+        assert result.exit_code == 0
+        assert "offline" in result.stderr
+        assert message_file.read_text() == TEMPLATE
+    
+    def test_pregenerate(self, temp_git_repo, temp_dir, monkeypatch, no_pregenerate):
+        """Test that the worker schedules itself and runs with its token."""
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.delenv(no_pregenerate)
+        
+        with patch('ai_git_utils.cli.hook.get_active_model',
+                   return_value={"pregenerate_debounce": 0.5}), \
+                patch('ai_git_utils.cli.hook.Pregenerator') as mock_pregenerator:
+            pregenerator = mock_pregenerator.from_model_config.return_value
+            result = CliRunner().invoke(app, ["hook", "pregenerate", "--lang", "Chinese"])
+        
+        assert result.exit_code == 0
+        mock_pregenerator.from_model_config.assert_called_once_with(
+            ".", "Chinese", {"pregenerate_debounce": 0.5}
+        )
+        pregenerator.run.assert_called_once_with(pregenerator.schedule.return_value)
+        # 工作进程自己写入的索引不会再启动新的工作进程
+        assert os.environ[no_pregenerate] == "1"
@@ -100,4 +100,24 @@ class TestModel:
         result = runner.invoke(model_app, ["show"])
         
         assert result.exit_code == 0
-        assert "当前没有保存的模型配置" in result.stdout
\ No newline at end of file
+        assert "当前没有保存的模型配置" in result.stdout
+    
+    def test_set_model_option(self, mocker):
+        """Test setting a tuning option on the active model."""
+        mocker.patch('ai_git_utils.cli.model.load_config', return_value={"active_model": "m", "models": {}})
+        mock_update = mocker.patch('ai_git_utils.cli.model.update_model_in_config', return_value=True)
+        runner = CliRunner()
+        
+        result = runner.invoke(model_app, ["set", "max_concurrency", "8"])
+        
+        assert result.exit_code == 0
+        mock_update.assert_called_once_with("m", {"max_concurrency": 8})
+    
+    def test_set_model_option_unknown_model(self, mocker):
+        """Test setting an option on a model that does not exist."""
+        mocker.patch('ai_git_utils.cli.model.update_model_in_config', return_value=False)
+        runner = CliRunner()
+        
+        result = runner.invoke(model_app, ["set", "key", "value", "--name", "missing"])
+        
+        assert result.exit_code == 1
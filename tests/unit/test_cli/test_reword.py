@@ -0,0 +1,109 @@
+"""Unit tests for reword command."""
+import os
+import pytest
+from typer.testing import CliRunner
+from unittest.mock import patch
+from ai_git_utils.cli.app import app
+from ai_git_utils.git_operations import read_commit_message
+from ai_git_utils.models.commit_message import CommitMessage
+from ai_git_utils.services.reword_service import CHECKPOINT_FILE
+
+MODEL_CONFIG = {
+    'base_url': 'https://api.openai.com/v1',
+    'api_key': 'test-key',
+    'model': 'gpt-4',
+}
+MESSAGE = CommitMessage(type="feat", scope="", subject="add file", emoji="", fix_items=[])
+
+
+@pytest.fixture
+def wip_history(temp_git_repo, temp_dir, monkeypatch):
+    """Two "wip" commits and a mocked model, run from inside the repository."""
+    for index in range(2):
+        (temp_dir / f"file{index}.py").write_text(f"x = {index}\n")
+        temp_git_repo.index.add([f"file{index}.py"])
+        temp_git_repo.index.commit("wip")
+    monkeypatch.chdir(temp_dir)
+    with patch('ai_git_utils.cli.reword.get_active_model', return_value=MODEL_CONFIG), \
+            patch('ai_git_utils.services.commit_service.get_active_model', return_value=MODEL_CONFIG), \
+            patch('ai_git_utils.services.commit_service.AIService') as mock_ai_class:
+        mock_ai_class.return_value.generate_commit_message.return_value = MESSAGE
+        yield mock_ai_class.return_value
+
+
+@pytest.mark.unit
+class TestRewordCommand:
+    """Test cases for reword command."""
+
+    def test_reword_no_active_model(self):
+        """Test reword command when no active model is configured."""
+        runner = CliRunner()
+
+        with patch('ai_git_utils.cli.reword.get_active_model', return_value=None):
+            result = runner.invoke(app, ["reword", "HEAD~1.."])
+
+        assert result.exit_code == 1
+        assert "未找到激活的模型配置" in result.stdout
+
+    def test_reword_confirmed(self, wip_history, temp_git_repo):
+        """Test that confirmed messages replace those of the range."""
+        old_head = temp_git_repo.head.commit.hexsha
+        runner = CliRunner()
+
+        result = runner.invoke(app, ["reword", "HEAD~2..", "--jobs", "2", "--no-cache"], input="y\n")
+
+        assert result.exit_code == 0
+        assert "正在为 2 个提交生成提交信息（最多同时 2 个）" in result.stdout
+        assert "→ " + MESSAGE.to_string().splitlines()[0] in result.stdout
+        assert f"git reset --soft {old_head[:7]}" in result.stdout
+        assert wip_history.generate_commit_message.call_count == 2
+        for rev in ("HEAD", "HEAD~1"):
+            assert read_commit_message(temp_git_repo, rev).strip() == MESSAGE.to_string().strip()
+
+    def test_reword_cancelled_keeps_progress(self, wip_history, temp_git_repo):
+        """Test that a cancelled run leaves history alone and is resumed without the model."""
+        old_head = temp_git_repo.head.commit.hexsha
+        runner = CliRunner()
+
+        result = runner.invoke(app, ["reword", "HEAD~2..", "--no-cache"], input="n\n")
+
+        assert "改写已取消" in result.stdout
+        assert temp_git_repo.head.commit.hexsha == old_head
+        assert os.path.exists(os.path.join(temp_git_repo.git_dir, CHECKPOINT_FILE))
+
+        result = runner.invoke(app, ["reword", "HEAD~2..", "--no-cache", "--yes"])
+
+        assert "已有 2 个提交信息无需重新生成" in result.stdout
+        assert wip_history.generate_commit_message.call_count == 2
+        assert temp_git_repo.head.commit.hexsha != old_head
+        assert not os.path.exists(os.path.join(temp_git_repo.git_dir, CHECKPOINT_FILE))
+
+    def test_reword_interrupted(self, wip_history, temp_git_repo):
+        """Test that Ctrl+C exits with a hint instead of a traceback."""
+        wip_history.generate_commit_message.side_effect = KeyboardInterrupt
+        runner = CliRunner()
+
+        result = runner.invoke(app, ["reword", "HEAD~2..", "--no-cache", "--jobs", "1"])
+
+        assert result.exit_code == 130
+        assert "重新运行相同的命令即可继续" in result.stderr
+
+    def test_reword_invalid_range(self, wip_history, temp_git_repo, temp_dir):
+        """Test ranges that are unknown, empty or not part of HEAD's history."""
+        temp_git_repo.git.checkout("-b", "side", "HEAD~1")
+        (temp_dir / "side.py").write_text("side = 1\n")
+        temp_git_repo.index.add(["side.py"])
+        temp_git_repo.index.commit("wip")
+        temp_git_repo.git.checkout("-")
+        runner = CliRunner()
+
+        result = runner.invoke(app, ["reword", "no-such-branch.."])
+        assert "Git命令执行错误" in result.stderr
+
+        result = runner.invoke(app, ["reword", "HEAD..side"])
+        assert result.exit_code == 1
+        assert "is not part of the history of HEAD" in result.stderr
+        wip_history.generate_commit_message.assert_not_called()
+
+        result = runner.invoke(app, ["reword", "HEAD..HEAD"])
+        assert "没有需要改写的提交" in result.stdout
@@ -0,0 +1,50 @@
+"""Unit tests for serve command."""
+import threading
+import time
+
+import pytest
+from typer.testing import CliRunner
+from unittest.mock import patch
+from ai_git_utils.cli.app import app
+
+
+@pytest.mark.unit
+class TestServeCommand:
+    """Test cases for serve command."""
+    
+    def test_stop_without_daemon(self):
+        """Test that --stop reports when nothing is running."""
+        result = CliRunner().invoke(app, ["serve", "--stop"])
+        
+        assert result.exit_code == 0
+        assert "没有正在运行的 aigit 守护进程" in result.stdout
+    
+    def test_serve_and_stop(self, no_daemon):
+        """Test that the daemon answers, stops on request and removes its socket."""
+        from ai_git_utils.daemon.client import DaemonClient
+        
+        runner = CliRunner()
+        results = []
+        with patch('ai_git_utils.daemon.server.get_active_model', return_value={}), \
+                patch('ai_git_utils.cli.serve.signal.signal'):
+            thread = threading.Thread(target=lambda: results.append(runner.invoke(app, ["serve"])))
+            thread.start()
+            for _ in range(100):
+                if DaemonClient.connect() is not None:
+                    break
+                time.sleep(0.05)
+            DaemonClient.connect().shutdown()
+            thread.join(5)
+        
+        assert results[0].exit_code == 0
+        assert "aigit 守护进程已退出" in results[0].stdout
+        assert not no_daemon.exists()
+    
+    def test_serve_refuses_second_daemon(self):
+        """Test that a second daemon on the same socket exits with an error."""
+        with patch('ai_git_utils.daemon.server.DaemonServer.bind',
+                   side_effect=RuntimeError("Another daemon is already listening on x")):
+            result = CliRunner().invoke(app, ["serve"])
+        
+        assert result.exit_code == 1
+        assert "already listening" in result.stderr
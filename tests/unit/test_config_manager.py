@@ -154,4 +154,85 @@ class TestConfigManager:
             
             active = get_active_model()
             assert active["model"] == "gpt-4o"
-            assert active["api_key"] == "sk-test"
\ No newline at end of file
+            assert active["api_key"] == "sk-test"
+    
+    def test_update_model_in_config(self, tmp_path):
+        """Test updating settings of an existing model."""
+        config_file = tmp_path / "test_update.json"
+        
+        with patch('ai_git_utils.config_manager.CONFIG_FILE', str(config_file)):
+            from ai_git_utils.config_manager import (
+                add_model_to_config,
+                update_model_in_config,
+                get_active_model
+            )
+            
+            add_model_to_config("m", {"model": "gpt-4o"})
+            
+            assert update_model_in_config("m", {"max_concurrency": 8}) is True
+            assert update_model_in_config("missing", {"x": 1}) is False
+            assert get_active_model()["max_concurrency"] == 8
+    
+    def test_load_config_uses_cache(self, mock_config_file):
+        """Test that an unchanged file is parsed only once."""
+        with patch('ai_git_utils.config_manager.CONFIG_FILE', str(mock_config_file)):
+            from ai_git_utils.config_manager import load_config
+            
+            load_config()
+            with patch('ai_git_utils.config_manager.json.load') as mock_json_load:
+                config = load_config()
+                mock_json_load.assert_not_called()
+            
+            assert config["active_model"] == "test-model"
+    
+    def test_load_config_returns_independent_copies(self, mock_config_file):
+        """Test that mutating a loaded config does not corrupt the cache."""
+        with patch('ai_git_utils.config_manager.CONFIG_FILE', str(mock_config_file)):
+            from ai_git_utils.config_manager import load_config
+            
+            load_config()["models"].clear()
+            
+            assert "test-model" in load_config()["models"]
+    
+    def test_load_config_sees_external_changes(self, mock_config_file):
+        """Test that replacing the file invalidates the cache."""
+        with patch('ai_git_utils.config_manager.CONFIG_FILE', str(mock_config_file)):
+            from ai_git_utils.config_manager import load_config
+            
+            load_config()
+            replacement = mock_config_file.with_name("replacement.json")
+            replacement.write_text(json.dumps({"models": {}, "active_model": "other"}))
+            replacement.replace(mock_config_file)
+            
+            assert load_config()["active_model"] == "other"
+    
+    def test_save_config_is_atomic_and_private(self, tmp_path):
+        """Test that saving leaves no temp files and restricts permissions."""
+        config_file = tmp_path / "atomic.json"
+        
+        with patch('ai_git_utils.config_manager.CONFIG_FILE', str(config_file)):
+            from ai_git_utils.config_manager import save_config
+            
+            save_config({"models": {}, "active_model": None})
+            
+            assert [p.name for p in tmp_path.iterdir()] == ["atomic.json"]
+            assert config_file.stat().st_mode & 0o777 == 0o600
+    
+    def test_concurrent_updates_are_not_lost(self, tmp_path):
+        """Test that parallel read-modify-write cycles are serialized."""
+        import threading
+        config_file = tmp_path / "concurrent.json"
+        
+        with patch('ai_git_utils.config_manager.CONFIG_FILE', str(config_file)):
+            from ai_git_utils.config_manager import add_model_to_config, load_config
+            
+            threads = [
+                threading.Thread(target=add_model_to_config, args=(f"m{i}", {"model": str(i)}))
+                for i in range(10)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            assert len(load_config()["models"]) == 10
@@ -0,0 +1,189 @@
+"""Unit tests for the daemon server and its client."""
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ai_git_utils.daemon.client import DaemonClient, DaemonError
+from ai_git_utils.daemon.server import DaemonServer, RequestCoalescer
+from ai_git_utils.models.commit_message import CommitMessage
+
+
+@pytest.fixture
+def fake_ai():
+    """Replace the model with a function recording its calls."""
+    calls = []
+    state = {"hold": None}
+
+    def generate(diff_output, language="English", on_update=None, **kwargs):
+        calls.append(diff_output)
+        if state["hold"] is not None:
+            state["hold"].wait(5)
+        if on_update is not None:
+            on_update({"type": "feat"})
+        return CommitMessage(type="feat", scope="", subject="daemon", emoji="", fix_items=[])
+
+    with patch('ai_git_utils.services.commit_service.AIService') as ai_class, \
+            patch('ai_git_utils.services.commit_service.get_active_model', return_value={}), \
+            patch('ai_git_utils.daemon.server.get_active_model', return_value={}):
+        ai_class.return_value.generate_commit_message.side_effect = generate
+        yield calls, state
+
+
+@pytest.fixture
+def daemon(no_daemon, fake_ai):
+    """DaemonServer serving on a temporary socket in a background thread."""
+    server = DaemonServer(str(no_daemon))
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(5)
+    server.close()
+
+
+@pytest.mark.unit
+class TestRequestCoalescer:
+    """Test cases for RequestCoalescer."""
+    
+    def test_identical_concurrent_calls_run_once(self):
+        """Test that callers with the same key share one call."""
+        coalescer = RequestCoalescer()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+        
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+        
+        results = []
+        leader = threading.Thread(target=lambda: results.append(coalescer.run("k", slow)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(coalescer.run("k", slow)))
+            for _ in range(3)
+        ]
+        for follower in followers:
+            follower.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+        
+        assert results == ["result"] * 4
+        assert len(calls) == 1
+        assert coalescer.run("k", lambda: "again") == "again"
+    
+    def test_exception_is_shared_and_forgotten(self):
+        """Test that a failure reaches the caller and is not cached."""
+        coalescer = RequestCoalescer()
+        
+        with pytest.raises(ValueError):
+            coalescer.run("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+        
+        assert coalescer.run("k", lambda: 1) == 1
+
+
+@pytest.mark.unit
+class TestDaemonServer:
+    """Test cases for DaemonServer."""
+    
+    def test_connect_without_daemon(self, no_daemon, tmp_path):
+        """Test that clients fall back when nothing listens."""
+        assert DaemonClient.connect() is None
+        (tmp_path / "stale.sock").write_text("")
+        assert DaemonClient.connect(str(tmp_path / "stale.sock")) is None
+    
+    def test_draft_and_commit(self, daemon, fake_ai, temp_git_repo, temp_dir):
+        """Test a full draft/commit round trip through the socket."""
+        calls, _ = fake_ai
+        (temp_dir / "a.py").write_text("a = 1\n")
+        client = DaemonClient.connect()
+        updates = []
+        
+        draft = client.draft(str(temp_dir), language="English", on_update=updates.append)
+        (temp_dir / "late.py").write_text("late = 1\n")
+        client.commit(str(temp_dir), "feat: daemon", draft["tree"], draft["head"])
+        
+        assert draft["message"].startswith("feat(")
+        assert updates == [{"type": "feat"}]
+        assert "+a = 1" in calls[0]
+        head = temp_git_repo.head.commit
+        assert head.message == "feat: daemon"
+        assert [blob.path for blob in head.tree.blobs] == ["README.md", "a.py"]
+        assert client.draft(str(temp_dir)) is not None
+    
+    def test_draft_without_changes(self, daemon, temp_git_repo, temp_dir):
+        """Test that a clean repository yields no draft."""
+        assert DaemonClient.connect().draft(str(temp_dir)) is None
+    
+    def test_errors_are_reported_by_type(self, daemon, tmp_path):
+        """Test that daemon-side exceptions reach the client with their type."""
+        client = DaemonClient.connect()
+        
+        with pytest.raises(DaemonError) as excinfo:
+            client.draft(str(tmp_path))
+        assert excinfo.value.kind in ("InvalidGitRepositoryError", "NoSuchPathError")
+        
+        with pytest.raises(DaemonError, match="Unknown operation"):
+            client.request("bogus")
+    
+    def test_identical_drafts_share_one_model_call(self, daemon, fake_ai, temp_git_repo, temp_dir):
+        """Test that concurrent identical requests are coalesced."""
+        calls, state = fake_ai
+        (temp_dir / "a.py").write_text("a = 1\n")
+        state["hold"] = threading.Event()
+        joined = []
+        run = daemon.coalescer.run
+        
+        def counting_run(key, func):
+            joined.append(key)
+            if len(joined) == 2:
+                state["hold"].set()
+            return run(key, func)
+        
+        daemon.coalescer.run = counting_run
+        drafts = []
+        threads = [
+            threading.Thread(target=lambda: drafts.append(DaemonClient().draft(str(temp_dir))))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        
+        assert len(drafts) == 2
+        assert drafts[0] == drafts[1]
+        assert len(calls) == 1
+    
+    def test_bind_refuses_running_daemon_and_replaces_stale_socket(self, daemon, tmp_path):
+        """Test socket ownership checks on startup."""
+        with pytest.raises(RuntimeError, match="already listening"):
+            DaemonServer(daemon.path).bind()
+        
+        stale = tmp_path / "stale.sock"
+        stale.write_text("")
+        server = DaemonServer(str(stale))
+        server.bind()
+        try:
+            assert oct(os.stat(stale).st_mode & 0o777) == "0o600"
+        finally:
+            server.close()
+        assert not stale.exists()
+    
+    def test_shutdown_request(self, daemon):
+        """Test that the shutdown operation stops the server."""
+        DaemonClient.connect().shutdown()
+        
+        for _ in range(50):
+            if DaemonClient.connect() is None:
+                break
+            time.sleep(0.05)
+        assert DaemonClient.connect() is None
@@ -0,0 +1,81 @@
+"""Unit tests for diff_utils module."""
+import pytest
+from ai_git_utils.diff_utils import (
+    diff_file_paths,
+    group_diff_chunks,
+    split_diff_files,
+    split_file_hunks,
+    unquote_path,
+)
+
+
+def _file_diff(name: str, hunks: int = 1, lines: int = 3) -> str:
+    body = "".join(
+        f"@@ -{i},1 +{i},1 @@\n" + "".join(f"+line {i}.{j}\n" for j in range(lines))
+        for i in range(hunks)
+    )
+    return (
+        f"diff --git a/{name} b/{name}\n"
+        f"--- a/{name}\n"
+        f"+++ b/{name}\n"
+        f"{body}"
+    )
+
+
+@pytest.mark.unit
+class TestDiffUtils:
+    """Test cases for diff splitting and packing."""
+
+    def test_split_diff_files(self):
+        """Test splitting a diff into per-file parts."""
+        diff = _file_diff("a.py") + _file_diff("b.py")
+
+        parts = split_diff_files(diff)
+
+        assert len(parts) == 2
+        assert parts[0].startswith("diff --git a/a.py")
+        assert "".join(parts) == diff
+
+    def test_diff_file_paths_unquotes(self):
+        """Test that quoted and escaped header paths are returned as is on disk."""
+        diff = (
+            'diff --git "a/\\344\\270\\255.txt" "b/\\344\\270\\255.txt"\n'
+            "diff --git a/with space.py b/with space.py\n"
+            'diff --git "a/say \\"hi\\"\\t.txt" "b/say \\"hi\\"\\t.txt"\n'
+        )
+
+        assert diff_file_paths(diff) == ["中.txt", "with space.py", 'say "hi"\t.txt']
+        assert unquote_path("plain.py") == "plain.py"
+
+    def test_split_file_hunks(self):
+        """Test splitting a file diff into header and hunks."""
+        header, *hunks = split_file_hunks(_file_diff("a.py", hunks=3))
+
+        assert header.startswith("diff --git")
+        assert len(hunks) == 3
+        assert all(h.startswith("@@") for h in hunks)
+
+    def test_group_small_files_together(self):
+        """Test that small files are packed into one chunk."""
+        diff = _file_diff("a.py") + _file_diff("b.py")
+
+        assert group_diff_chunks(diff, 10000) == [diff]
+
+    def test_group_respects_max_chars(self):
+        """Test that files are packed without exceeding the limit."""
+        files = [_file_diff(f"f{i}.py") for i in range(6)]
+        size = len(files[0]) * 2
+
+        chunks = group_diff_chunks("".join(files), size)
+
+        assert len(chunks) == 3
+        assert "".join(chunks) == "".join(files)
+
+    def test_oversized_file_split_by_hunk(self):
+        """Test that a huge file is split at hunk boundaries with its header."""
+        diff = _file_diff("big.py", hunks=10, lines=20)
+
+        chunks = group_diff_chunks(diff, len(diff) // 3)
+
+        assert len(chunks) > 1
+        assert all(c.startswith("diff --git a/big.py") for c in chunks)
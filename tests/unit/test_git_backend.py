@@ -0,0 +1,127 @@
+"""Unit tests for git_backend module."""
+import pytest
+from git import Repo
+from git.exc import GitCommandError
+from pathlib import Path
+from ai_git_utils.git_backend import (
+    GitBackend,
+    PersistentGitBackend,
+    get_backend,
+    parse_object_header,
+)
+
+
+@pytest.fixture
+def repo_with_history(temp_git_repo: Repo, temp_dir: Path) -> Repo:
+    """Repository with a second commit and staged plus unstaged changes."""
+    (temp_dir / "app.py").write_text("def main():\n    return 1\n")
+    temp_git_repo.index.add(["app.py"])
+    temp_git_repo.index.commit("feat: add app\n\nWith a body.")
+    (temp_dir / "app.py").write_text("def main():\n    return 2\n")
+    (temp_dir / "new.py").write_text("x = 1\n")
+    temp_git_repo.index.add(["new.py"])
+    return temp_git_repo
+
+
+@pytest.mark.unit
+class TestGitBackend:
+    """Test cases for the git backends."""
+
+    @pytest.mark.parametrize("staged", [True, False])
+    def test_backends_produce_identical_diffs(self, repo_with_history, staged):
+        """Test that plumbing diffs match the porcelain ones."""
+        gitpython = GitBackend(repo_with_history)
+        persistent = PersistentGitBackend(repo_with_history)
+
+        expected = gitpython.run(*gitpython.diff_args(staged, []))
+        assert expected
+        assert persistent.run(*persistent.diff_args(staged, [])) == expected
+
+    def test_backends_produce_identical_commit_diffs(self, repo_with_history):
+        """Test that diff-tree matches ``git diff <commit>^!``."""
+        gitpython = GitBackend(repo_with_history)
+        persistent = PersistentGitBackend(repo_with_history)
+
+        expected = list(gitpython.iter_lines(*gitpython.commit_diff_args("HEAD")))
+        assert list(persistent.iter_lines(*persistent.commit_diff_args("HEAD"))) == expected
+
+    def test_persistent_commit_diff_of_root_commit(self, temp_git_repo):
+        """Test that the first commit is diffed against the empty tree."""
+        backend = PersistentGitBackend(temp_git_repo)
+
+        diff = backend.run(*backend.commit_diff_args("HEAD"))
+
+        assert "+# Test Repository" in diff
+
+    @pytest.mark.parametrize("backend_class", [GitBackend, PersistentGitBackend])
+    def test_read_object(self, repo_with_history, backend_class):
+        """Test reading objects and headers by revision expression."""
+        backend = backend_class(repo_with_history)
+
+        commit = backend.read_object("HEAD")
+        blob = backend.object_info("HEAD:app.py")
+
+        assert commit.sha == repo_with_history.head.commit.hexsha
+        assert commit.type == "commit"
+        assert commit.data.endswith(b"feat: add app\n\nWith a body.")
+        assert len(commit.data) == commit.size
+        assert (blob.type, blob.size, blob.data) == ("blob", 25, None)
+        assert backend.read_object("does-not-exist") is None
+        backend.close()
+
+    @pytest.mark.parametrize("backend_class", [GitBackend, PersistentGitBackend])
+    def test_read_objects(self, repo_with_history, backend_class):
+        """Test reading several objects at once, missing ones as None."""
+        backend = backend_class(repo_with_history)
+
+        objects = backend.read_objects(["HEAD", "does-not-exist", "HEAD:app.py"])
+
+        assert objects[0].data == backend.read_object("HEAD").data
+        assert objects[1] is None
+        assert objects[2].data == b"def main():\n    return 1\n"
+        backend.close()
+
+    @pytest.mark.parametrize("object_format", ["sha1", "sha256"])
+    def test_object_writer(self, tmp_path, object_format):
+        """Test that objects are written by git in the repository's object format."""
+        repo = Repo.init(tmp_path, object_format=object_format)
+        backend = GitBackend(repo)
+
+        with backend.object_writer("blob") as write:
+            first = write(b"one\n")
+            second = write(b"two\n")
+
+        assert len(first) == (40 if object_format == "sha1" else 64)
+        assert backend.read_object(second).data == b"two\n"
+        with pytest.raises(GitCommandError), backend.object_writer("commit") as write:
+            write(b"not a commit\n")
+
+    def test_persistent_backend_reuses_processes(self, repo_with_history):
+        """Test that repeated reads go to the same cat-file process."""
+        backend = PersistentGitBackend(repo_with_history)
+
+        backend.read_object("HEAD")
+        process = backend._processes["--batch"]
+        backend.read_object("HEAD~1")
+        backend.read_object("HEAD:app.py")
+
+        assert backend._processes["--batch"] is process
+        backend.close()
+        assert process.poll() is not None
+
+    def test_get_backend_selection(self, temp_git_repo, monkeypatch):
+        """Test choosing the backend by name or environment variable."""
+        monkeypatch.delenv("AIGIT_GIT_BACKEND", raising=False)
+        assert type(get_backend(temp_git_repo)) is GitBackend
+        assert get_backend(temp_git_repo) is get_backend(temp_git_repo)
+
+        monkeypatch.setenv("AIGIT_GIT_BACKEND", "persistent")
+        assert isinstance(get_backend(temp_git_repo), PersistentGitBackend)
+
+        with pytest.raises(ValueError, match="Unknown git backend"):
+            get_backend(temp_git_repo, "libgit2")
+
+    def test_parse_object_header(self):
+        """Test parsing cat-file replies."""
+        assert parse_object_header(b"abc blob 12\n").size == 12
+        assert parse_object_header(b"HEAD:nope missing\n") is None
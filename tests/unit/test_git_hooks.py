@@ -0,0 +1,79 @@
+"""Unit tests for git_hooks module."""
+import os
+import subprocess
+import time
+import pytest
+from git import Repo
+from pathlib import Path
+from ai_git_utils.git_hooks import (
+    HOOK_MARKER,
+    PREGENERATE_GUARD_ENV,
+    hook_script,
+    hooks_dir,
+    install_hooks,
+    uninstall_hooks,
+)
+
+
+@pytest.mark.unit
+class TestGitHooks:
+    """Test cases for installing aigit's hooks."""
+
+    def test_install_and_uninstall(self, temp_git_repo: Repo):
+        """Test that both hooks are installed executable and removed again."""
+        paths = install_hooks(temp_git_repo, "Chinese")
+
+        assert [os.path.basename(path) for path in paths] == [
+            "prepare-commit-msg", "post-index-change"
+        ]
+        for path in paths:
+            assert os.access(path, os.X_OK)
+            assert HOOK_MARKER in Path(path).read_text()
+        assert "hook prepare-commit-msg --lang Chinese" in Path(paths[0]).read_text()
+        assert "hook pregenerate --lang Chinese" in Path(paths[1]).read_text()
+
+        assert uninstall_hooks(temp_git_repo) == paths
+        assert not any(os.path.exists(path) for path in paths)
+
+    def test_install_keeps_foreign_hooks(self, temp_git_repo: Repo):
+        """Test that hooks of other tools are only replaced with force."""
+        foreign = Path(hooks_dir(temp_git_repo)) / "prepare-commit-msg"
+        foreign.parent.mkdir(parents=True, exist_ok=True)
+        foreign.write_text("#!/bin/sh\nexit 0\n")
+
+        with pytest.raises(FileExistsError):
+            install_hooks(temp_git_repo)
+        assert not (foreign.parent / "post-index-change").exists()
+        assert uninstall_hooks(temp_git_repo) == []
+        assert foreign.exists()
+
+        install_hooks(temp_git_repo, force=True)
+        assert HOOK_MARKER in foreign.read_text()
+
+    def test_hooks_dir_honours_hooks_path(self, temp_git_repo: Repo, temp_dir: Path):
+        """Test that core.hooksPath is respected."""
+        temp_git_repo.git.config("core.hooksPath", ".githooks")
+
+        paths = install_hooks(temp_git_repo)
+
+        assert os.path.dirname(paths[0]) == str(temp_dir / ".githooks")
+
+    def test_post_index_change_guard(self, tmp_path: Path):
+        """Test that the worker is not started while the guard is set."""
+        script = tmp_path / "post-index-change"
+        script.write_text(hook_script("post-index-change").replace(
+            "-m ai_git_utils.main", "-c 'open(\"started\", \"w\")'"
+        ))
+
+        env = dict(os.environ, **{PREGENERATE_GUARD_ENV: "1"})
+        subprocess.run(["sh", str(script), "0", "0"], cwd=tmp_path, env=env, check=True)
+        time.sleep(0.5)
+        assert not (tmp_path / "started").exists()
+
+        del env[PREGENERATE_GUARD_ENV]
+        subprocess.run(["sh", str(script), "0", "0"], cwd=tmp_path, env=env, check=True)
+        for _ in range(100):
+            if (tmp_path / "started").exists():
+                break
+            time.sleep(0.05)
+        assert (tmp_path / "started").exists()
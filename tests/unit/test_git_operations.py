@@ -62,4 +62,206 @@ class TestGitOperations:
         diff = get_commit_diff(repo_with_multiple_commits, commit_hash)
         
         assert diff is not None
-        assert "file2.py" in diff
\ No newline at end of file
+        assert "file2.py" in diff
+    
+    def test_build_log_args(self):
+        """Test translating log filters into git log arguments."""
+        from ai_git_utils.git_operations import build_log_args
+        
+        args = build_log_args(5, "2024-01-01", "2024-02-01", "alice", "fix", ["src"])
+        
+        assert "--max-count=5" in args
+        assert "--since=2024-01-01 00:00:00" in args
+        assert "--until=2024-02-01 23:59:59" in args
+        assert "--author=alice" in args
+        assert "--grep=fix" in args
+        assert args[-2:] == ["--", "src"]
+    
+    def test_iter_log(self, repo_with_multiple_commits: Repo):
+        """Test streaming log entries from git log."""
+        from ai_git_utils.git_operations import iter_log
+        
+        entries = list(iter_log(repo_with_multiple_commits))
+        
+        assert [e.subject for e in entries] == ["Add file2", "Add file1", "Initial commit"]
+        assert entries[0].hexsha == repo_with_multiple_commits.head.commit.hexsha
+        assert entries[0].author == "Test User"
+    
+    def test_iter_log_with_limit_and_path(self, repo_with_multiple_commits: Repo):
+        """Test that limit and path filters are applied by git."""
+        from ai_git_utils.git_operations import iter_log
+        
+        assert len(list(iter_log(repo_with_multiple_commits, limit=1))) == 1
+        
+        entries = list(iter_log(repo_with_multiple_commits, paths=["file1.py"]))
+        assert [e.subject for e in entries] == ["Add file1"]
+    
+    def test_iter_log_stops_early(self, repo_with_multiple_commits: Repo):
+        """Test that closing the iterator early terminates git cleanly."""
+        from ai_git_utils.git_operations import iter_log
+        
+        entries = iter_log(repo_with_multiple_commits)
+        first = next(entries)
+        entries.close()
+        
+        assert first.subject == "Add file2"
+
+    def test_read_commit_message(self, temp_git_repo: Repo, temp_dir: Path):
+        """Test reading a full commit message."""
+        from ai_git_utils.git_operations import read_commit_message
+        
+        (temp_dir / "a.py").write_text("a = 1")
+        temp_git_repo.index.add(["a.py"])
+        temp_git_repo.index.commit("feat: add a\n\n- details")
+        
+        assert read_commit_message(temp_git_repo, "HEAD") == "feat: add a\n\n- details"
+        assert read_commit_message(temp_git_repo, "HEAD:a.py") is None
+    
+    def test_iter_worktree_diff(self, temp_git_repo: Repo, temp_dir: Path):
+        """Test that staged, unstaged and untracked changes are all shown."""
+        from ai_git_utils.git_operations import iter_worktree_diff
+        
+        (temp_dir / "README.md").write_text("# Test Repository\nmore\n")
+        (temp_dir / "staged.py").write_text("s = 1\n")
+        temp_git_repo.index.add(["staged.py"])
+        (temp_dir / "notes.txt").write_text("one\ntwo")
+        (temp_dir / "data.bin").write_bytes(b"\x00\x01")
+        (temp_dir / "poetry.lock").write_text("locked\n")
+        
+        diff = "\n".join(iter_worktree_diff(temp_git_repo))
+        
+        assert "+more" in diff
+        assert "+s = 1" in diff
+        assert "+++ b/notes.txt\n@@ -0,0 +1,2 @@\n+one\n+two\n\\ No newline at end of file" in diff
+        assert "Binary files /dev/null and b/data.bin differ" in diff
+        assert "poetry.lock" not in diff
+    
+    def test_iter_worktree_diff_file_mode(self, temp_git_repo: Repo, temp_dir: Path):
+        """Test that untracked executables follow core.fileMode."""
+        from ai_git_utils.git_operations import iter_worktree_diff
+        
+        script = temp_dir / "run.sh"
+        script.write_text("#!/bin/sh\n" + "echo\n" * 5000)
+        script.chmod(0o755)
+        
+        diff = "\n".join(iter_worktree_diff(temp_git_repo))
+        assert "new file mode 100755" in diff
+        assert "@@ -0,0 +1,5001 @@" in diff
+        
+        temp_git_repo.git.config("core.fileMode", "false")
+        diff = "\n".join(iter_worktree_diff(temp_git_repo))
+        assert "new file mode 100644" in diff
+    
+    def test_get_staged_tree_numstat(self, temp_git_repo: Repo, temp_dir: Path):
+        """Test line counts for edits, renames and binary files."""
+        from ai_git_utils.git_operations import get_staged_tree_numstat, stage_changes
+        
+        temp_git_repo.git.mv("README.md", "docs.md")
+        (temp_dir / "a.py").write_text("a = 1\nb = 2\n")
+        (temp_dir / "data.bin").write_bytes(b"\x00\x01")
+        
+        stats = get_staged_tree_numstat(
+            temp_git_repo, stage_changes(temp_git_repo), options=["--find-renames"]
+        )
+        
+        by_path = {stat.path: stat for stat in stats}
+        assert set(by_path) == {"a.py", "data.bin", "docs.md"}
+        assert (by_path["a.py"].added, by_path["a.py"].deleted) == (2, 0)
+        assert by_path["data.bin"].binary
+        assert by_path["docs.md"].changed_lines == 0
+    
+    def test_write_index_tree(self, temp_git_repo: Repo, temp_dir: Path, monkeypatch):
+        """Test that the index is written as a tree without being touched."""
+        from ai_git_utils.git_operations import stage_changes, write_index_tree
+        
+        (temp_dir / "a.py").write_text("a = 1\n")
+        temp_git_repo.git.add("a.py")
+        (temp_dir / "unstaged.py").write_text("b = 1\n")
+        index_path = Path(temp_git_repo.git_dir) / "index"
+        before = index_path.stat().st_mtime_ns
+        
+        staged = write_index_tree(temp_git_repo)
+        
+        assert index_path.stat().st_mtime_ns == before
+        assert staged.head == temp_git_repo.head.commit.hexsha
+        assert temp_git_repo.git.ls_tree("--name-only", staged.tree).split() == ["README.md", "a.py"]
+        
+        # git commit 运行钩子时通过 GIT_INDEX_FILE 指定正在提交的索引
+        other_index = str(Path(temp_git_repo.git_dir) / "other.index")
+        temp_git_repo.git.read_tree("HEAD", env={"GIT_INDEX_FILE": other_index})
+        monkeypatch.setenv("GIT_INDEX_FILE", other_index)
+        assert write_index_tree(temp_git_repo).tree == temp_git_repo.head.commit.tree.hexsha
+        
+        monkeypatch.delenv("GIT_INDEX_FILE")
+        (temp_dir / "unstaged.py").unlink()
+        assert stage_changes(temp_git_repo).tree == staged.tree
+    
+    def test_plan_reword(self, repo_with_multiple_commits: Repo):
+        """Test that the range and every commit after it up to HEAD are planned."""
+        from ai_git_utils.git_operations import plan_reword
+        
+        repo = repo_with_multiple_commits
+        
+        plan = plan_reword(repo, "HEAD~2..HEAD~1")
+        
+        assert plan.head == repo.head.commit.hexsha
+        assert [commit.subject for commit in plan.commits] == ["Add file1", "Add file2"]
+        assert [commit.subject for commit in plan.selected] == ["Add file1"]
+        assert plan.commits[0].base == repo.commit("HEAD~2").hexsha
+        assert plan.commits[1].parents == [plan.commits[0].hexsha]
+        assert [commit.subject for commit in plan_reword(repo, "HEAD").selected] == [
+            "Initial commit", "Add file1", "Add file2"
+        ]
+        
+        repo.git.branch("other", "HEAD~1")
+        repo.git.checkout("-b", "side", "HEAD~2")
+        with pytest.raises(ValueError):
+            plan_reword(repo, "HEAD..other")
+        with pytest.raises(ValueError):
+            plan_reword(repo, "--all")
+    
+    def test_rewrite_messages(self, repo_with_multiple_commits: Repo, temp_dir: Path):
+        """Test that messages change while trees, authors and dates are kept."""
+        from ai_git_utils.git_operations import plan_reword, read_commit_message, rewrite_messages
+        
+        repo = repo_with_multiple_commits
+        (temp_dir / "dirty.py").write_text("x = 1\n")
+        old = [repo.commit("HEAD~1"), repo.commit("HEAD")]
+        plan = plan_reword(repo, "HEAD~2..HEAD~1")
+        
+        new_head = rewrite_messages(repo, plan, {old[0].hexsha: "feat: add file1\n\n- 说明"})
+        
+        assert repo.head.commit.hexsha == new_head != old[1].hexsha
+        assert repo.active_branch.commit.hexsha == new_head
+        assert read_commit_message(repo, "HEAD~1") == "feat: add file1\n\n- 说明\n"
+        assert read_commit_message(repo, "HEAD") == old[1].message
+        for before, after in zip(old, [repo.commit("HEAD~1"), repo.commit("HEAD")]):
+            assert after.tree == before.tree
+            assert after.author == before.author
+            assert after.authored_datetime == before.authored_datetime
+            assert after.committed_datetime == before.committed_datetime
+        assert repo.commit("HEAD~2") == old[0].parents[0]
+        repo.git.fsck("--strict")
+        assert (temp_dir / "dirty.py").exists()
+        assert not repo.is_dirty(untracked_files=False)
+        
+        # HEAD 在生成期间被移动时拒绝改写
+        from git.exc import GitCommandError
+        with pytest.raises(GitCommandError):
+            rewrite_messages(repo, plan, {old[0].hexsha: "fix: stale"})
+        assert repo.head.commit.hexsha == new_head
+    
+    def test_reworded_commit_drops_signature(self):
+        """Test that signatures and the old encoding are removed from a reworded commit."""
+        from ai_git_utils.git_operations import _reworded_commit
+        
+        data = (
+            b"tree t\nparent a\nauthor A <a@x> 1 +0000\ncommitter C <c@x> 2 +0000\n"
+            b"encoding latin1\ngpgsig -----BEGIN PGP SIGNATURE-----\n \n abc\n -----END PGP SIGNATURE-----\n"
+            b"\nold\n"
+        )
+        
+        assert _reworded_commit(data, ["b"], "new") == (
+            b"tree t\nparent b\nauthor A <a@x> 1 +0000\ncommitter C <c@x> 2 +0000\n\nnew\n"
+        )
+        assert _reworded_commit(data, ["b"], None).endswith(b"encoding latin1\n\nold\n")
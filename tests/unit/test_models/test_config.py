@@ -65,4 +65,19 @@ class TestModelConfig:
         config = ModelConfig.from_dict(original_data)
         result_data = config.to_dict()
         
-        assert result_data == original_data
\ No newline at end of file
+        assert result_data == original_data
+    
+    def test_extra_keys_roundtrip_through_options(self):
+        """Test that tuning keys are preserved in options."""
+        data = {
+            "model": "gpt-4o",
+            "base_url": "https://api.openai.com/v1",
+            "temperature": 0.7,
+            "api_key": "sk-test-key",
+            "max_concurrency": 8,
+        }
+        
+        config = ModelConfig.from_dict(data)
+        
+        assert config.options == {"max_concurrency": 8}
+        assert config.to_dict() == data
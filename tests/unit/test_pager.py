@@ -0,0 +1,130 @@
+"""Unit tests for the interactive pager."""
+import io
+import pytest
+from rich.console import Console
+from rich.text import Text
+from ai_git_utils.pager import Pager
+
+
+def _console() -> Console:
+    return Console(file=io.StringIO(), force_terminal=True, width=80, height=20)
+
+
+def _counting(total: int, consumed: list):
+    for i in range(total):
+        consumed.append(i)
+        yield i
+
+
+@pytest.mark.unit
+class TestPager:
+    """Test cases for Pager."""
+
+    def test_first_screen_fetches_at_most_two_pages(self):
+        """Test that only the first page and a look-ahead page are pulled."""
+        consumed = []
+        pager = Pager(
+            _counting(100000, consumed),
+            lambda items, start: Text(f"items {start}-{start + len(items) - 1}"),
+            page_size=10,
+            console=_console(),
+            read_key=lambda: "q",
+        )
+
+        pager.run()
+
+        assert consumed == list(range(20))
+        assert "items 0-9" in pager.console.file.getvalue()
+
+    def test_paging_forward_and_back(self):
+        """Test that pages are fetched on demand and revisited from memory."""
+        consumed = []
+        keys = iter([" ", " ", "b", "q"])
+        rendered = []
+        pager = Pager(
+            _counting(25, consumed),
+            lambda items, start: rendered.append((start, list(items))) or "",
+            page_size=10,
+            console=_console(),
+            read_key=lambda: next(keys),
+        )
+
+        pager.run()
+
+        assert [start for start, _ in rendered] == [0, 10, 20, 10]
+        assert rendered[2][1] == list(range(20, 25))
+        assert len(consumed) == 25
+
+    def test_stays_on_last_page(self):
+        """Test that paging past the end keeps the last page."""
+        keys = iter([" ", " ", " ", "q"])
+        rendered = []
+        pager = Pager(
+            iter(range(15)),
+            lambda items, start: rendered.append(start) or "",
+            page_size=10,
+            console=_console(),
+            read_key=lambda: next(keys),
+        )
+
+        pager.run()
+
+        assert rendered == [0, 10, 10, 10]
+        assert "（结束）" in pager.console.file.getvalue()
+
+    def test_short_output_printed_without_paging(self):
+        """Test that output fitting on one page is printed directly."""
+        read_key = []
+        pager = Pager(
+            iter(range(5)),
+            lambda items, start: Text(f"items {len(items)}"),
+            page_size=10,
+            console=_console(),
+            read_key=read_key.pop,
+        )
+
+        pager.run()
+
+        output = pager.console.file.getvalue()
+        assert "items 5" in output
+        assert "q 退出" not in output
+
+    def test_max_pages_bounds_history(self):
+        """Test that old pages are dropped and cannot be paged back to."""
+        keys = iter([" ", " ", "b", "b", "b", "q"])
+        rendered = []
+        pager = Pager(
+            iter(range(100)),
+            lambda items, start: rendered.append(start) or "",
+            page_size=10,
+            console=_console(),
+            read_key=lambda: next(keys),
+            max_pages=2,
+        )
+
+        pager.run()
+
+        assert len(pager.pages) <= 2
+        assert rendered[-1] == 10
+
+    def test_empty_items(self):
+        """Test that nothing is drawn when there is nothing to show."""
+        pager = Pager(iter([]), lambda items, start: "page", 10, _console(), lambda: "q")
+
+        pager.run()
+
+        assert "page" not in pager.console.file.getvalue()
+
+    def test_closes_generator_on_quit(self):
+        """Test that quitting early closes the source generator."""
+        closed = []
+
+        def source():
+            try:
+                yield from range(100)
+            finally:
+                closed.append(True)
+
+        Pager(source(), lambda items, start: "", 10, _console(), lambda: "q").run()
+
+        assert closed == [True]
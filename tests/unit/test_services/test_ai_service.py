@@ -10,7 +10,7 @@ class TestAIService:
 
     def test_generate_commit_message_success(self):
         """Test successful commit message generation."""
-        with patch('ai_git_utils.services.ai_service.OpenAI') as mock_openai:
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai:
             # Mock the OpenAI client and response
             mock_client = Mock()
             mock_openai.return_value = mock_client
@@ -36,6 +36,236 @@ class TestAIService:
                 assert result.scope == "cli"
                 assert result.subject == "Add new feature"
 
+    def test_generate_commit_message_compact_prompt(self):
+        """Test that prompt_variant selects the compact system prompt."""
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai:
+            mock_client = Mock()
+            mock_openai.return_value = mock_client
+            mock_response = Mock()
+            mock_response.choices = [Mock()]
+            mock_response.choices[0].message.content = '{"type": "feat", "scope": "cli", "subject": "Compact", "emoji": "✨", "fix_items": []}'
+            mock_client.chat.completions.create.return_value = mock_response
+            
+            with patch('ai_git_utils.services.ai_service.get_active_model') as mock_get_model:
+                mock_get_model.return_value = {
+                    'base_url': 'https://api.openai.com/v1',
+                    'api_key': 'test-key',
+                    'model': 'gpt-4',
+                    'temperature': 0.7,
+                    'prompt_variant': 'compact',
+                }
+                
+                service = AIService()
+                service.generate_commit_message("test diff", "English")
+                
+                messages = mock_client.chat.completions.create.call_args.kwargs["messages"]
+                assert messages[0]["content"] == service.prompt_builder.build_system_prompt(
+                    "English", "compact"
+                )
+
+    def test_generate_commit_message_uses_cache(self):
+        """Test that an unchanged diff is served from the cache."""
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai:
+            mock_client = Mock()
+            mock_openai.return_value = mock_client
+            mock_response = Mock()
+            mock_response.choices = [Mock()]
+            mock_response.choices[0].message.content = '{"type": "feat", "scope": "cli", "subject": "Cached", "emoji": "✨", "fix_items": []}'
+            mock_client.chat.completions.create.return_value = mock_response
+            
+            with patch('ai_git_utils.services.ai_service.get_active_model') as mock_get_model:
+                mock_get_model.return_value = {
+                    'base_url': 'https://api.openai.com/v1',
+                    'api_key': 'test-key',
+                    'model': 'gpt-4',
+                    'temperature': 0.7
+                }
+                
+                first = AIService().generate_commit_message("same diff", "English")
+                second = AIService().generate_commit_message("same diff", "English")
+                assert second == first
+                assert mock_client.chat.completions.create.call_count == 1
+                
+                AIService(refresh=True).generate_commit_message("same diff", "English")
+                AIService(use_cache=False).generate_commit_message("same diff", "English")
+                assert mock_client.chat.completions.create.call_count == 3
+
+    def test_generate_commit_message_streaming(self):
+        """Test streaming generation reports partial fields."""
+        content = '{"type": "fix", "scope": "api", "emoji": "🐛", "subject": "Fix bug", "fix_items": ["a", "b"]}'
+        chunks = []
+        for i in range(0, len(content), 7):
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = content[i:i + 7]
+            chunks.append(chunk)
+        
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai:
+            mock_client = Mock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.return_value = iter(chunks)
+            
+            with patch('ai_git_utils.services.ai_service.get_active_model') as mock_get_model:
+                mock_get_model.return_value = {'model': 'gpt-4', 'temperature': 0.7}
+                
+                updates = []
+                result = AIService(use_cache=False).generate_commit_message(
+                    "test diff", "English", on_update=updates.append
+                )
+                
+                assert result.fix_items == ["a", "b"]
+                assert updates[0] == {"type": "fix"}
+                assert updates[-1]["fix_items"] == ["a", "b"]
+                assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    def test_summarize_diff_and_reduce(self):
+        """Test map step summaries and the reduce prompt."""
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai:
+            mock_client = Mock()
+            mock_openai.return_value = mock_client
+            mock_response = Mock()
+            mock_response.choices = [Mock()]
+            mock_response.choices[0].message.content = "  - changed a.py  "
+            mock_client.chat.completions.create.return_value = mock_response
+            
+            with patch('ai_git_utils.services.ai_service.get_active_model') as mock_get_model:
+                mock_get_model.return_value = {'model': 'gpt-4', 'temperature': 0.7}
+                service = AIService(use_cache=False)
+                
+                assert service.summarize_diff("chunk", "English") == "- changed a.py"
+                kwargs = mock_client.chat.completions.create.call_args.kwargs
+                assert "response_format" not in kwargs
+                
+                mock_response.choices[0].message.content = '{"type": "feat", "scope": "core", "subject": "Merge", "emoji": "✨", "fix_items": []}'
+                result = service.generate_commit_message("huge diff", summaries=["s1", "s2"])
+                
+                user_prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+                assert "part 2:\ns2" in user_prompt
+                assert "huge diff" not in user_prompt
+                assert result.subject == "Merge"
+
+    def test_generate_commit_message_race(self):
+        """Test that race mode takes the first valid answer from any model."""
+        def chunks(content):
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = content
+            return iter([chunk])
+        
+        def create(**kwargs):
+            if kwargs["model"] == "primary":
+                return chunks("not json")
+            return chunks('{"type": "fix", "scope": "api", "subject": "From backup", "emoji": "🐛", "fix_items": []}')
+        
+        config = {
+            "models": {
+                "p": {"model": "primary", "hedge_delay": 5},
+                "b": {"model": "backup"},
+            },
+            "active_model": "p",
+        }
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai, \
+                patch('ai_git_utils.services.ai_service.get_active_model', return_value=config["models"]["p"]), \
+                patch('ai_git_utils.services.ai_service.load_config', return_value=config):
+            mock_openai.return_value.chat.completions.create.side_effect = create
+            
+            result = AIService(use_cache=False, race=True).generate_commit_message("diff")
+            
+            assert result.subject == "From backup"
+
+    def test_backup_models_explicit_list(self):
+        """Test that backup_models selects and orders backup models."""
+        config = {
+            "models": {"p": {"model": "p"}, "a": {"model": "a"}, "b": {"model": "b"}},
+            "active_model": "p",
+        }
+        with patch('ai_git_utils.services.ai_service.load_config', return_value=config):
+            service = AIService(use_cache=False, race=True)
+            
+            assert service._backup_models({"model": "p"}) == [{"model": "a"}, {"model": "b"}]
+            assert service._backup_models({"backup_models": ["b", "missing"]}) == [{"model": "b"}]
+            assert service._backup_models({"hedge_models": ["a"]}) == [{"model": "a"}]
+
+    def test_generate_commit_message_fails_over(self):
+        """Test failover to a backup model after retries are exhausted."""
+        import httpx
+        import openai
+        
+        request = httpx.Request("POST", "https://primary/v1/chat/completions")
+        overloaded = openai.APIStatusError(
+            "overloaded", response=httpx.Response(503, request=request), body=None
+        )
+        good = Mock()
+        good.choices = [Mock()]
+        good.choices[0].message.content = '{"type": "fix", "scope": "api", "subject": "Backup", "emoji": "🐛", "fix_items": []}'
+        
+        def create(**kwargs):
+            if kwargs["model"] == "primary":
+                raise overloaded
+            return good
+        
+        config = {
+            "models": {"p": {"model": "primary", "max_retries": 1}, "b": {"model": "backup"}},
+            "active_model": "p",
+        }
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai, \
+                patch('ai_git_utils.services.resilience.time.sleep'), \
+                patch('ai_git_utils.services.ai_service.get_active_model', return_value=config["models"]["p"]), \
+                patch('ai_git_utils.services.ai_service.load_config', return_value=config):
+            mock_openai.return_value.chat.completions.create.side_effect = create
+            service = AIService(use_cache=False)
+            
+            assert service.generate_commit_message("diff").subject == "Backup"
+            models = [c.kwargs["model"] for c in mock_openai.return_value.chat.completions.create.call_args_list]
+            assert models == ["primary", "primary", "backup"]
+
+    def test_stream_dropped_midway_is_retried(self):
+        """Test that success is only recorded once the stream was read to the end."""
+        import httpx
+        
+        content = '{"type": "fix", "scope": "api", "subject": "Streamed", "emoji": "🐛", "fix_items": []}'
+        
+        def chunk(text):
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = text
+            return chunk
+        
+        def dropped():
+            yield chunk(content[:10])
+            raise httpx.RemoteProtocolError("peer closed connection")
+        
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai, \
+                patch('ai_git_utils.services.resilience.time.sleep'), \
+                patch('ai_git_utils.services.ai_service.get_active_model', return_value={'model': 'gpt-4'}):
+            mock_openai.return_value.chat.completions.create.side_effect = [
+                dropped(), iter([chunk(content)])
+            ]
+            service = AIService(use_cache=False)
+            service.circuit_breaker = Mock()
+            service.circuit_breaker.allow.return_value = True
+            
+            result = service.generate_commit_message("diff", on_update=lambda fields: None)
+            
+            assert result.subject == "Streamed"
+            assert mock_openai.return_value.chat.completions.create.call_count == 2
+            service.circuit_breaker.record_success.assert_called_once()
+            service.circuit_breaker.record_failure.assert_not_called()
+
+    def test_open_circuit_skips_model(self):
+        """Test that a known-dead endpoint is skipped without a request."""
+        config = {"models": {"p": {"model": "primary"}}, "active_model": "p"}
+        with patch('ai_git_utils.services.client_registry.OpenAI') as mock_openai, \
+                patch('ai_git_utils.services.ai_service.get_active_model', return_value=config["models"]["p"]), \
+                patch('ai_git_utils.services.ai_service.load_config', return_value=config):
+            service = AIService(use_cache=False)
+            service.circuit_breaker = Mock()
+            service.circuit_breaker.allow.return_value = False
+            
+            with pytest.raises(RuntimeError, match="All configured models failed"):
+                service.generate_commit_message("diff")
+            mock_openai.return_value.chat.completions.create.assert_not_called()
+
     def test_generate_commit_message_no_active_model(self):
         """Test error when no active model is configured."""
         with patch('ai_git_utils.services.ai_service.get_active_model') as mock_get_model:
@@ -63,4 +293,22 @@ class TestAIService:
         assert isinstance(result, CommitMessage)
         assert result.type == "fix"
         assert result.scope == "api"
-        assert result.subject == "Fix bug"
\ No newline at end of file
+        assert result.subject == "Fix bug"
+    @pytest.mark.parametrize("content, expected", [
+        ('{"groups": [[1], [0, 2]]}', [[0, 2], [1]]),
+        ('{"groups": [[0, 1]]}', None),
+        ('not json', None),
+    ])
+    def test_suggest_groups(self, content, expected):
+        """Test that only valid groupings from the model are returned."""
+        from ai_git_utils.services.split_planner import ChangeUnit
+        units = [ChangeUnit(i, f"f{i}.py", f"diff --git a/f{i}.py b/f{i}.py\n", "@@ -1 +1 @@\n-a\n+b\n")
+                 for i in range(3)]
+        
+        with patch('ai_git_utils.services.ai_service.get_active_model', return_value={'model': 'gpt-4'}):
+            service = AIService(use_cache=False)
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = content
+            with patch.object(service, '_create_completion', return_value=response):
+                assert service.suggest_groups(units, [[0, 1, 2]]) == expected
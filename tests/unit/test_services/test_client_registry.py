@@ -0,0 +1,86 @@
+"""Unit tests for ClientRegistry."""
+import httpx
+import pytest
+from unittest.mock import patch
+from openai import DefaultHttpxClient
+from ai_git_utils.services.client_registry import ClientRegistry
+
+
+@pytest.mark.unit
+class TestClientRegistry:
+    """Test cases for shared OpenAI clients."""
+
+    CONFIG = {"base_url": "https://api.example.com/v1", "api_key": "sk-test"}
+
+    def test_same_endpoint_reuses_client(self):
+        """Test that one client is shared per endpoint and key."""
+        registry = ClientRegistry()
+
+        first = registry.get(self.CONFIG)
+        second = registry.get(dict(self.CONFIG, model="other", temperature=0.1))
+
+        assert first is second
+        registry.clear()
+
+    def test_different_key_or_limits_get_new_client(self):
+        """Test that endpoint, key and pool limits are part of the key."""
+        registry = ClientRegistry()
+
+        base = registry.get(self.CONFIG)
+
+        assert registry.get(dict(self.CONFIG, api_key="sk-other")) is not base
+        assert registry.get(dict(self.CONFIG, base_url="https://other/v1")) is not base
+        assert registry.get(dict(self.CONFIG, max_connections=2)) is not base
+        registry.clear()
+
+    def test_pool_limits_applied(self):
+        """Test that configured pool limits reach the HTTP client."""
+        registry = ClientRegistry()
+        with patch('ai_git_utils.services.client_registry.DefaultHttpxClient',
+                   wraps=DefaultHttpxClient) as mock_http:
+            registry.get(dict(self.CONFIG, max_connections=3, max_keepalive_connections=2))
+
+        limits = mock_http.call_args.kwargs["limits"]
+        assert limits.max_connections == 3
+        assert limits.max_keepalive_connections == 2
+        registry.clear()
+
+    def test_timeout_only_when_configured(self):
+        """Test that the SDK's default timeout is kept unless one is configured."""
+        registry = ClientRegistry()
+
+        assert registry.get(self.CONFIG).timeout == registry.get(dict(self.CONFIG, timeout=None)).timeout
+        assert registry.get(self.CONFIG).timeout != 5
+        assert registry.get(dict(self.CONFIG, timeout=5)).timeout == 5
+        registry.clear()
+
+    def test_clear_creates_new_clients(self):
+        """Test that clearing the registry drops cached clients."""
+        registry = ClientRegistry()
+        first = registry.get(self.CONFIG)
+
+        registry.clear()
+
+        assert registry.get(self.CONFIG) is not first
+        registry.clear()
+
+    def test_warm_up_opens_connection_in_background(self):
+        """Test that warm-up issues a request on the shared pool."""
+        registry = ClientRegistry()
+        with patch.object(httpx.Client, "head") as mock_head:
+            thread = registry.warm_up(self.CONFIG)
+            thread.join(timeout=5)
+
+        mock_head.assert_called_once()
+        assert mock_head.call_args.args[0].startswith("https://api.example.com/v1")
+        registry.clear()
+
+    def test_warm_up_ignores_errors(self):
+        """Test that a failing warm-up request is swallowed."""
+        registry = ClientRegistry()
+        with patch.object(httpx.Client, "head", side_effect=httpx.ConnectError("offline")):
+            thread = registry.warm_up(self.CONFIG)
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        registry.clear()
@@ -1,6 +1,11 @@
 """Unit tests for CommitService."""
 from unittest.mock import Mock, patch
+import pytest
+from git.exc import GitCommandError, HookExecutionError
+from ai_git_utils.models.file_stat import FileStat
 from ai_git_utils.services.commit_service import CommitService
+from ai_git_utils.services.diff_exclusions import DiffExclusions
+from ai_git_utils.services.split_planner import SplitCommit
 from ai_git_utils.models.commit_message import CommitMessage
 
 
@@ -9,18 +14,22 @@ class TestCommitService:
 
     def test_prepare_commit_message_success(self):
         """Test successful commit message preparation."""
-        with patch('ai_git_utils.services.commit_service.Repo') as mock_repo_class:
-            mock_repo = Mock()
+        with patch('ai_git_utils.services.commit_service.Repo') as mock_repo_class, \
+                patch('ai_git_utils.services.commit_service.get_active_model', return_value={}):
+            mock_repo = Mock(working_dir="/nonexistent")
             mock_repo_class.return_value = mock_repo
+            stats = [FileStat("app.py", 1, 1)]
             
-            with patch('ai_git_utils.services.commit_service.get_git_diff') as mock_get_diff:
-                mock_get_diff.return_value = "test diff output"
+            with patch('ai_git_utils.services.commit_service.get_staged_tree_diff') as mock_get_diff, \
+                    patch('ai_git_utils.services.commit_service.get_staged_tree_numstat',
+                          return_value=stats):
+                mock_get_diff.return_value = "diff --git a/app.py b/app.py\n-a\n+b"
                 
                 with patch('ai_git_utils.services.commit_service.edit_commit_message') as mock_edit:
                     mock_edit.return_value = "feat: test commit"
                     
-                    with patch.object(CommitService, '__init__', lambda self: None):
-                        service = CommitService()
+                    with patch('ai_git_utils.services.commit_service.stage_changes') as mock_stage:
+                        service = CommitService(use_cache=False)
                         service.ai_service = Mock()
                         
                         mock_commit_message = CommitMessage(
@@ -35,8 +44,12 @@ class TestCommitService:
                         result = service.prepare_commit_message(".", None, "English")
                         
                         assert result == "feat: test commit"
-                        mock_repo.git.add.assert_called_once_with('.')
-                        mock_get_diff.assert_called_once_with(mock_repo, True, None)
+                        mock_stage.assert_called_once_with(mock_repo)
+                        mock_get_diff.assert_called_once_with(
+                            mock_repo, mock_stage.return_value, None,
+                            ["--unified=1", "--find-renames", "--find-copies"],
+                            DiffExclusions().pathspecs(stats),
+                        )
                         mock_edit.assert_called_once()
 
     def test_prepare_commit_message_no_changes(self):
@@ -45,16 +58,17 @@ class TestCommitService:
             mock_repo = Mock()
             mock_repo_class.return_value = mock_repo
             
-            with patch('ai_git_utils.services.commit_service.get_git_diff') as mock_get_diff:
-                mock_get_diff.return_value = ""
-                
-                with patch.object(CommitService, '__init__', lambda self: None):
-                    service = CommitService()
+            with patch('ai_git_utils.services.commit_service.get_staged_tree_diff') as mock_get_diff, \
+                    patch('ai_git_utils.services.commit_service.get_staged_tree_numstat',
+                          return_value=[]):
+                with patch('ai_git_utils.services.commit_service.stage_changes'):
+                    service = CommitService(use_cache=False)
                     service.ai_service = Mock()
                     
                     result = service.prepare_commit_message(".", None, "English")
                     
                     assert result is None
+                    mock_get_diff.assert_not_called()
 
     def test_commit_changes_success(self):
         """Test successful commit changes."""
@@ -62,10 +76,286 @@ class TestCommitService:
             mock_repo = Mock()
             mock_repo_class.return_value = mock_repo
             
-            with patch('ai_git_utils.services.commit_service.commit_changes') as mock_commit:
+            with patch('ai_git_utils.services.commit_service.stage_changes') as mock_stage, \
+                    patch('ai_git_utils.services.commit_service.commit_staged_tree') as mock_commit:
                 service = CommitService()
                 
                 result = service.commit_changes(".", "test commit message")
                 
                 assert result is True
-                mock_commit.assert_called_once_with(mock_repo, "test commit message")
\ No newline at end of file
+                mock_commit.assert_called_once_with(
+                    mock_repo, mock_stage.return_value, "test commit message"
+                )
+    def test_prepare_commit_message_streaming(self):
+        """Test that streaming mode passes a preview callback to the AI service."""
+        with patch('ai_git_utils.services.commit_service.Repo', return_value=Mock(working_dir="/nonexistent")), \
+                patch('ai_git_utils.services.commit_service.stage_changes'), \
+                patch('ai_git_utils.services.commit_service.get_staged_tree_numstat',
+                      return_value=[FileStat("app.py", 1, 0)]), \
+                patch('ai_git_utils.services.commit_service.get_staged_tree_diff', return_value="diff"), \
+                patch('ai_git_utils.services.commit_service.edit_commit_message', side_effect=lambda m: m):
+            service = CommitService(use_cache=False, stream=True)
+            service.ai_service = Mock()
+            service.ai_service.generate_commit_message.return_value = CommitMessage(
+                type="feat", scope="cli", subject="stream", emoji="✨", fix_items=[]
+            )
+            
+            result = service.prepare_commit_message(".", None, "English")
+            
+            assert result.startswith("feat(cli)")
+            kwargs = service.ai_service.generate_commit_message.call_args.kwargs
+            assert callable(kwargs["on_update"])
+
+    def test_generate_commit_message_map_reduce(self):
+        """Test that large diffs are summarized per chunk and then merged."""
+        diff = "".join(
+            f"diff --git a/f{i}.py b/f{i}.py\n@@ -1 +1 @@\n+{'x' * 50}\n" for i in range(4)
+        )
+        model_config = {"map_reduce_threshold": 100, "map_chunk_size": 100, "max_concurrency": 2}
+        
+        with patch('ai_git_utils.services.commit_service.get_active_model', return_value=model_config):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            service.ai_service.get_cached_commit_message.return_value = None
+            service.ai_service.summarize_diff.side_effect = lambda chunk, lang: chunk.split()[2]
+            service.ai_service.generate_commit_message.return_value = "merged"
+            
+            result = service.generate_commit_message(diff, "English")
+            
+            assert result == "merged"
+            assert service.ai_service.summarize_diff.call_count == 4
+            service.ai_service.generate_commit_message.assert_called_once_with(
+                diff, "English", summaries=["a/f0.py", "a/f1.py", "a/f2.py", "a/f3.py"]
+            )
+
+    def test_generate_commit_message_map_reduce_cached(self):
+        """Test that a cached result skips the map step entirely."""
+        with patch('ai_git_utils.services.commit_service.get_active_model',
+                   return_value={"map_reduce_threshold": 1}):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            service.ai_service.get_cached_commit_message.return_value = "cached"
+            
+            assert service.generate_commit_message("big diff", "English") == "cached"
+            service.ai_service.summarize_diff.assert_not_called()
+
+    def test_generate_commit_message_small_diff(self):
+        """Test that small diffs go straight to a single request."""
+        with patch('ai_git_utils.services.commit_service.get_active_model', return_value={}):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            
+            service.generate_commit_message("small diff", "English")
+            
+            service.ai_service.generate_commit_message.assert_called_once_with("small diff", "English")
+            service.ai_service.summarize_diff.assert_not_called()
+
+    def test_prepare_commit_message_warm_up(self):
+        """Test that warm-up starts before the diff when enabled."""
+        with patch('ai_git_utils.services.commit_service.get_active_model',
+                   return_value={"warm_up": True}), \
+                patch('ai_git_utils.services.commit_service.warm_up') as mock_warm_up, \
+                patch('ai_git_utils.services.commit_service.Repo'), \
+                patch('ai_git_utils.services.commit_service.stage_changes'), \
+                patch('ai_git_utils.services.commit_service.get_staged_tree_numstat', return_value=[]):
+            service = CommitService(use_cache=False)
+            
+            assert service.prepare_commit_message(".", None, "English") is None
+            mock_warm_up.assert_called_once_with({"warm_up": True})
+
+    def test_prepare_split_commits(self, temp_git_repo, temp_dir):
+        """Test that staged changes are grouped and messages generated per group."""
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "app.py").write_text("print('app')\n")
+        (temp_dir / "docs").mkdir()
+        (temp_dir / "docs" / "guide.md").write_text("# Guide\n")
+        
+        with patch('ai_git_utils.services.commit_service.get_active_model', return_value={}):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            service.ai_service.suggest_groups.return_value = None
+            service.ai_service.generate_commit_message.side_effect = lambda diff, language: CommitMessage(
+                type="feat", scope="", subject=diff.split(" b/", 1)[1].split("\n", 1)[0],
+                emoji="✨", fix_items=[]
+            )
+            
+            splits = service.prepare_split_commits(str(temp_dir), "English")
+        
+        assert [split.paths for split in splits] == [["docs/guide.md"], ["src/app.py"]]
+        assert "docs/guide.md" in splits[0].message
+        assert "src/app.py" in splits[1].message
+        service.ai_service.suggest_groups.assert_called_once()
+
+    def test_prepare_split_commits_hides_excluded_and_binary_content(self, temp_git_repo, temp_dir):
+        """Test that split prompts go through the same exclusions as single commits."""
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "app.py").write_text("print('app')\n")
+        (temp_dir / "src" / "logo.png").write_bytes(b"\x89PNG\x00" + bytes(range(256)))
+        (temp_dir / "docs").mkdir()
+        (temp_dir / "docs" / "package-lock.json").write_text('{"secret": "lockfile"}\n')
+        (temp_dir / "docs" / "guide.md").write_text("# Guide\n")
+        
+        with patch('ai_git_utils.services.commit_service.get_active_model', return_value={}):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            service.ai_service.suggest_groups.return_value = None
+            service.ai_service.generate_commit_message.return_value = CommitMessage(
+                type="feat", scope="", subject="update", emoji="✨", fix_items=[]
+            )
+        
+            splits = service.prepare_split_commits(str(temp_dir), "English")
+        
+        assert len(splits) == 2
+        assert "GIT binary patch" in splits[1].patch
+        shown_units = service.ai_service.suggest_groups.call_args[0][0]
+        assert not any("lockfile" in unit.body for unit in shown_units)
+        prompts = [c[0][0] for c in service.ai_service.generate_commit_message.call_args_list]
+        assert len(prompts) == 2
+        assert not any("lockfile" in prompt for prompt in prompts)
+        assert not any("GIT binary patch" in prompt for prompt in prompts)
+        assert any("# +1 -0 docs/package-lock.json" in prompt for prompt in prompts)
+        assert any("Binary files" in prompt and "src/logo.png" in prompt for prompt in prompts)
+
+    def test_commit_split(self, temp_git_repo, temp_dir):
+        """Test that each group becomes its own commit and nothing is lost."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        (temp_dir / "b.py").write_text("b = 1\n")
+        temp_git_repo.git.add('.')
+        
+        from ai_git_utils.git_operations import get_staged_patch
+        from ai_git_utils.services.split_planner import SplitPlanner
+        planner = SplitPlanner()
+        units = planner.units_from_diff(get_staged_patch(temp_git_repo))
+        splits = planner.plan(units, [[1], [0]])
+        splits[0].message = "add b"
+        splits[1].message = "add a"
+        
+        service = CommitService(use_cache=False)
+        assert service.commit_split(str(temp_dir), splits) == 2
+        
+        subjects = [commit.message for commit in temp_git_repo.iter_commits(max_count=2)]
+        assert subjects == ["add a", "add b"]
+        assert temp_git_repo.git.status("--porcelain") == ""
+
+    def test_commit_split_restores_index_on_failure(self, temp_git_repo, temp_dir):
+        """Test that a failing patch leaves the changes staged."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        temp_git_repo.git.add('.')
+        broken = SplitCommit([0], "diff --git a/x b/x\n--- a/x\n+++ b/x\n@@ -1 +1 @@\n-x\n+y\n", ["x"], "broken")
+        
+        service = CommitService(use_cache=False)
+        with pytest.raises(GitCommandError):
+            service.commit_split(str(temp_dir), [broken])
+        
+        assert temp_git_repo.git.diff("--staged", "--name-only") == "a.py"
+
+    def test_commit_split_runs_hooks_and_keeps_rest_staged(self, temp_git_repo, temp_dir):
+        """Test that hooks see every group and a rejected group stays staged."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        (temp_dir / "b.py").write_text("b = 1\n")
+        temp_git_repo.git.add('.')
+        hook = temp_dir / ".git" / "hooks" / "commit-msg"
+        hook.write_text('#!/bin/sh\ngrep -q "add a" "$1" && exit 1\nexit 0\n')
+        hook.chmod(0o755)
+        
+        from ai_git_utils.git_operations import get_staged_patch
+        from ai_git_utils.services.split_planner import SplitPlanner
+        planner = SplitPlanner()
+        splits = planner.plan(planner.units_from_diff(get_staged_patch(temp_git_repo)), [[1], [0]])
+        splits[0].message = "add b"
+        splits[1].message = "add a"
+        
+        service = CommitService(use_cache=False)
+        with pytest.raises(HookExecutionError):
+            service.commit_split(str(temp_dir), splits)
+        
+        assert temp_git_repo.head.commit.message == "add b"
+        assert temp_git_repo.git.diff("--staged", "--name-only") == "a.py"
+
+    def test_commit_uses_tree_from_preparation(self, temp_git_repo, temp_dir):
+        """Test that edits made after generation are not committed."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        
+        with patch('ai_git_utils.services.commit_service.get_active_model', return_value={}), \
+                patch('ai_git_utils.services.commit_service.edit_commit_message', side_effect=lambda m: m):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            service.ai_service.generate_commit_message.return_value = CommitMessage(
+                type="feat", scope="", subject="add a", emoji="", fix_items=[]
+            )
+            message = service.prepare_commit_message(str(temp_dir), None, "English")
+        
+        diff = service.ai_service.generate_commit_message.call_args.args[0]
+        assert "+a = 1" in diff
+        
+        (temp_dir / "a.py").write_text("a = 2\n")
+        (temp_dir / "late.py").write_text("late = 1\n")
+        temp_git_repo.git.add("late.py")
+        
+        assert service.commit_changes(str(temp_dir), message) is True
+        
+        head = temp_git_repo.head.commit
+        assert (head.tree / "a.py").data_stream.read() == b"a = 1\n"
+        assert "late.py" not in [blob.path for blob in head.tree.blobs]
+        assert (temp_dir / "a.py").read_text() == "a = 2\n"
+
+    def test_commit_rejects_moved_head(self, temp_git_repo, temp_dir):
+        """Test that a tree staged on an older HEAD is not committed."""
+        from ai_git_utils.git_operations import commit_staged_tree, stage_changes
+        
+        (temp_dir / "a.py").write_text("a = 1\n")
+        staged = stage_changes(temp_git_repo)
+        temp_git_repo.index.commit("concurrent commit")
+        
+        with pytest.raises(RuntimeError, match="HEAD moved"):
+            commit_staged_tree(temp_git_repo, staged, "stale")
+        assert temp_git_repo.head.commit.message == "concurrent commit"
+
+    def test_prepare_commit_message_excludes_generated_files(self, temp_git_repo, temp_dir):
+        """Test that excluded files reach the model only as a numstat summary."""
+        (temp_dir / ".gitattributes").write_text("*_pb2.py linguist-generated\n")
+        (temp_dir / ".aigitexclude").write_text("# vendored code\nthird_party/\n")
+        (temp_dir / "third_party").mkdir()
+        (temp_dir / "third_party" / "lib.js").write_text("var x = 1;\n")
+        (temp_dir / "api_pb2.py").write_text("DESCRIPTOR = None\n")
+        (temp_dir / "big.txt").write_text("".join(f"row {i}\n" for i in range(20)))
+        (temp_dir / "app.py").write_text("import api_pb2\n")
+        
+        with patch('ai_git_utils.services.commit_service.get_active_model',
+                   return_value={"max_file_lines": 10}), \
+                patch('ai_git_utils.services.commit_service.edit_commit_message', side_effect=lambda m: m):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            service.ai_service.generate_commit_message.return_value = CommitMessage(
+                type="feat", scope="", subject="add api", emoji="", fix_items=[]
+            )
+            service.prepare_commit_message(str(temp_dir), None, "English")
+        
+        diff = service.ai_service.generate_commit_message.call_args.args[0]
+        assert "+import api_pb2" in diff
+        assert "DESCRIPTOR" not in diff
+        assert "var x" not in diff
+        assert "row 5" not in diff
+        assert "# +1 -0 api_pb2.py\n" in diff
+        assert "# +1 -0 third_party/lib.js\n" in diff
+        assert "# +20 -0 big.txt\n" in diff
+    
+    def test_prepare_commit_message_non_ascii_path_not_excluded(self, temp_git_repo, temp_dir):
+        """Test that a file with a quoted path is sent and not listed as excluded."""
+        (temp_dir / "中文.txt").write_text("你好\n")
+        (temp_dir / 'say "hi".txt').write_text("hi\n")
+        
+        with patch('ai_git_utils.services.commit_service.get_active_model', return_value={}), \
+                patch('ai_git_utils.services.commit_service.edit_commit_message', side_effect=lambda m: m):
+            service = CommitService(use_cache=False)
+            service.ai_service = Mock()
+            service.ai_service.generate_commit_message.return_value = CommitMessage(
+                type="docs", scope="", subject="add greetings", emoji="", fix_items=[]
+            )
+            service.prepare_commit_message(str(temp_dir), None, "English")
+        
+        diff = service.ai_service.generate_commit_message.call_args.args[0]
+        assert "+你好" in diff
+        assert "中文.txt" in diff
+        assert "+hi" in diff
+        assert "Changed but not shown" not in diff
@@ -0,0 +1,82 @@
+"""Unit tests for DiffBudgeter."""
+import pytest
+from ai_git_utils.services.diff_budgeter import DiffBudgeter, estimate_tokens
+
+
+def _file(name: str, hunks: list) -> str:
+    return f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n" + "".join(hunks)
+
+
+def _hunk(lines: list, start: int = 1) -> str:
+    return f"@@ -{start},1 +{start},1 @@\n" + "".join(f"{line}\n" for line in lines)
+
+
+@pytest.mark.unit
+class TestDiffBudgeter:
+    """Test cases for token-budgeted diff packing."""
+
+    def test_estimate_tokens(self):
+        """Test the local token estimate for ASCII and CJK text."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd" * 10) == 10
+        assert estimate_tokens("中文") == 2
+
+    def test_small_diff_unchanged(self):
+        """Test that a diff within budget is returned verbatim."""
+        diff = _file("a.py", [_hunk(["+x = 1"])])
+
+        assert DiffBudgeter(1000).fit(diff) == diff
+
+    def test_result_fits_budget(self):
+        """Test that the packed diff stays within the budget."""
+        diff = "".join(
+            _file(f"f{i}.py", [_hunk([f"+value_{i}_{j} = {j}" for j in range(40)])])
+            for i in range(20)
+        )
+        budgeter = DiffBudgeter(500)
+
+        packed = budgeter.fit(diff)
+
+        assert estimate_tokens(packed) <= 500
+        assert "[omitted to fit token budget]" in packed
+
+    def test_signature_changes_kept_first(self):
+        """Test that signature hunks win over plain hunks and deletions."""
+        filler = [f"+    total += {i}" for i in range(30)]
+        diff = (
+            _file("body.py", [_hunk(filler)])
+            + _file("gone.py", [_hunk([f"-old_{i} = {i}" for i in range(30)])])
+            + _file("api.py", [_hunk(["+def public_api(arg):", "+    return arg"])])
+        )
+        budget = estimate_tokens(_file("api.py", [_hunk(["+def public_api(arg):", "+    return arg"])])) + 100
+
+        packed = DiffBudgeter(budget).fit(diff)
+
+        assert "def public_api" in packed
+        assert "-old_0" not in packed
+        assert " gone.py | +0 -30 (1 hunks omitted)" in packed
+
+    def test_repeated_hunks_dropped_before_unique(self):
+        """Test that hunks repeated across files rank last."""
+        license_hunk = ["+# Licensed under the MIT License"] * 20
+        unique = ["+    result = compute(x)"] * 5
+        diff = (
+            _file("a.py", [_hunk(license_hunk)])
+            + _file("b.py", [_hunk(license_hunk)])
+            + _file("c.py", [_hunk(unique)])
+        )
+        budget = estimate_tokens(_file("c.py", [_hunk(unique)])) + 120
+
+        packed = DiffBudgeter(budget).fit(diff)
+
+        assert "compute(x)" in packed
+        assert " a.py | +20 -0 (1 hunks omitted)" in packed
+
+    def test_header_only_files_kept(self):
+        """Test that binary or rename-only entries are always kept."""
+        binary = "diff --git a/logo.png b/logo.png\nBinary files a/logo.png and b/logo.png differ\n"
+        diff = binary + _file("big.py", [_hunk([f"+line {i}" for i in range(400)])])
+
+        packed = DiffBudgeter(200).fit(diff)
+
+        assert "Binary files a/logo.png" in packed
@@ -0,0 +1,67 @@
+"""Unit tests for DiffExclusions."""
+import pytest
+from ai_git_utils.models.file_stat import FileStat
+from ai_git_utils.services.diff_exclusions import (
+    GITATTRIBUTE_PATHSPECS,
+    REPO_EXCLUDE_FILE,
+    DiffExclusions,
+)
+
+
+@pytest.mark.unit
+class TestDiffExclusions:
+    """Test cases for DiffExclusions."""
+    
+    def test_patterns_follow_gitignore_rules(self):
+        """Test translation of gitignore-style patterns into glob pathspecs."""
+        exclusions = DiffExclusions(
+            ["*.min.js", "vendor/", "/build", "# comment", "!keep.js", ""],
+            use_gitattributes=False,
+        )
+        
+        assert exclusions.pathspecs() == [
+            ":(exclude,glob)**/*.min.js",
+            ":(exclude,glob)**/*.min.js/**",
+            ":(exclude,glob)**/vendor/**",
+            ":(exclude,glob)build",
+            ":(exclude,glob)build/**",
+        ]
+    
+    def test_gitattributes_and_size_limit(self):
+        """Test attribute pathspecs and literal exclusion of oversized files."""
+        exclusions = DiffExclusions([], max_file_lines=100)
+        stats = [FileStat("small.py", 10, 5), FileStat("data[1].csv", 90, 20), FileStat("a.png", None, None)]
+        
+        assert exclusions.pathspecs(stats) == [
+            *GITATTRIBUTE_PATHSPECS, ":(exclude,literal)data[1].csv"
+        ]
+        assert DiffExclusions([], use_gitattributes=False, max_file_lines=0).pathspecs(stats) == []
+    
+    def test_from_config_merges_model_option_and_repo_file(self, tmp_path):
+        """Test that the repository file adds to the configured patterns."""
+        (tmp_path / REPO_EXCLUDE_FILE).write_text("snapshots/\n")
+        
+        exclusions = DiffExclusions.from_config(
+            str(tmp_path),
+            {"exclude": ["*.pb.go"], "exclude_gitattributes": False, "max_file_lines": 0},
+        )
+        
+        assert exclusions.patterns == ["*.pb.go", "snapshots/"]
+        assert not exclusions.use_gitattributes
+        assert exclusions.max_file_lines == 0
+        assert DiffExclusions.from_config(str(tmp_path / "missing"), {}).patterns == ["*lock*"]
+    
+    def test_excluded_and_summary(self):
+        """Test listing the files missing from the diff with their counts."""
+        stats = [FileStat("app.py", 3, 1), FileStat("gen/api.py", 400, 12), FileStat("logo.png", None, None)]
+        diff = "diff --git a/app.py b/app.py\n@@ -1 +1 @@\n-a\n+b\n"
+        
+        excluded = DiffExclusions.excluded(stats, diff)
+        
+        assert [stat.path for stat in excluded] == ["gen/api.py", "logo.png"]
+        assert DiffExclusions.summary(excluded) == (
+            "# Changed but not shown (generated, vendored or too large):\n"
+            "# +400 -12 gen/api.py\n"
+            "# binary logo.png\n"
+        )
+        assert DiffExclusions.summary([]) == ""
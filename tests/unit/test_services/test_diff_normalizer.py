@@ -0,0 +1,108 @@
+"""Unit tests for DiffNormalizer."""
+import pytest
+from ai_git_utils.services.diff_budgeter import estimate_tokens
+from ai_git_utils.services.diff_normalizer import DiffNormalizer
+
+LICENSE = "".join(f"+# Copyright (c) Example Corp. Licensed under the MIT license, line {i}\n" for i in range(3))
+
+
+def _file(path: str, body: str, header: str = "") -> str:
+    return (
+        f"diff --git a/{path} b/{path}\n{header}index 3b18e51..a9c8f2d 100644\n"
+        f"--- a/{path}\n+++ b/{path}\n{body}"
+    )
+
+
+@pytest.mark.unit
+class TestDiffNormalizer:
+    """Test cases for DiffNormalizer."""
+    
+    def test_git_options(self):
+        """Test reduced context and rename/copy detection."""
+        assert DiffNormalizer.from_model_config({"diff_context": 0}).git_options() == [
+            "--unified=0", "--find-renames", "--find-copies"
+        ]
+    
+    def test_drops_redundant_header_lines(self):
+        """Test that object hashes and repeated file names are removed."""
+        diff = _file("app.py", "@@ -1 +1 @@\n-a = 1\n+a = 2\n")
+        
+        result = DiffNormalizer().normalize(diff)
+        
+        assert result == "diff --git a/app.py b/app.py\n@@ -1 +1 @@\n-a = 1\n+a = 2\n"
+    
+    def test_collapses_whitespace_only_hunks(self):
+        """Test that reindented code becomes a one-line note."""
+        diff = _file("app.py", "@@ -1,2 +1,2 @@\n-if x:\n-  y()\n+if x:\n+    y()\n@@ -9 +9 @@\n-a\n+b\n")
+        
+        result = DiffNormalizer().normalize(diff)
+        
+        assert "[whitespace-only change: +2 -2 lines]" in result
+        assert "    y()" not in result
+        assert "-a\n+b\n" in result
+    
+    def test_deduplicates_hunks_across_files(self):
+        """Test that a hunk repeated in several files is kept once."""
+        diff = "".join(
+            _file(f"src/m{i}.py", f"@@ -0,0 +1,3 @@\n{LICENSE}") for i in range(5)
+        )
+        
+        result = DiffNormalizer().normalize(diff)
+        
+        assert result.count("Copyright") == 3
+        assert result.count("[same change as in src/m0.py]") == 4
+        assert "diff --git a/src/m4.py b/src/m4.py" in result
+        assert estimate_tokens(result) < estimate_tokens(diff) / 2
+    
+    def test_summarizes_binary_and_minified_files(self):
+        """Test that binary patches and minified code become one-line summaries."""
+        binary = (
+            "diff --git a/logo.png b/logo.png\nnew file mode 100644\n"
+            "index 0000000..1234567\nGIT binary patch\nliteral 5\nMcmZ?wbhEHbKX3\n\nliteral 0\nHcmV?d00001\n\n"
+        )
+        minified = _file("dist/app.min.js", "@@ -1 +1 @@\n-var a=1\n+var a=2;var b=3\n")
+        long_line = _file("data.json", "@@ -1 +1 @@\n-[]\n+[" + "1," * 800 + "1]\n")
+        
+        result = DiffNormalizer().normalize(binary + minified + long_line)
+        
+        assert "diff --git a/logo.png b/logo.png\nnew file mode 100644\nBinary file changed\n" in result
+        assert "McmZ" not in result
+        assert "[minified or generated content: +1 -1 lines]" in result
+        assert "var b=3" not in result
+        assert "1,1,1" not in result
+    
+    def test_keeps_plain_binary_marker_and_renames(self):
+        """Test that header-only file diffs pass through."""
+        diff = (
+            "diff --git a/old.py b/new.py\nsimilarity index 100%\nrename from old.py\nrename to new.py\n"
+            "diff --git a/img.gif b/img.gif\nindex 1..2 100644\nBinary files a/img.gif and b/img.gif differ\n"
+        )
+        
+        result = DiffNormalizer().normalize(diff)
+        
+        assert "rename from old.py\nrename to new.py\n" in result
+        assert "Binary files a/img.gif and b/img.gif differ\n" in result
+    
+    def test_real_staged_diff(self, temp_git_repo, temp_dir):
+        """Test normalization of a diff produced by git with the normalizer's options."""
+        from ai_git_utils.git_operations import get_staged_tree_diff, stage_changes
+        
+        (temp_dir / "module.py").write_text("".join(f"line_{i} = {i}\n" for i in range(30)))
+        temp_git_repo.index.add(["module.py"])
+        temp_git_repo.index.commit("add module")
+        (temp_dir / "module.py").write_text(
+            "".join(f"line_{i} = {i if i != 15 else 'changed'}\n" for i in range(30))
+        )
+        temp_git_repo.git.mv("README.md", "README.rst")
+        
+        normalizer = DiffNormalizer()
+        staged = stage_changes(temp_git_repo)
+        full = get_staged_tree_diff(temp_git_repo, staged)
+        compact = normalizer.normalize(
+            get_staged_tree_diff(temp_git_repo, staged, options=normalizer.git_options())
+        )
+        
+        assert "rename from README.md" in compact
+        assert "line_14 = 14\n-line_15 = 15\n+line_15 = changed\n line_16 = 16" in compact
+        assert "line_12" not in compact
+        assert len(compact) < len(full)
@@ -0,0 +1,55 @@
+"""Unit tests for hedged requests."""
+import threading
+import time
+import pytest
+from ai_git_utils.services.hedging import RequestCancelled, run_hedged
+
+
+@pytest.mark.unit
+class TestRunHedged:
+    """Test cases for run_hedged."""
+
+    def test_fast_primary_never_hedges(self):
+        """Test that a quick primary answer launches no backups."""
+        calls = []
+
+        def request(name, cancelled):
+            calls.append(name)
+            return name
+
+        assert run_hedged(["primary", "backup"], request, delay=1.0) == "primary"
+        assert calls == ["primary"]
+
+    def test_slow_primary_is_hedged(self):
+        """Test that a backup wins when the primary is slow and is then cancelled."""
+        primary_cancelled = threading.Event()
+
+        def request(name, cancelled):
+            if name == "primary":
+                while not cancelled.wait(0.01):
+                    pass
+                primary_cancelled.set()
+                raise RequestCancelled()
+            return name
+
+        assert run_hedged(["primary", "backup"], request, delay=0.05) == "backup"
+        assert primary_cancelled.wait(1.0)
+
+    def test_failure_hedges_immediately(self):
+        """Test that a failed request starts the next candidate without delay."""
+        def request(name, cancelled):
+            if name == "primary":
+                raise RuntimeError("503")
+            return name
+
+        start = time.monotonic()
+        assert run_hedged(["primary", "backup"], request, delay=10) == "backup"
+        assert time.monotonic() - start < 5
+
+    def test_all_fail_raises_last_error(self):
+        """Test that the last error is raised when every candidate fails."""
+        def request(name, cancelled):
+            raise ValueError(name)
+
+        with pytest.raises(ValueError, match="backup"):
+            run_hedged(["primary", "backup"], request, delay=0.01)
@@ -0,0 +1,132 @@
+"""Unit tests for LogIndex."""
+import os
+from unittest.mock import patch
+import pytest
+from git import Actor
+from ai_git_utils.git_operations import iter_log
+from ai_git_utils.services import log_index
+from ai_git_utils.services.log_index import LogIndex, parse_log_date
+
+
+def _commit(repo, temp_dir, name, message, author=None, date=None):
+    (temp_dir / name).write_text(message)
+    repo.index.add([name])
+    kwargs = {}
+    if author:
+        kwargs["author"] = kwargs["committer"] = Actor(author, f"{author.lower()}@example.com")
+    if date:
+        kwargs["author_date"] = kwargs["commit_date"] = date
+    return repo.index.commit(message, **kwargs)
+
+
+@pytest.mark.unit
+class TestLogIndex:
+    """Test cases for LogIndex."""
+
+    def test_query_matches_git_log(self, temp_git_repo, temp_dir):
+        """Test that indexed rows equal the rows git log produces."""
+        for i in range(3):
+            _commit(temp_git_repo, temp_dir, f"f{i}.py", f"feat: add f{i}")
+
+        entries = list(LogIndex(temp_git_repo).query())
+
+        assert entries == list(iter_log(temp_git_repo))
+        assert os.path.exists(os.path.join(temp_git_repo.git_dir, "aigit", "log-index", "meta.json"))
+
+    def test_refresh_reads_only_new_commits(self, temp_git_repo, temp_dir):
+        """Test that a moved HEAD only fetches the new range."""
+        first = temp_git_repo.head.commit.hexsha
+        LogIndex(temp_git_repo).refresh()
+        head = _commit(temp_git_repo, temp_dir, "a.py", "feat: add a").hexsha
+
+        with patch.object(log_index, "iter_log_lines", wraps=log_index.iter_log_lines) as mock_lines:
+            index = LogIndex(temp_git_repo)
+            index.refresh()
+
+        assert mock_lines.call_args[0][1][-1] == f"{first}..{head}"
+        assert index.count == 2
+        assert [entry.subject for entry in index.query()] == ["feat: add a", "Initial commit"]
+
+    def test_refresh_unchanged_head_skips_git_log(self, temp_git_repo):
+        """Test that an up-to-date index is loaded without running git log."""
+        LogIndex(temp_git_repo).refresh()
+
+        with patch.object(log_index, "iter_log_lines") as mock_lines:
+            index = LogIndex(temp_git_repo)
+            index.refresh()
+
+        mock_lines.assert_not_called()
+        assert index.count == 1
+
+    def test_rewritten_history_rebuilds(self, temp_git_repo, temp_dir):
+        """Test that an amended HEAD replaces the stale rows."""
+        _commit(temp_git_repo, temp_dir, "a.py", "feat: add a")
+        LogIndex(temp_git_repo).refresh()
+
+        temp_git_repo.git.commit("--amend", "-m", "feat: add a (amended)")
+
+        subjects = [entry.subject for entry in LogIndex(temp_git_repo).query()]
+        assert subjects == ["feat: add a (amended)", "Initial commit"]
+
+    def test_merge_rebuilds_in_git_order(self, temp_git_repo, temp_dir):
+        """Test that merged commits interleave by date exactly as in git log."""
+        base = temp_git_repo.active_branch.name
+        temp_git_repo.git.checkout("-b", "side")
+        _commit(temp_git_repo, temp_dir, "s.py", "side", date="2020-01-02T12:00:00")
+        temp_git_repo.git.checkout(base)
+        _commit(temp_git_repo, temp_dir, "a.py", "main old", date="2020-01-01T12:00:00")
+        _commit(temp_git_repo, temp_dir, "b.py", "main new", date="2020-01-03T12:00:00")
+        LogIndex(temp_git_repo).refresh()
+
+        temp_git_repo.git.merge("--no-ff", "-m", "merge side", "side")
+
+        assert list(LogIndex(temp_git_repo).query()) == list(iter_log(temp_git_repo))
+
+    def test_date_filters_match_git(self, temp_git_repo, temp_dir):
+        """Test that bare dates select the same commits with and without the index."""
+        for hour in ("01", "23"):
+            _commit(temp_git_repo, temp_dir, f"{hour}.py", hour, date=f"2024-01-15T{hour}:00:00")
+        _commit(temp_git_repo, temp_dir, "next.py", "next", date="2024-01-16T00:30:00")
+        index = LogIndex(temp_git_repo)
+
+        for since, until in [(None, "2024-01-15"), ("2024-01-15", None), ("2024-01-16", "2024-01-16")]:
+            indexed = [entry.subject for entry in index.query(since=since, until=until)]
+            direct = [entry.subject for entry in iter_log(temp_git_repo, since=since, until=until)]
+            assert indexed == direct
+
+    def test_torn_update_is_discarded(self, temp_git_repo, temp_dir):
+        """Test that column data beyond the recorded count is ignored."""
+        index = LogIndex(temp_git_repo)
+        index.refresh()
+        with open(os.path.join(index.index_dir, "subjects.bin"), "ab") as f:
+            f.write(b"garbage")
+        _commit(temp_git_repo, temp_dir, "a.py", "feat: add a")
+
+        subjects = [entry.subject for entry in LogIndex(temp_git_repo).query()]
+        assert subjects == ["feat: add a", "Initial commit"]
+
+    def test_query_filters(self, temp_git_repo, temp_dir):
+        """Test limit, author and date filtering."""
+        _commit(temp_git_repo, temp_dir, "a.py", "old", author="Alice", date="2020-01-15T12:00:00")
+        _commit(temp_git_repo, temp_dir, "b.py", "middle", author="Bob", date="2021-06-15T12:00:00")
+        _commit(temp_git_repo, temp_dir, "c.py", "new", author="Alice", date="2022-03-15T12:00:00")
+        index = LogIndex(temp_git_repo)
+
+        assert [e.subject for e in index.query(limit=2)] == ["new", "middle"]
+        assert [e.subject for e in index.query(author="Alice")] == ["new", "old"]
+        assert [e.subject for e in index.query(author="bob@")] == ["middle"]
+        assert [e.subject for e in index.query(since="2021-01-01", until="2021-12-31")] == ["middle"]
+        assert [e.subject for e in index.query(until="2020-01-15")] == ["old"]
+
+    def test_query_unsupported_filters_fall_back(self, temp_git_repo):
+        """Test that relative dates and invalid patterns are left to git."""
+        index = LogIndex(temp_git_repo)
+
+        assert index.query(since="2 weeks ago") is None
+        assert index.query(author="(") is None
+
+    def test_parse_log_date(self):
+        """Test the date formats the index understands."""
+        assert parse_log_date("2024-01-01") < parse_log_date("2024-01-01", end_of_day=True)
+        assert parse_log_date("2024-01-01 10:30") is not None
+        assert parse_log_date("yesterday") is None
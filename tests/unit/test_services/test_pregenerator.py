@@ -0,0 +1,127 @@
+"""Unit tests for Pregenerator."""
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+import pytest
+from ai_git_utils.git_operations import stage_changes, write_index_tree
+from ai_git_utils.models.commit_message import CommitMessage
+from ai_git_utils.services.commit_service import CommitService
+from ai_git_utils.services.pregenerator import (
+    Pregenerator,
+    _claim,
+    _marker_path,
+    wait_for_pregeneration,
+)
+
+MESSAGE = CommitMessage(type="feat", scope="", subject="add a", emoji="", fix_items=[])
+
+
+@pytest.fixture
+def model_config():
+    """Patch the active model wherever the pregeneration reads it."""
+    with patch('ai_git_utils.services.commit_service.get_active_model', return_value={}), \
+            patch('ai_git_utils.services.pregenerator.get_active_model', return_value={}):
+        yield {}
+
+
+def _service() -> CommitService:
+    service = CommitService()
+    service.ai_service = Mock()
+    service.ai_service.generate_commit_message.return_value = MESSAGE
+    return service
+
+
+@pytest.mark.unit
+class TestPregenerator:
+    """Test cases for Pregenerator."""
+
+    def test_run_caches_message_for_commit(self, temp_git_repo, temp_dir, model_config):
+        """Test that aigit commit picks up the pregenerated message without the model."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        temp_git_repo.git.add("a.py")
+        worker = _service()
+        pregenerator = Pregenerator(str(temp_dir), debounce=0, service=worker)
+
+        assert pregenerator.run(pregenerator.schedule()) == MESSAGE
+        worker.ai_service.generate_commit_message.assert_called_once()
+        assert os.listdir(os.path.join(temp_git_repo.git_dir, "aigit-pregenerate")) == ["pending"]
+
+        service = _service()
+        with patch('ai_git_utils.services.commit_service.get_staged_tree_diff') as mock_diff:
+            draft = service.draft_commit_message(str(temp_dir))
+
+        assert draft.message == MESSAGE
+        mock_diff.assert_not_called()
+        service.ai_service.generate_commit_message.assert_not_called()
+
+    def test_run_superseded(self, temp_git_repo, temp_dir, model_config):
+        """Test that only the latest of several scheduled workers generates."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        temp_git_repo.git.add("a.py")
+        service = _service()
+        pregenerator = Pregenerator(str(temp_dir), debounce=0, service=service)
+
+        token = pregenerator.schedule()
+        pregenerator.schedule()
+
+        assert pregenerator.run(token) is None
+        service.ai_service.generate_commit_message.assert_not_called()
+
+    def test_run_nothing_staged(self, temp_git_repo, temp_dir, model_config):
+        """Test that an index equal to HEAD is not described."""
+        (temp_dir / "unstaged.py").write_text("a = 1\n")
+        service = _service()
+        pregenerator = Pregenerator(str(temp_dir), debounce=0, service=service)
+
+        assert pregenerator.run(pregenerator.schedule()) is None
+        service.ai_service.generate_commit_message.assert_not_called()
+
+    def test_message_for_index(self, temp_git_repo, temp_dir, model_config):
+        """Test that the hook generates on a miss and reuses the result afterwards."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        temp_git_repo.git.add("a.py")
+        service = _service()
+
+        assert Pregenerator(str(temp_dir), service=service).message_for_index() == MESSAGE
+        assert Pregenerator(str(temp_dir), service=service).message_for_index() == MESSAGE
+        service.ai_service.generate_commit_message.assert_called_once()
+
+    def test_run_skips_tree_claimed_by_live_process(self, temp_git_repo, temp_dir, model_config):
+        """Test that a tree being generated elsewhere is not requested again."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        temp_git_repo.git.add("a.py")
+        marker = _marker_path(temp_git_repo.git_dir, write_index_tree(temp_git_repo))
+        os.makedirs(os.path.dirname(marker))
+        with open(marker, "w") as f:
+            f.write(str(os.getppid()))
+        service = _service()
+        pregenerator = Pregenerator(str(temp_dir), debounce=0, service=service)
+
+        assert pregenerator.run(pregenerator.schedule()) is None
+        service.ai_service.generate_commit_message.assert_not_called()
+
+    def test_wait_for_pregeneration(self, temp_git_repo, temp_dir):
+        """Test waiting for a live worker and ignoring a dead one."""
+        (temp_dir / "a.py").write_text("a = 1\n")
+        staged = stage_changes(temp_git_repo)
+        marker = _marker_path(temp_git_repo.git_dir, staged)
+        os.makedirs(os.path.dirname(marker))
+
+        worker = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.3)"])
+        with open(marker, "w") as f:
+            f.write(str(worker.pid))
+        # 像 init 一样回收退出的进程；之后标记仍在，但不再被视为正在生成
+        reaper = threading.Thread(target=worker.wait)
+        reaper.start()
+        start = time.monotonic()
+        assert wait_for_pregeneration(temp_git_repo.git_dir, staged, 10) is True
+        assert 0.1 < time.monotonic() - start < 5
+        reaper.join()
+
+        assert wait_for_pregeneration(temp_git_repo.git_dir, staged, 10) is False
+        assert _claim(marker) is True
+        with open(marker) as f:
+            assert f.read() == str(os.getpid())
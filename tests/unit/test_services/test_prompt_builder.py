@@ -36,6 +36,16 @@ class TestPromptBuilder:
         assert "git diff summary" in prompt
         assert diff in prompt
     
+    def test_build_user_prompt_with_token_budget(self):
+        """Test that a token budget packs oversized diffs."""
+        builder = PromptBuilder()
+        diff = "diff --git a/f.py b/f.py\n" + "@@ -1 +1 @@\n" + "+x = 1\n" * 2000
+        
+        prompt = builder.build_user_prompt(diff, max_tokens=200)
+        
+        assert len(prompt) < len(diff)
+        assert "[omitted to fit token budget]" in prompt
+    
     def test_emoji_list_contains_all_emojis(self):
         """Test that EMOJI_LIST contains all expected emojis."""
         builder = PromptBuilder()
@@ -44,4 +54,40 @@ class TestPromptBuilder:
         actual_emojis = [emoji for emoji, _ in builder.EMOJI_LIST]
         
         for emoji in expected_emojis:
-            assert emoji in actual_emojis
\ No newline at end of file
+            assert emoji in actual_emojis    
+    def test_system_prompt_static_prefix(self):
+        """Test that languages share a byte-identical prefix and differ only at the end."""
+        builder = PromptBuilder()
+        
+        for variant in ("full", "compact"):
+            prefix = builder.static_prefix(variant)
+            english = builder.build_system_prompt("English", variant)
+            chinese = builder.build_system_prompt("Chinese", variant)
+            
+            assert english.startswith(prefix) and chinese.startswith(prefix)
+            assert "English" not in prefix
+            assert english[len(prefix):].count("\n") == 1
+    
+    def test_system_prompt_memoized(self):
+        """Test that prompts are built once per version, variant and language."""
+        first = PromptBuilder().build_system_prompt("English")
+        
+        assert PromptBuilder().build_system_prompt("English") is first
+        assert PromptBuilder().build_system_prompt("English", "compact") is not first
+    
+    def test_compact_variant(self):
+        """Test that the compact prompt is shorter but keeps the essentials."""
+        builder = PromptBuilder()
+        full = builder.build_system_prompt("Chinese")
+        compact = builder.build_system_prompt("Chinese", "compact")
+        
+        assert len(compact) < len(full) * 0.7
+        assert "Conventional Commits" in compact
+        assert "Chinese" in compact
+        assert all(emoji in compact for emoji, _ in builder.EMOJI_LIST)
+        assert builder.prompt_version("compact") != builder.prompt_version()
+    
+    def test_unknown_variant(self):
+        """Test that an unknown variant is rejected."""
+        with pytest.raises(ValueError, match="Unknown prompt variant"):
+            PromptBuilder().build_system_prompt("English", "tiny")
@@ -0,0 +1,135 @@
+"""Unit tests for retry and circuit breaking."""
+import httpx
+import openai
+import pytest
+from unittest.mock import Mock, patch
+from ai_git_utils.services.resilience import (
+    CircuitBreaker,
+    RateLimiter,
+    RetryPolicy,
+    is_retryable,
+    retry_after,
+)
+
+
+def _status_error(status: int, headers: dict = None) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+@pytest.mark.unit
+class TestRetryPolicy:
+    """Test cases for RetryPolicy."""
+
+    def test_is_retryable(self):
+        """Test which errors are retried."""
+        assert is_retryable(_status_error(429))
+        assert is_retryable(_status_error(503))
+        assert not is_retryable(_status_error(400))
+        assert not is_retryable(_status_error(401))
+        assert is_retryable(openai.APIConnectionError(request=httpx.Request("GET", "https://x")))
+        assert is_retryable(httpx.RemoteProtocolError("peer closed connection"))
+        assert not is_retryable(ValueError("bad"))
+
+    def test_retry_after_headers(self):
+        """Test reading Retry-After in seconds, milliseconds and dates."""
+        assert retry_after(_status_error(429, {"retry-after": "3"})) == 3.0
+        assert retry_after(_status_error(429, {"retry-after-ms": "250"})) == 0.25
+        assert retry_after(_status_error(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+        assert retry_after(_status_error(429)) is None
+        assert retry_after(ValueError()) is None
+
+    def test_delay_honors_retry_after_and_caps(self):
+        """Test that server delays win over backoff but are capped."""
+        policy = RetryPolicy(base_delay=1, max_delay=10)
+
+        assert policy.delay(0, _status_error(429, {"retry-after": "4"})) == 4.0
+        assert policy.delay(0, _status_error(429, {"retry-after": "60"})) == 10
+        assert 0 <= policy.delay(3, _status_error(503)) <= 8
+
+    def test_call_retries_then_succeeds(self):
+        """Test that transient errors are retried."""
+        fn = Mock(side_effect=[_status_error(503), _status_error(429), "ok"])
+
+        with patch('ai_git_utils.services.resilience.time.sleep') as mock_sleep:
+            assert RetryPolicy(max_retries=2).call(fn) == "ok"
+
+        assert fn.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    def test_call_gives_up(self):
+        """Test that retries stop after max_retries and on fatal errors."""
+        with patch('ai_git_utils.services.resilience.time.sleep'):
+            with pytest.raises(openai.APIStatusError):
+                RetryPolicy(max_retries=1).call(Mock(side_effect=_status_error(500)))
+
+            fatal = Mock(side_effect=_status_error(401))
+            with pytest.raises(openai.APIStatusError):
+                RetryPolicy(max_retries=5).call(fatal)
+            assert fatal.call_count == 1
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+
+    def test_spaces_out_calls(self):
+        """Test that calls start at least 60 / rate seconds apart."""
+        now = [100.0]
+        waits = []
+
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(rate=30, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.acquire()
+        assert waits == [2.0, 2.0]
+
+        now[0] += 10
+        limiter.acquire()
+        assert waits == [2.0, 2.0]
+
+    def test_no_limit(self):
+        """Test that no rate never waits."""
+        sleep = Mock()
+        limiter = RateLimiter(None, sleep=sleep)
+        for _ in range(5):
+            limiter.acquire()
+        sleep.assert_not_called()
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_after_threshold_and_persists(self, tmp_path):
+        """Test that the open state is shared across breaker instances."""
+        state_file = str(tmp_path / "circuit.json")
+        breaker = CircuitBreaker(state_file, failure_threshold=2, cooldown=60)
+
+        breaker.record_failure("api")
+        assert breaker.allow("api")
+        breaker.record_failure("api")
+
+        assert not breaker.allow("api")
+        assert not CircuitBreaker(state_file, cooldown=60).allow("api")
+        assert breaker.allow("other")
+
+    def test_half_open_after_cooldown(self, tmp_path):
+        """Test that a trial call is allowed once the cooldown passes."""
+        breaker = CircuitBreaker(str(tmp_path / "circuit.json"), failure_threshold=1, cooldown=0)
+        breaker.record_failure("api")
+
+        assert breaker.allow("api")
+
+    def test_success_closes_circuit(self, tmp_path):
+        """Test that a success resets the failure count."""
+        breaker = CircuitBreaker(str(tmp_path / "circuit.json"), failure_threshold=2)
+        breaker.record_failure("api")
+        breaker.record_success("api")
+        breaker.record_failure("api")
+
+        assert breaker.allow("api")
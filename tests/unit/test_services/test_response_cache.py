@@ -0,0 +1,84 @@
+"""Unit tests for ResponseCache."""
+import os
+import pytest
+from ai_git_utils.services.response_cache import ResponseCache, normalize_diff
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def test_normalize_diff(self):
+        """Test that line endings and trailing whitespace are normalized."""
+        assert normalize_diff("+a  \r\n-b\r\n\n") == normalize_diff("+a\n-b")
+
+    def test_make_key_depends_on_inputs(self):
+        """Test that every key component changes the key."""
+        base = ("diff", "gpt-4o", "https://api", 0.7, "English", "1")
+        key = ResponseCache.make_key(*base)
+
+        assert key == ResponseCache.make_key("diff  \r\n", *base[1:])
+        for index, value in enumerate(["other", "gpt-4", "http://x", 0.2, "Chinese", "2"]):
+            changed = list(base)
+            changed[index] = value
+            assert ResponseCache.make_key(*changed) != key
+
+    def test_make_key_depends_on_prompt_options(self):
+        """Test that the options shaping the prompt change the key."""
+        base = ("diff", "gpt-4o", "https://api", 0.7, "English", "1")
+        key = ResponseCache.make_key(*base, {"max_diff_tokens": 8000, "exclude": ["*lock*"]})
+
+        assert key == ResponseCache.make_key(*base, {"exclude": ["*lock*"], "max_diff_tokens": 8000})
+        assert key != ResponseCache.make_key(*base, {"max_diff_tokens": 4000, "exclude": ["*lock*"]})
+        assert key != ResponseCache.make_key(*base, {"max_diff_tokens": 8000, "exclude": []})
+
+    def test_make_tree_key_depends_on_inputs(self):
+        """Test that the tree, its HEAD and every model option change the key."""
+        base = ("tree", "head", "English", "1", {"model": "gpt-4o", "diff_context": 1})
+        key = ResponseCache.make_tree_key(*base)
+
+        assert key == ResponseCache.make_tree_key(*base[:4], {"diff_context": 1, "model": "gpt-4o"})
+        for index, value in enumerate(["other", None, "Chinese", "2", {"model": "gpt-4o"}]):
+            changed = list(base)
+            changed[index] = value
+            assert ResponseCache.make_tree_key(*changed) != key
+        assert ResponseCache.make_tree_key(*base, ["vendor/"]) != key
+
+    def test_get_set_roundtrip(self, tmp_path):
+        """Test storing and reading back a value."""
+        cache = ResponseCache(str(tmp_path))
+
+        assert cache.get("missing") is None
+        cache.set("k", {"subject": "hello"})
+        assert cache.get("k") == {"subject": "hello"}
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Test that unreadable entries are treated as misses."""
+        cache = ResponseCache(str(tmp_path))
+        (tmp_path / "bad.json").write_text("{not json")
+
+        assert cache.get("bad") is None
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entry is evicted."""
+        cache = ResponseCache(str(tmp_path), max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        os.utime(tmp_path / "a.json", (1, 1))
+        os.utime(tmp_path / "b.json", (2, 2))
+        cache.get("a")
+
+        cache.set("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.get("c") == {"v": 3}
+
+    def test_clear(self, tmp_path):
+        """Test removing all entries."""
+        cache = ResponseCache(str(tmp_path))
+        cache.set("a", {"v": 1})
+
+        cache.clear()
+
+        assert cache.get("a") is None
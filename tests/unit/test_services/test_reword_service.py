@@ -0,0 +1,134 @@
+"""Unit tests for RewordService."""
+import json
+import os
+import re
+import threading
+import time
+from unittest.mock import Mock, patch
+import pytest
+from ai_git_utils.git_operations import read_commit_message
+from ai_git_utils.models.commit_message import CommitMessage
+from ai_git_utils.services.commit_service import CommitService
+from ai_git_utils.services.reword_service import CHECKPOINT_FILE, RewordService
+
+
+def _message(diff_output: str, language: str, **kwargs) -> CommitMessage:
+    """Describe a diff by the first file it adds."""
+    path = re.search(r"file\d\.py", diff_output).group()
+    return CommitMessage(type="feat", scope="", subject=f"add {path}", emoji="", fix_items=[])
+
+
+def _expected(index: int) -> str:
+    return _message(f"file{index}.py", "English").to_string().strip()
+
+
+def _service(workers: int = 1, generate=_message) -> RewordService:
+    commit_service = CommitService(use_cache=False)
+    commit_service.ai_service = Mock()
+    commit_service.ai_service.generate_commit_message.side_effect = generate
+    return RewordService(commit_service, workers)
+
+
+@pytest.fixture
+def history(temp_git_repo, temp_dir):
+    """A repository with four "wip" commits on top of the initial commit."""
+    for index in range(4):
+        (temp_dir / f"file{index}.py").write_text(f"x = {index}\n")
+        temp_git_repo.index.add([f"file{index}.py"])
+        temp_git_repo.index.commit("wip")
+    with patch('ai_git_utils.services.commit_service.get_active_model', return_value={}):
+        yield temp_git_repo
+
+
+@pytest.mark.unit
+class TestRewordService:
+    """Test cases for RewordService."""
+
+    def test_generate_and_rewrite(self, history, temp_dir):
+        """Test that every commit of the range gets the message of its own diff."""
+        service = _service(workers=2)
+        plan = service.plan(str(temp_dir), "HEAD~4..")
+        on_message = Mock()
+
+        messages = service.generate(str(temp_dir), plan, "English", on_message)
+        new_head = service.rewrite(str(temp_dir), plan, messages)
+
+        assert on_message.call_count == 4
+        assert history.head.commit.hexsha == new_head
+        assert [read_commit_message(history, f"HEAD~{n}").strip() for n in range(4)] == [
+            _expected(index) for index in (3, 2, 1, 0)
+        ]
+        assert read_commit_message(history, "HEAD~4").strip() == "Initial commit"
+        assert not os.path.exists(os.path.join(history.git_dir, CHECKPOINT_FILE))
+
+    def test_resume_after_failure(self, history, temp_dir):
+        """Test that an interrupted run resumes without regenerating finished commits."""
+        def fail_on_file2(diff_output, language, **kwargs):
+            if "file2.py" in diff_output:
+                raise RuntimeError("rate limited")
+            return _message(diff_output, language)
+
+        service = _service(generate=fail_on_file2)
+        plan = service.plan(str(temp_dir), "HEAD~4..")
+        with pytest.raises(RuntimeError):
+            service.generate(str(temp_dir), plan, "English")
+
+        with open(os.path.join(history.git_dir, CHECKPOINT_FILE)) as f:
+            assert len(json.load(f)["messages"]) == 2
+
+        service = _service()
+        assert len(service.load_checkpoint(str(temp_dir), plan, "English")) == 2
+        assert service.load_checkpoint(str(temp_dir), plan, "Chinese") == {}
+        messages = service.generate(str(temp_dir), plan, "English")
+
+        assert service.commit_service.ai_service.generate_commit_message.call_count == 2
+        assert sorted(message.strip() for message in messages.values()) == [
+            _expected(index) for index in range(4)
+        ]
+
+    def test_checkpoint_survives_new_commits(self, history, temp_dir):
+        """Test that messages are reused by commit hash after HEAD moved."""
+        service = _service()
+        service.generate(str(temp_dir), service.plan(str(temp_dir), "HEAD~1.."), "English")
+
+        (temp_dir / "file4.py").write_text("x = 4\n")
+        history.index.add(["file4.py"])
+        history.index.commit("wip")
+        plan = service.plan(str(temp_dir), "HEAD~2..")
+
+        assert list(service.load_checkpoint(str(temp_dir), plan, "English")) == [plan.selected[0].hexsha]
+        service.generate(str(temp_dir), plan, "English")
+        assert service.commit_service.ai_service.generate_commit_message.call_count == 2
+
+    def test_bounded_concurrency(self, history, temp_dir):
+        """Test that no more than ``workers`` messages are generated at once."""
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def slow(diff_output, language, **kwargs):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return _message(diff_output, language)
+
+        service = _service(workers=2, generate=slow)
+        service.generate(str(temp_dir), service.plan(str(temp_dir), "HEAD~4.."), "English")
+
+        assert running[1] == 2
+
+    def test_from_model_config(self):
+        """Test the model options and their explicit overrides."""
+        commit_service = Mock()
+
+        service = RewordService.from_model_config(
+            {"max_concurrency": 3, "reword_rate_limit": 30}, commit_service
+        )
+        assert service.workers == 3
+        assert service.limiter.interval == 2.0
+
+        service = RewordService.from_model_config({"max_concurrency": 3}, commit_service, 1, 0)
+        assert service.workers == 1
+        assert service.limiter.interval == 0.0
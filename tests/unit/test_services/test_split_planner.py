@@ -0,0 +1,89 @@
+"""Unit tests for SplitPlanner."""
+import pytest
+from ai_git_utils.services.split_planner import SplitPlanner
+
+
+def _file_diff(path: str, *hunks: str, header_extra: str = "") -> str:
+    header = f"diff --git a/{path} b/{path}\n{header_extra}--- a/{path}\n+++ b/{path}\n"
+    return header + "".join(hunks)
+
+
+HUNK_A = "@@ -1,3 +1,3 @@\n ctx\n-old_value = compute_total(items)\n+new_value = compute_total(items)\n ctx\n"
+HUNK_B = "@@ -40,3 +40,3 @@\n ctx\n-print('hello')\n+print('goodbye')\n ctx\n"
+HUNK_C = "@@ -1,2 +1,2 @@\n-old_value = compute_total(items)\n+new_value = compute_total(items)\n"
+
+
+@pytest.mark.unit
+class TestSplitPlanner:
+    """Test cases for SplitPlanner."""
+
+    def test_units_one_per_hunk(self):
+        """Test that modified files are split at hunk boundaries."""
+        diff = _file_diff("src/app.py", HUNK_A, HUNK_B)
+        units = SplitPlanner().units_from_diff(diff)
+
+        assert [unit.path for unit in units] == ["src/app.py", "src/app.py"]
+        assert units[0].body == HUNK_A
+        assert units[1].body == HUNK_B
+        assert units[0].header == units[1].header
+
+    def test_units_whole_file_changes(self):
+        """Test that new files stay one unit even with several hunks."""
+        diff = _file_diff("src/new.py", HUNK_A, HUNK_B, header_extra="new file mode 100644\n")
+        units = SplitPlanner().units_from_diff(diff)
+
+        assert len(units) == 1
+        assert units[0].body == HUNK_A + HUNK_B
+
+    def test_units_terminate_last_hunk(self):
+        """Test that a missing trailing newline is restored."""
+        units = SplitPlanner().units_from_diff(_file_diff("a.py", HUNK_B.rstrip("\n")))
+
+        assert units[0].body.endswith("\n")
+
+    def test_heuristic_groups_by_directory(self):
+        """Test that units in the same directory share a group."""
+        diff = (
+            _file_diff("src/app.py", HUNK_B)
+            + _file_diff("docs/guide.md", "@@ -1 +1 @@\n-Intro\n+Introduction\n")
+            + _file_diff("src/util.py", "@@ -1 +1 @@\n-return None\n+return value\n")
+        )
+        planner = SplitPlanner()
+
+        assert planner.heuristic_groups(planner.units_from_diff(diff)) == [[0, 2], [1]]
+
+    def test_heuristic_groups_merge_similar_changes(self):
+        """Test that the same change in different directories is merged."""
+        diff = _file_diff("src/app.py", HUNK_A) + _file_diff("lib/other.py", HUNK_C)
+        planner = SplitPlanner()
+
+        assert planner.heuristic_groups(planner.units_from_diff(diff)) == [[0, 1]]
+
+    @pytest.mark.parametrize("groups", [
+        [[0], [1]],
+        [[0, 1], [1, 2]],
+        [[0, 1], []],
+        [[0, 1, 5]],
+        "not a list",
+        [["0", 1, 2]],
+    ])
+    def test_validate_groups_rejects_invalid(self, groups):
+        """Test that anything but a partition of all units is rejected."""
+        assert SplitPlanner.validate_groups(groups, 3) is None
+
+    def test_validate_groups_normalizes_order(self):
+        """Test that groups are sorted and ordered by their first unit."""
+        assert SplitPlanner.validate_groups([[2, 1], [0]], 3) == [[0], [1, 2]]
+
+    def test_plan_merges_hunks_of_one_file(self):
+        """Test that hunks of the same file share one header in a patch."""
+        diff = _file_diff("src/app.py", HUNK_A, HUNK_B) + _file_diff("docs/a.md", HUNK_B)
+        planner = SplitPlanner()
+        units = planner.units_from_diff(diff)
+
+        splits = planner.plan(units, [[0, 1], [2]])
+
+        assert splits[0].patch == _file_diff("src/app.py", HUNK_A, HUNK_B)
+        assert splits[0].paths == ["src/app.py"]
+        assert splits[1].paths == ["docs/a.md"]
+        assert splits[1].message is None
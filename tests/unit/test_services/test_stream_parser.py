@@ -0,0 +1,66 @@
+"""Unit tests for CommitMessageStreamParser."""
+import json
+import pytest
+from ai_git_utils.services.stream_parser import CommitMessageStreamParser
+
+
+@pytest.mark.unit
+class TestCommitMessageStreamParser:
+    """Test cases for incremental commit message parsing."""
+
+    RESPONSE = json.dumps({
+        "type": "feat",
+        "scope": "cli",
+        "emoji": "✨",
+        "subject": "add \"quoted\" subject",
+        "fix_items": ["first item", "second, with comma"],
+    }, ensure_ascii=False, indent=2)
+
+    def test_fields_complete_in_order(self):
+        """Test feeding one character at a time publishes fields in order."""
+        parser = CommitMessageStreamParser()
+        snapshots = []
+
+        for char in self.RESPONSE:
+            if parser.feed(char):
+                snapshots.append(dict(parser.fields))
+
+        assert parser.fields == json.loads(self.RESPONSE)
+        assert snapshots[0] == {"type": "feat"}
+        assert parser.buffer == self.RESPONSE
+
+    def test_partial_string_not_published(self):
+        """Test that an unterminated string value is not exposed."""
+        parser = CommitMessageStreamParser()
+
+        parser.feed('{"type": "feat", "subject": "half')
+
+        assert parser.fields == {"type": "feat"}
+
+    def test_list_items_grow_incrementally(self):
+        """Test that fix_items are published item by item."""
+        parser = CommitMessageStreamParser()
+        parser.feed('{"fix_items": ["one", "tw')
+
+        assert parser.fields == {"fix_items": ["one"]}
+
+        parser.feed('o"]}')
+        assert parser.fields == {"fix_items": ["one", "two"]}
+
+    def test_skips_code_fence_prefix(self):
+        """Test that a markdown fence before the object is ignored."""
+        parser = CommitMessageStreamParser()
+
+        parser.feed('```json\n{"type": "fix"}\n```')
+
+        assert parser.fields == {"type": "fix"}
+
+    def test_trailing_number_waits_for_delimiter(self):
+        """Test that a number at the end of the buffer is not published early."""
+        parser = CommitMessageStreamParser()
+        parser.feed('{"count": 12')
+
+        assert "count" not in parser.fields
+
+        parser.feed('3}')
+        assert parser.fields == {"count": 123}
@@ -0,0 +1,153 @@
+"""Unit tests for phase tracing."""
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ai_git_utils import tracing
+from ai_git_utils.tracing import Tracer
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    """Enabled tracer writing to a temporary file."""
+    tracer = Tracer()
+    tracer.enable(str(tmp_path / "trace.json"))
+    return tracer
+
+
+@pytest.mark.unit
+class TestTracer:
+    """Test cases for Tracer."""
+
+    def test_disabled_tracer_records_nothing(self):
+        """Test that spans are no-ops until tracing is enabled."""
+        tracer = Tracer()
+
+        with tracer.span("git.add") as span:
+            tracer.annotate(files=3)
+            tracer.mark("ttft_ms")
+
+        assert span is None
+        assert tracer.spans == []
+
+    def test_nested_spans_and_annotations(self, tracer):
+        """Test that annotate and mark apply to the innermost open span."""
+        with tracer.span("commit.generate", stream=True):
+            with tracer.span("ai.request", model="m"):
+                tracer.mark("ttfb_ms")
+                tracer.mark("ttfb_ms")
+                tracer.annotate(prompt_tokens=10, completion_tokens=5)
+            tracer.annotate(done=True)
+
+        outer, inner = sorted(tracer.spans, key=lambda span: span.start_ns)
+        assert (outer.name, outer.category, outer.args) == (
+            "commit.generate", "commit", {"stream": True, "done": True}
+        )
+        assert inner.args["model"] == "m"
+        assert inner.args["prompt_tokens"] == 10
+        assert list(inner.args).count("ttfb_ms") == 1
+        assert outer.start_ns <= inner.start_ns <= inner.end_ns <= outer.end_ns
+
+    def test_span_records_errors(self, tracer):
+        """Test that a failing phase is still recorded with its error."""
+        with pytest.raises(ValueError):
+            with tracer.span("ai.parse"):
+                raise ValueError("bad json")
+
+        assert tracer.spans[0].args == {"error": "ValueError"}
+        assert tracer.spans[0].end_ns >= tracer.spans[0].start_ns
+
+    def test_spans_from_threads(self, tracer):
+        """Test that each thread keeps its own span stack."""
+        def work(i):
+            with tracer.span("ai.request", chunk=i):
+                tracer.annotate(completion_tokens=i)
+
+        with tracer.span("commit.map"):
+            threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        requests = [span for span in tracer.spans if span.name == "ai.request"]
+        assert sorted(span.args["completion_tokens"] for span in requests) == [0, 1, 2, 3]
+        assert "completion_tokens" not in next(
+            span for span in tracer.spans if span.name == "commit.map"
+        ).args
+
+    def test_summary_aggregates_phases_and_tokens(self, tracer):
+        """Test that the summary sums durations and token usage per phase."""
+        for tokens in (7, 3):
+            with tracer.span("ai.request"):
+                tracer.annotate(prompt_tokens=tokens, completion_tokens=1)
+        with tracer.span("git.add"):
+            pass
+
+        rows = {row["name"]: row for row in tracer.summary()}
+        assert rows["ai.request"]["count"] == 2
+        assert rows["ai.request"]["prompt_tokens"] == 10
+        assert rows["ai.request"]["completion_tokens"] == 2
+        assert "prompt_tokens" not in rows["git.add"]
+
+    def test_finish_writes_chrome_trace(self, tracer, capsys):
+        """Test the trace-event JSON and the summary table."""
+        with tracer.span("git.diff", staged=True):
+            pass
+
+        tracer.finish()
+
+        with open(tracer.path, encoding="utf-8") as f:
+            trace = json.load(f)
+        event, = trace["traceEvents"]
+        assert event["ph"] == "X"
+        assert (event["name"], event["cat"], event["args"]) == ("git.diff", "git", {"staged": True})
+        assert event["dur"] >= 0
+        assert "git.diff" in capsys.readouterr().err
+
+
+@pytest.mark.unit
+class TestConfigure:
+    """Test enabling tracing from the flag or the environment."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_tracer(self, monkeypatch):
+        monkeypatch.setattr(tracing, "_tracer", Tracer())
+        monkeypatch.setattr(tracing.atexit, "register", lambda func: None)
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test that nothing is traced without flag or variable."""
+        monkeypatch.delenv("AIGIT_TRACE", raising=False)
+
+        assert tracing.configure(False) is False
+        assert not tracing.get_tracer().enabled
+
+    def test_env_path(self, monkeypatch, tmp_path):
+        """Test that a path in AIGIT_TRACE becomes the trace file."""
+        monkeypatch.setenv("AIGIT_TRACE", str(tmp_path / "t.json"))
+
+        assert tracing.configure(False) is True
+        assert tracing.get_tracer().path == str(tmp_path / "t.json")
+
+    def test_flag_uses_temp_file(self, monkeypatch, tmp_path):
+        """Test that --trace writes outside the work tree by default."""
+        monkeypatch.delenv("AIGIT_TRACE", raising=False)
+        monkeypatch.setattr(tracing.tempfile, "gettempdir", lambda: str(tmp_path))
+
+        assert tracing.configure(True) is True
+        assert tracing.get_tracer().path.startswith(str(tmp_path))
+
+    def test_usage_recorded_by_ai_service(self):
+        """Test that token usage from a response lands on the current span."""
+        from ai_git_utils.services.ai_service import AIService
+
+        tracing.get_tracer().enable("unused.json")
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30, total_tokens=150)
+        with tracing.span("ai.request"):
+            AIService._annotate_usage(usage)
+
+        assert tracing.get_tracer().spans[0].args == {
+            "prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150
+        }
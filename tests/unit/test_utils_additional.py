@@ -1,6 +1,12 @@
 """Additional unit tests for utils module."""
 import pytest
-from ai_git_utils.utils import beautify_diff, ALLOWED_EDITORS
+from ai_git_utils.utils import (
+    beautify_diff,
+    commit_preview,
+    iter_diff_blocks,
+    render_partial_commit,
+    ALLOWED_EDITORS,
+)
 
 
 @pytest.mark.unit
@@ -44,6 +50,33 @@ index 1234567..abcdefg 100644
 Binary files a/binary.dat and b/binary.dat differ"""
         beautify_diff(diff)
     
+    def test_beautify_diff_streams_lines(self):
+        """Test beautify_diff consuming an iterator of lines."""
+        beautify_diff(iter(["diff --git a/f b/f", "@@ -1 +1 @@", "-a", "+b"]))
+    
+    def test_iter_diff_blocks_split_at_boundaries(self):
+        """Test that blocks end at hunk or file boundaries once large enough."""
+        lines = ["diff --git a/f b/f", "@@ -1,2 +1,2 @@", "-a", "+b", "@@ -9 +9 @@", "-c", "+d",
+                 "diff --git a/g b/g", "@@ -1 +1 @@", "-e"]
+        
+        blocks = list(iter_diff_blocks(lines, min_lines=3, max_lines=100))
+        
+        assert blocks == [
+            (1, lines[0:4]),
+            (5, lines[4:7]),
+            (8, lines[7:10]),
+        ]
+    
+    def test_iter_diff_blocks_caps_block_size(self):
+        """Test that a huge hunk is emitted in bounded blocks."""
+        lines = ["@@ -1,1000 +1,1000 @@"] + [f"+line {i}" for i in range(1000)]
+        
+        blocks = list(iter_diff_blocks(lines, max_lines=400))
+        
+        assert [start for start, _ in blocks] == [1, 401, 801]
+        assert max(len(block) for _, block in blocks) == 400
+        assert sum(len(block) for _, block in blocks) == 1001
+    
     def test_allowed_editors_list(self):
         """Test that ALLOWED_EDITORS contains expected editors."""
         assert "vim" in ALLOWED_EDITORS
@@ -51,4 +84,22 @@ Binary files a/binary.dat and b/binary.dat differ"""
         assert "nano" in ALLOWED_EDITORS
         assert "emacs" in ALLOWED_EDITORS
         assert "code" in ALLOWED_EDITORS
-        assert "subl" in ALLOWED_EDITORS
\ No newline at end of file
+        assert "subl" in ALLOWED_EDITORS
+    
+    def test_render_partial_commit(self):
+        """Test rendering partially generated commit fields."""
+        assert render_partial_commit({"type": "feat"}) == "feat(…): …"
+        
+        rendered = render_partial_commit({
+            "type": "feat",
+            "scope": "cli",
+            "emoji": "✨",
+            "subject": "add flag",
+            "fix_items": ["one"],
+        })
+        assert rendered == "feat(cli): ✨ add flag\n\n- one"
+    
+    def test_commit_preview_updates(self):
+        """Test that the live preview accepts updates."""
+        with commit_preview() as update:
+            update({"type": "fix", "subject": "bug"})